@@ -0,0 +1,775 @@
+"""
+Almacén columnar en disco: un directorio por tabla con un archivo .npy por
+columna y un meta.json con el orden de las columnas, sus dtypes y metadatos
+libres (versión, fecha de actualización, etc.).
+
+Las columnas numéricas, booleanas y de fechas se guardan tal cual; las de texto
+como códigos y diccionario si tienen pocos valores distintos, o si no como los
+bytes UTF-8 de todos los textos seguidos más un arreglo de posiciones (y una
+máscara de nulos aparte), de modo que un texto largo no agranda las demás
+filas. Ninguna columna necesita pickle y todas se pueden abrir con memmap. La
+escritura de una tabla completa es atómica: se escribe en un directorio
+temporal y se reemplaza el anterior. anexar_filas, en cambio, escribe al final
+de los archivos de cada columna y actualiza meta.json al terminar.
+
+La ingesta (cargar_ingerido, ingerir_subida) convierte un archivo de texto en
+una tabla de este almacén una sola vez por versión del archivo, escribiendo
+cada bloque del CSV en cuanto se lee (EscritorTabla); los análisis
+siguientes abren las columnas con memmap y leen solo las que necesitan, sin
+volver a interpretar el texto.
+"""
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from cache_datos import huella_archivo
+
+META = 'meta.json'
+# Directorio de las tablas ingeridas y tamaño de bloque de la lectura de CSV
+DIRECTORIO_INGESTA = os.environ.get('COLUMNAR_DIR', '.columnar')
+FILAS_BLOQUE = 100_000
+# Subidas ingeridas que se conservan; las más antiguas se borran
+MAX_SUBIDAS = 64
+# Textos distintos que una columna guarda como diccionario antes de pasar a texto de largo variable
+MAX_CATEGORIAS = 1 << 16
+
+_locks = {}
+_lock = threading.Lock()
+
+
+def _nombre_archivo(posicion: int) -> str:
+    # Los nombres de columna pueden tener cualquier carácter; los archivos usan la posición
+    return f'c{posicion:04d}'
+
+
+def _texto_variable(textos) -> Dict[str, np.ndarray]:
+    """Bytes UTF-8 de los textos seguidos ('') y la posición donde empieza cada uno ('posiciones')."""
+    codificados = [t.encode('utf-8') for t in textos]
+    posiciones = np.zeros(len(codificados) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados)), out=posiciones[1:])
+    return {'': np.frombuffer(b''.join(codificados), dtype=np.uint8), 'posiciones': posiciones}
+
+
+def _valores_fijos(serie: pd.Series) -> Optional[np.ndarray]:
+    """Valores de una columna numérica, booleana o de fechas tal como se guardan, o None si es texto."""
+    if pd.api.types.is_datetime64_any_dtype(serie) and getattr(serie.dt, 'tz', None) is None:
+        return serie.to_numpy(dtype='datetime64[ns]')
+    if pd.api.types.is_bool_dtype(serie) and not serie.hasnans:
+        return serie.to_numpy(dtype=bool)
+    if pd.api.types.is_numeric_dtype(serie):
+        if pd.api.types.is_extension_array_dtype(serie) and serie.hasnans:
+            return serie.to_numpy(dtype=np.float64, na_value=np.nan)
+        return serie.to_numpy()
+    return None
+
+
+class _ArchivoNpy:
+    """
+    Archivo .npy unidimensional que se escribe por partes.
+
+    La cabecera se reserva con un largo fijo y se reescribe al cerrar con el
+    número final de filas, así que nunca hace falta tener el arreglo completo.
+    """
+    LARGO_CABECERA = 128
+
+    def __init__(self, ruta: str, dtype, filas: int = 0):
+        self.ruta = ruta
+        self.dtype = np.dtype(dtype)
+        self.filas = filas
+        if filas:
+            # Continúa un archivo con cabecera de LARGO_CABECERA bytes y `filas` filas; lo
+            # que haya después (una escritura interrumpida) se descarta
+            self._archivo = open(ruta, 'r+b')
+            self._archivo.truncate(self.LARGO_CABECERA + filas * self.dtype.itemsize)
+            self._archivo.seek(0, os.SEEK_END)
+        else:
+            self._archivo = open(ruta, 'wb')
+            self._archivo.write(self._cabecera())
+
+    def _cabecera(self) -> bytes:
+        texto = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                      'shape': (self.filas,)})
+        texto = texto.ljust(self.LARGO_CABECERA - 11) + '\n'
+        return b'\x93NUMPY\x01\x00' + len(texto).to_bytes(2, 'little') + texto.encode('latin1')
+
+    def agregar(self, valores: np.ndarray):
+        self._archivo.write(np.ascontiguousarray(valores, dtype=self.dtype).tobytes())
+        self.filas += len(valores)
+
+    def cerrar(self):
+        if not self._archivo.closed:
+            self._archivo.seek(0)
+            self._archivo.write(self._cabecera())
+            self._archivo.close()
+
+    @classmethod
+    def continuable(cls, ruta: str) -> bool:
+        """True si el .npy tiene una cabecera de LARGO_CABECERA bytes y se puede continuar."""
+        with open(ruta, 'rb') as f:
+            inicio = f.read(10)
+        return (len(inicio) == 10 and inicio[:6] == b'\x93NUMPY'
+                and 10 + int.from_bytes(inicio[8:10], 'little') == cls.LARGO_CABECERA)
+
+
+def _agregar_npy(ruta: str, dtype, filas: int, valores: np.ndarray):
+    """Agrega valores al final de un .npy que tiene `filas` filas válidas."""
+    archivo = _ArchivoNpy(ruta, dtype, filas)
+    archivo.agregar(valores)
+    archivo.cerrar()
+
+
+class _ColumnaFija:
+    """Columna numérica, booleana o de fechas. El tipo lo fija el primer bloque."""
+
+    def __init__(self, base: str, serie: pd.Series, valores: np.ndarray):
+        self.base = base
+        self.dtype = str(serie.dtype)
+        self.archivo = _ArchivoNpy(base + '.npy', valores.dtype)
+
+    def agregar(self, serie: pd.Series) -> bool:
+        """
+        Escribe el bloque; False si no cabe en el tipo de la columna y hay que pasarla
+        a texto (texto en una columna numérica o de fechas, o una booleana que deja de serlo).
+        """
+        valores = _valores_fijos(serie)
+        if valores is None:
+            return False
+        guardado, nuevo = self.archivo.dtype.kind, valores.dtype.kind
+        if guardado != nuevo and not (guardado in 'iuf' and nuevo in 'iuf'):
+            return False
+        tipo = np.result_type(self.archivo.dtype, valores.dtype)
+        if tipo != self.archivo.dtype:
+            self._promover(tipo)
+        self.archivo.agregar(valores)
+        return True
+
+    def _promover(self, tipo: np.dtype):
+        """Reescribe lo ya guardado con un tipo más amplio (por ejemplo enteros que pasan a tener NaN)."""
+        self.archivo.cerrar()
+        anterior = np.load(self.archivo.ruta, mmap_mode='r')
+        nuevo = _ArchivoNpy(self.base + '.tmp.npy', tipo)
+        for inicio in range(0, len(anterior), FILAS_BLOQUE):
+            nuevo.agregar(anterior[inicio:inicio + FILAS_BLOQUE])
+        del anterior
+        nuevo.cerrar()
+        os.replace(nuevo.ruta, self.archivo.ruta)
+        self.archivo = _ArchivoNpy(self.archivo.ruta, tipo, nuevo.filas)
+        self.dtype = str(tipo)
+
+    def bloques(self) -> Iterator[pd.Series]:
+        """Lo ya escrito, por bloques, para pasarlo a una columna de texto (que usa los mismos archivos)."""
+        self.archivo.cerrar()
+        ruta = self.base + '.anterior.npy'
+        os.replace(self.archivo.ruta, ruta)
+
+        def leer():
+            valores = np.load(ruta, mmap_mode='r')
+            for inicio in range(0, len(valores), FILAS_BLOQUE):
+                # Se copia a una Series con su tipo: así las fechas pasan a texto como fechas y NaN/NaT como nulos
+                yield pd.Series(np.array(valores[inicio:inicio + FILAS_BLOQUE]))
+            del valores
+            os.unlink(ruta)
+        return leer()
+
+    def cerrar(self) -> Dict:
+        self.archivo.cerrar()
+        return {'dtype': self.dtype, 'nulos': False, 'categorias': False, 'posiciones': False}
+
+
+class _ColumnaTexto:
+    """
+    Columna de texto. Empieza como diccionario (códigos int32 y textos
+    distintos en memoria) y pasa a texto de largo variable en cuanto tiene más
+    de la mitad de valores distintos o más de MAX_CATEGORIAS.
+    """
+
+    def __init__(self, base: str, dtype: str):
+        self.base = base
+        self.dtype = dtype
+        self.categorias: Optional[Dict[str, int]] = {}
+        self.codigos = _ArchivoNpy(base + '.npy', np.int32)
+        self.filas = 0
+
+    def agregar(self, serie: pd.Series) -> bool:
+        valores = serie.astype(object)
+        self.filas += len(valores)
+        if self.categorias is not None:
+            locales, distintos = pd.factorize(valores)
+            globales = np.array([self.categorias.setdefault(str(v), len(self.categorias)) for v in distintos] + [-1],
+                                dtype=np.int32)
+            # El código local -1 (nulo) toma el último elemento, -1
+            self.codigos.agregar(globales[locales])
+            if len(self.categorias) > min(self.filas // 2, MAX_CATEGORIAS):
+                self._a_texto_variable()
+            return True
+        nulos = valores.isna().to_numpy()
+        arreglos = _texto_variable(valores.where(~nulos, '').astype(str))
+        self.texto.agregar(arreglos[''])
+        self.posiciones.agregar(arreglos['posiciones'][1:] + self.bytes)
+        self.bytes += len(arreglos[''])
+        self.nulos.agregar(nulos)
+        self.hay_nulos = self.hay_nulos or bool(nulos.any())
+        return True
+
+    def _a_texto_variable(self):
+        self.codigos.cerrar()
+        categorias = np.array(list(self.categorias) + [None], dtype=object)
+        codigos = np.load(self.codigos.ruta, mmap_mode='r')
+        os.unlink(self.codigos.ruta)
+        self.categorias = None
+        self.texto = _ArchivoNpy(self.base + '.npy', np.uint8)
+        self.posiciones = _ArchivoNpy(self.base + '.posiciones.npy', np.int64)
+        self.posiciones.agregar(np.zeros(1, dtype=np.int64))
+        self.nulos = _ArchivoNpy(self.base + '.nulos.npy', bool)
+        self.bytes, self.hay_nulos, self.filas = 0, False, 0
+        for inicio in range(0, len(codigos), FILAS_BLOQUE):
+            self.agregar(pd.Series(categorias.take(codigos[inicio:inicio + FILAS_BLOQUE])))
+        del codigos
+
+    def cerrar(self) -> Dict:
+        if self.categorias is not None and (not self.filas or len(self.categorias) > self.filas // 2):
+            self._a_texto_variable()
+        if self.categorias is not None:
+            self.codigos.cerrar()
+            np.save(self.base + '.categorias.npy', np.array(list(self.categorias), dtype=str), allow_pickle=False)
+            return {'dtype': self.dtype, 'nulos': False, 'categorias': True, 'posiciones': False}
+        for archivo in (self.texto, self.posiciones, self.nulos):
+            archivo.cerrar()
+        if not self.hay_nulos:
+            os.unlink(self.nulos.ruta)
+        return {'dtype': self.dtype, 'nulos': self.hay_nulos, 'categorias': False, 'posiciones': True}
+
+
+def _reemplazar_directorio(temporal: str, directorio: str, padre: str):
+    """
+    Pone temporal en lugar de directorio sin locks, de modo que funciona entre procesos.
+
+    os.rename de un directorio solo reemplaza al destino si está vacío o no
+    existe; si otro proceso (el pool de trabajos, otro worker) dejó su versión
+    en medio, se aparta esa y se vuelve a intentar: gana la última escritura y
+    ninguna falla.
+    """
+    while True:
+        try:
+            os.rename(temporal, directorio)
+            return
+        except OSError as e:
+            if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                raise
+        anterior = os.path.join(padre, f'.old_{uuid.uuid4().hex}')
+        try:
+            os.rename(directorio, anterior)
+        except FileNotFoundError:
+            continue  # otro proceso la apartó primero
+        shutil.rmtree(anterior, ignore_errors=True)
+
+
+class EscritorTabla:
+    """
+    Escribe una tabla columnar bloque por bloque, sin tenerla completa en memoria.
+
+    Cada bloque se agrega al final de los archivos de sus columnas en un
+    directorio temporal; terminar() escribe meta.json y reemplaza la tabla
+    anterior. El tipo de cada columna lo fija el primer bloque y, como en
+    pd.read_csv, ningún valor se pierde: los enteros pasan a float si aparecen
+    nulos, y una columna numérica, de fechas o booleana en la que aparece texto
+    (u otro tipo) pasa a ser de texto, con los valores ya escritos convertidos.
+
+    Args:
+        directorio (str): Directorio de la tabla
+    """
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        self.padre = os.path.dirname(os.path.abspath(directorio))
+        os.makedirs(self.padre, exist_ok=True)
+        self.temporal = tempfile.mkdtemp(prefix='.tmp_', dir=self.padre)
+        self.nombres: Optional[List[str]] = None
+        self.columnas = []
+        self.filas = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is not None:
+            self.descartar()
+
+    def agregar(self, df: pd.DataFrame):
+        """
+        Raises:
+            ValueError: Si las columnas no coinciden con las del primer bloque
+        """
+        if self.nombres is None:
+            self.nombres = [str(c) for c in df.columns]
+            for posicion, nombre in enumerate(df.columns):
+                base = os.path.join(self.temporal, _nombre_archivo(posicion))
+                valores = _valores_fijos(df[nombre])
+                self.columnas.append(_ColumnaFija(base, df[nombre], valores) if valores is not None
+                                     else _ColumnaTexto(base, str(df[nombre].dtype)))
+        elif [str(c) for c in df.columns] != self.nombres:
+            raise ValueError(f'Las columnas no coinciden con la tabla: {self.nombres}')
+        for posicion, nombre in enumerate(df.columns):
+            columna = self.columnas[posicion]
+            if not columna.agregar(df[nombre]):
+                anteriores = columna.bloques()
+                texto = _ColumnaTexto(columna.base, 'object')
+                for bloque in anteriores:
+                    texto.agregar(bloque)
+                texto.agregar(df[nombre])
+                self.columnas[posicion] = texto
+        self.filas += len(df)
+
+    def terminar(self, **extra) -> Dict:
+        """
+        Cierra las columnas y reemplaza la tabla anterior.
+
+        Args:
+            **extra: Metadatos libres que se guardan en meta.json
+
+        Returns:
+            Dict: Metadatos escritos
+        """
+        try:
+            columnas = []
+            for posicion, (nombre, columna) in enumerate(zip(self.nombres or [], self.columnas)):
+                columnas.append({'nombre': nombre, 'archivo': _nombre_archivo(posicion), **columna.cerrar()})
+            meta = {'filas': self.filas, 'columnas': columnas, 'guardado': time.time(), 'extra': extra}
+            _escribir_meta(self.temporal, meta)
+
+            _reemplazar_directorio(self.temporal, self.directorio, self.padre)
+            return meta
+        except BaseException:
+            self.descartar()
+            raise
+
+    def descartar(self):
+        for columna in self.columnas:
+            for archivo in vars(columna).values():
+                if isinstance(archivo, _ArchivoNpy):
+                    archivo.cerrar()
+        shutil.rmtree(self.temporal, ignore_errors=True)
+
+
+def _abrir_columna(directorio: str, info: Dict, total: int, mmap: bool) -> Callable[[slice], np.ndarray]:
+    """
+    Abre los archivos de una columna y devuelve una función que decodifica un rango de filas.
+
+    Solo se usan las primeras `total` filas (las de meta.json): anexar_filas
+    escribe al final de los archivos antes de actualizar meta.json.
+    """
+    modo = 'r' if mmap else None
+    base = os.path.join(directorio, info['archivo'])
+    valores = np.load(base + '.npy', mmap_mode=modo)
+    if info.get('categorias'):
+        # El código -1 (nulo) toma el último elemento, None
+        categorias = np.append(np.load(base + '.categorias.npy').astype(object), None)
+        valores = valores[:total]
+        return lambda filas: categorias.take(valores[filas])
+    nulos = np.load(base + '.nulos.npy', mmap_mode=modo)[:total] if info.get('nulos') else None
+    if info.get('posiciones'):
+        posiciones = np.load(base + '.posiciones.npy', mmap_mode=modo)[:total + 1]
+
+        def decodificar(filas):
+            inicio, fin, _ = filas.indices(total)
+            limites = posiciones[inicio:max(inicio, fin) + 1].tolist()
+            datos = valores[limites[0]:limites[-1]].tobytes()
+            texto = np.empty(len(limites) - 1, dtype=object)
+            texto[:] = [datos[a - limites[0]:b - limites[0]].decode('utf-8') for a, b in zip(limites, limites[1:])]
+            if nulos is not None:
+                texto[nulos[filas]] = None
+            return texto
+        return decodificar
+    valores = valores[:total]
+    if nulos is not None:
+        # Tablas anteriores con texto Unicode de ancho fijo
+        def decodificar(filas):
+            texto = valores[filas].astype(object)
+            texto[nulos[filas]] = None
+            return texto
+        return decodificar
+    if valores.dtype.kind == 'U':
+        return lambda filas: valores[filas].astype(object)
+    return lambda filas: valores[filas]
+
+
+def _armar(datos: Dict[str, np.ndarray], infos: Dict[str, Dict], copiar: bool) -> pd.DataFrame:
+    """DataFrame con las columnas decodificadas y los dtypes guardados."""
+    df = pd.DataFrame(datos, columns=list(datos), copy=copiar)
+    for nombre in datos:
+        dtype = infos[nombre]['dtype']
+        if dtype != str(df[nombre].dtype) and dtype not in ('object', 'str', 'string'):
+            try:
+                df[nombre] = df[nombre].astype(dtype)
+            except (TypeError, ValueError):
+                pass
+    return df
+
+
+def leer_meta(directorio: str) -> Optional[Dict]:
+    """Metadatos de una tabla guardada, o None si no existe."""
+    try:
+        with open(os.path.join(directorio, META), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def actualizar_meta(directorio: str, **valores) -> Dict:
+    """Actualiza solo los metadatos libres de una tabla (sin reescribir columnas)."""
+    meta = leer_meta(directorio)
+    if meta is None:
+        raise FileNotFoundError(f'No existe la tabla {directorio}')
+    meta['extra'].update(valores)
+    _escribir_meta(directorio, meta)
+    return meta
+
+
+def _escribir_meta(directorio: str, meta: Dict):
+    temporal = os.path.join(directorio, META + '.tmp')
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, default=str)
+    os.replace(temporal, os.path.join(directorio, META))
+
+
+def guardar_tabla(df: pd.DataFrame, directorio: str, **extra) -> Dict:
+    """
+    Guarda un DataFrame como tabla columnar, reemplazando la anterior si existe.
+
+    Args:
+        df (pd.DataFrame): Tabla a guardar (el índice no se guarda)
+        directorio (str): Directorio de la tabla
+        **extra: Metadatos libres que se guardan en meta.json
+
+    Returns:
+        Dict: Metadatos escritos
+    """
+    with EscritorTabla(directorio) as escritor:
+        escritor.agregar(df)
+        return escritor.terminar(**extra)
+
+
+def _anexo_columna(directorio: str, info: Dict, serie: pd.Series, filas: int) -> Optional[Callable[[], None]]:
+    """
+    Función que escribe la serie al final de los archivos de una columna, o None
+    si no cabe en el formato guardado (cambio de tipo, demasiadas categorías,
+    archivos de versiones anteriores) y hay que reescribir la tabla.
+    """
+    base = os.path.join(directorio, info['archivo'])
+    if not _ArchivoNpy.continuable(base + '.npy'):
+        return None
+    if info.get('categorias'):
+        guardadas = np.load(base + '.categorias.npy').tolist()
+        categorias = {c: i for i, c in enumerate(guardadas)}
+        locales, distintos = pd.factorize(serie.astype(object))
+        globales = np.array([categorias.setdefault(str(v), len(categorias)) for v in distintos] + [-1],
+                            dtype=np.int32)
+        if len(categorias) > MAX_CATEGORIAS:
+            return None
+
+        def escribir():
+            if len(categorias) > len(guardadas):
+                temporal = base + '.categorias.tmp.npy'
+                np.save(temporal, np.array(list(categorias), dtype=str), allow_pickle=False)
+                os.replace(temporal, base + '.categorias.npy')
+            _agregar_npy(base + '.npy', np.int32, filas, globales[locales])
+        return escribir
+
+    if info.get('posiciones'):
+        if not _ArchivoNpy.continuable(base + '.posiciones.npy') or (
+                info['nulos'] and not _ArchivoNpy.continuable(base + '.nulos.npy')):
+            return None
+        posiciones = np.load(base + '.posiciones.npy', mmap_mode='r')
+        if len(posiciones) < filas + 1:
+            return None
+        previos = int(posiciones[filas])
+        del posiciones
+        valores = serie.astype(object)
+        nulos = valores.isna().to_numpy()
+        arreglos = _texto_variable(valores.where(~nulos, '').astype(str))
+
+        def escribir():
+            _agregar_npy(base + '.npy', np.uint8, previos, arreglos[''])
+            _agregar_npy(base + '.posiciones.npy', np.int64, filas + 1, arreglos['posiciones'][1:] + previos)
+            if info['nulos']:
+                _agregar_npy(base + '.nulos.npy', bool, filas, nulos)
+            elif nulos.any():
+                # Primera vez con nulos: la máscara empieza con las filas anteriores en False
+                archivo = _ArchivoNpy(base + '.nulos.npy', bool)
+                for inicio in range(0, filas, FILAS_BLOQUE):
+                    archivo.agregar(np.zeros(min(FILAS_BLOQUE, filas - inicio), dtype=bool))
+                archivo.agregar(nulos)
+                archivo.cerrar()
+                info['nulos'] = True
+        return escribir
+
+    tipo = np.load(base + '.npy', mmap_mode='r').dtype
+    valores = _valores_fijos(serie)
+    if info.get('nulos') or tipo.kind == 'U' or valores is None:
+        return None
+    try:
+        if np.result_type(tipo, valores.dtype) != tipo:
+            return None
+    except TypeError:
+        return None
+    return lambda: _agregar_npy(base + '.npy', tipo, filas, valores)
+
+
+class _LockTabla:
+    """
+    Lock exclusivo entre procesos sobre el directorio de una tabla (flock).
+
+    Si mientras se esperaba el lock otro proceso reemplazó el directorio, se
+    vuelve a tomar sobre el directorio nuevo.
+    """
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+
+    def __enter__(self):
+        while True:
+            self._fd = os.open(self.directorio, os.O_RDONLY)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.directorio).st_ino == os.fstat(self._fd).st_ino:
+                    return self
+            except FileNotFoundError:
+                pass
+            os.close(self._fd)
+
+    def __exit__(self, *_):
+        os.close(self._fd)
+
+
+def anexar_filas(df: pd.DataFrame, directorio: str, **extra) -> Dict:
+    """
+    Agrega filas al final de una tabla guardada con las mismas columnas. Si la
+    tabla no existe, la crea.
+
+    Las filas se escriben al final de los archivos de cada columna y después se
+    actualiza meta.json, así que el costo depende de las filas nuevas y no del
+    tamaño de la tabla; los lectores solo ven las filas de meta.json. Si algún
+    bloque no cabe en el formato guardado (por ejemplo enteros que pasan a
+    tener nulos) la tabla se reescribe completa, por bloques.
+
+    Raises:
+        ValueError: Si las columnas no coinciden con las guardadas
+    """
+    if leer_meta(directorio) is None:
+        return guardar_tabla(df, directorio, **extra)
+    with _LockTabla(directorio):
+        meta = leer_meta(directorio)
+        nombres = [c['nombre'] for c in meta['columnas']]
+        if [str(c) for c in df.columns] != nombres:
+            raise ValueError(f'Las columnas no coinciden con la tabla guardada: {nombres}')
+        if not len(df):
+            return actualizar_meta(directorio, **extra)
+        anexos = [_anexo_columna(directorio, info, df.iloc[:, posicion], meta['filas'])
+                  for posicion, info in enumerate(meta['columnas'])]
+        if all(anexo is not None for anexo in anexos):
+            for anexo in anexos:
+                anexo()
+            meta['filas'] += len(df)
+            meta['guardado'] = time.time()
+            meta['extra'].update(extra)
+            _escribir_meta(directorio, meta)
+            return meta
+        with EscritorTabla(directorio) as escritor:
+            for bloque in iterar_bloques(directorio):
+                escritor.agregar(bloque)
+            escritor.agregar(df.set_axis(nombres, axis=1))
+            return escritor.terminar(**dict(meta['extra'], **extra))
+
+
+def leer_tabla(directorio: str, columnas: Optional[List[str]] = None, mmap: bool = True) -> pd.DataFrame:
+    """
+    Lee una tabla guardada.
+
+    Args:
+        directorio (str): Directorio de la tabla
+        columnas (List[str]): Columnas a leer (todas si es None); las demás no se abren
+        mmap (bool): Abrir las columnas con memmap en lugar de cargarlas en memoria.
+            Las columnas numéricas quedan entonces de solo lectura: el DataFrame
+            no debe modificarse en su lugar (agregar columnas sí se puede)
+
+    Raises:
+        FileNotFoundError: Si la tabla no existe
+        KeyError: Si alguna columna no existe
+    """
+    _, infos, abiertas = _abrir_tabla(directorio, columnas, mmap)
+    datos = {nombre: decodificar(slice(None)) for nombre, decodificar in abiertas.items()}
+    return _armar(datos, infos, copiar=not mmap)
+
+
+def _abrir_tabla(directorio: str, columnas: Optional[List[str]], mmap: bool):
+    meta = leer_meta(directorio)
+    if meta is None:
+        raise FileNotFoundError(f'No existe la tabla {directorio}')
+    infos = {c['nombre']: c for c in meta['columnas']}
+    if columnas is None:
+        columnas = list(infos)
+    faltantes = [c for c in columnas if c not in infos]
+    if faltantes:
+        raise KeyError(f'Columnas no encontradas: {faltantes}')
+    return meta['filas'], infos, {nombre: _abrir_columna(directorio, infos[nombre], meta['filas'], mmap)
+                                  for nombre in columnas}
+
+
+def iterar_bloques(directorio: str, filas: int = FILAS_BLOQUE,
+                   columnas: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Recorre una tabla guardada en bloques de `filas` filas.
+
+    Las columnas se abren con memmap y el texto se decodifica bloque por bloque,
+    así que la memoria usada depende del tamaño del bloque y no de la tabla.
+    """
+    total, infos, abiertas = _abrir_tabla(directorio, columnas, mmap=True)
+    for inicio in range(0, total, filas):
+        rango = slice(inicio, min(inicio + filas, total))
+        bloque = _armar({nombre: decodificar(rango) for nombre, decodificar in abiertas.items()}, infos, copiar=True)
+        bloque.index = pd.RangeIndex(rango.start, rango.stop)
+        yield bloque
+
+
+def escribir_csv(origen, directorio: str, filas: int = FILAS_BLOQUE, **extra) -> Dict:
+    """
+    Guarda un CSV como tabla columnar leyéndolo en bloques de `filas` filas.
+
+    Cada bloque se escribe en cuanto se lee (ver EscritorTabla), así que la
+    memoria usada depende del tamaño del bloque y no del archivo.
+    """
+    with EscritorTabla(directorio) as escritor:
+        for bloque in pd.read_csv(origen, chunksize=filas):
+            escritor.agregar(bloque)
+        if escritor.nombres is None:
+            escritor.agregar(pd.read_csv(origen))
+        return escritor.terminar(**extra)
+
+
+def _lock_de(directorio: str) -> threading.Lock:
+    with _lock:
+        return _locks.setdefault(os.path.abspath(directorio), threading.Lock())
+
+
+def directorio_ingesta(ruta: str, leer: Optional[Callable] = None) -> str:
+    """Directorio de la tabla ingerida de un archivo (uno por archivo y por función de lectura)."""
+    ruta = os.path.abspath(ruta)
+    lector = f'{leer.__module__}.{leer.__qualname__}' if leer else ''
+    clave = hashlib.sha1(f'{ruta}|{lector}'.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(DIRECTORIO_INGESTA, f'{os.path.basename(ruta)}-{clave}')
+
+
+def ingerir(ruta: str, leer: Optional[Callable[[str], pd.DataFrame]] = None) -> Dict:
+    """
+    Convierte un archivo en tabla columnar si aún no lo está en su versión actual.
+
+    Args:
+        ruta (str): Archivo de origen
+        leer (Callable): Función ruta -> DataFrame (por defecto el CSV se escribe por bloques)
+
+    Returns:
+        Dict: Metadatos de la tabla; meta['extra']['tabla'] es su directorio
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+    """
+    directorio = directorio_ingesta(ruta, leer)
+    with _lock_de(directorio):
+        huella = list(huella_archivo(ruta)[1:])
+        meta = leer_meta(directorio)
+        if meta is not None and meta['extra'].get('huella') == huella:
+            return meta
+        inicio = time.perf_counter()
+        if leer is None:
+            meta = escribir_csv(ruta, directorio)
+        else:
+            meta = guardar_tabla(leer(ruta), directorio)
+        return actualizar_meta(directorio, origen=os.path.abspath(ruta), huella=huella, tabla=directorio,
+                               segundos_ingesta=time.perf_counter() - inicio)
+
+
+def cargar_ingerido(ruta: str, columnas: Optional[List[str]] = None, mmap: bool = True,
+                    leer: Optional[Callable[[str], pd.DataFrame]] = None) -> pd.DataFrame:
+    """
+    Lee un archivo a través de su tabla columnar, ingiriéndolo primero si cambió.
+
+    Args:
+        ruta (str): Archivo de origen
+        columnas (List[str]): Columnas a leer (todas si es None)
+        mmap (bool): Abrir las columnas con memmap (ver leer_tabla)
+        leer (Callable): Función ruta -> DataFrame usada en la ingesta
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        KeyError: Si alguna columna no existe
+    """
+    meta = ingerir(ruta, leer)
+    return leer_tabla(meta['extra']['tabla'], columnas, mmap)
+
+
+def _purgar_subidas(directorio: str):
+    tablas = []
+    for nombre in os.listdir(directorio):
+        if nombre.startswith('.'):
+            continue
+        meta = leer_meta(os.path.join(directorio, nombre))
+        if meta is not None:
+            tablas.append((meta['guardado'], nombre))
+    for _, nombre in sorted(tablas)[:-MAX_SUBIDAS]:
+        shutil.rmtree(os.path.join(directorio, nombre), ignore_errors=True)
+
+
+def directorio_subida(id_tabla: str) -> str:
+    """
+    Directorio de una subida ya ingerida.
+
+    Raises:
+        KeyError: Si no existe una subida con ese identificador
+    """
+    if not id_tabla.isalnum():
+        raise KeyError(id_tabla)
+    directorio = os.path.join(DIRECTORIO_INGESTA, 'subidas', id_tabla)
+    if leer_meta(directorio) is None:
+        raise KeyError(id_tabla)
+    return directorio
+
+
+def ingerir_subida(stream, filas: int = FILAS_BLOQUE) -> str:
+    """
+    Ingiere un CSV subido y devuelve su identificador (SHA-256 del contenido).
+
+    El contenido se copia a un archivo temporal mientras se calcula el hash, así
+    que volver a subir el mismo archivo no vuelve a interpretar el texto.
+    """
+    raiz = os.path.join(DIRECTORIO_INGESTA, 'subidas')
+    os.makedirs(raiz, exist_ok=True)
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=raiz, prefix='.subida_', delete=False) as temporal:
+        try:
+            for bloque in iter(lambda: stream.read(1 << 20), b''):
+                digest.update(bloque)
+                temporal.write(bloque)
+        except BaseException:
+            os.unlink(temporal.name)
+            raise
+    id_tabla = digest.hexdigest()
+    directorio = os.path.join(raiz, id_tabla)
+    try:
+        with _lock_de(directorio):
+            if leer_meta(directorio) is None:
+                escribir_csv(temporal.name, directorio, filas)
+                _purgar_subidas(raiz)
+    finally:
+        os.unlink(temporal.name)
+    return id_tabla
@@ -0,0 +1,357 @@
+"""
+Almacenes de los items de /items: en memoria (AlmacenItems) o en SQLite (AlmacenItemsSQLite).
+
+Los items viven en un diccionario indexado por id, así que leer, actualizar o
+eliminar uno cuesta O(1) sin importar cuántos haya. Los ids salen de un
+contador monótono (nunca se reutilizan, aunque se elimine el último) y se
+guardan además en una lista ordenada que permite paginar con cursor: la página
+siguiente empieza en el primer id mayor que el cursor, que se encuentra con
+bisect. Los ids eliminados se quedan en esa lista hasta que superan a los
+vivos y se compacta.
+
+Bloqueos: el lock estructural solo protege asignar ids y agregar o quitar
+entradas, y las actualizaciones toman el lock de su franja (id % FRANJAS), de
+modo que escritores sobre items distintos casi nunca se esperan entre sí.
+aplicar_lote toma todos los locks y aplica un lote entero de creaciones,
+actualizaciones o eliminaciones sin que otra escritura se intercale. Las
+lecturas no toman locks: cada item es un diccionario que no se modifica después
+de guardarse (actualizar guarda uno nuevo), y en CPython leer una clave del
+diccionario es atómico.
+
+AlmacenItemsSQLite guarda los items en un archivo SQLite en modo WAL, de modo
+que sobreviven a un reinicio y todos los workers (procesos) ven los mismos
+datos; crear_almacen() elige uno u otro con ITEMS_BACKEND ('memoria' por
+defecto o 'sqlite') e ITEMS_DB.
+"""
+import os
+import sqlite3
+import threading
+from bisect import bisect_right
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+FRANJAS = 64
+LIMITE_PAGINA = 100
+MAX_LIMITE_PAGINA = 10_000
+OPERACIONES_LOTE = ('crear', 'actualizar', 'eliminar')
+# Los ids de SQLite son enteros de 64 bits con signo; los dos almacenes aceptan el mismo rango
+MAX_ID = 2**63 - 1
+
+
+def error_id(item_id) -> Optional[str]:
+    """Mensaje de error si item_id no es un id entero válido, o None si lo es."""
+    if not isinstance(item_id, int) or isinstance(item_id, bool):
+        return "El id debe ser un entero"
+    if not 0 <= item_id <= MAX_ID:
+        return f"El id debe estar entre 0 y {MAX_ID}"
+    return None
+
+
+def error_nombre(nombre) -> Optional[str]:
+    """Mensaje de error si nombre no es un texto, o None si lo es."""
+    if not isinstance(nombre, str):
+        return "El name debe ser un texto"
+    return None
+
+
+class AlmacenItems:
+    """
+    Items {"id", "name"} indexados por id, seguros para varios hilos.
+
+    Args:
+        iniciales (Iterable[Dict]): Items con los que arranca el almacén (conservan su id)
+    """
+
+    def __init__(self, iniciales: Iterable[Dict] = ()):
+        self._items: Dict[int, Dict] = {}
+        self._ids: List[int] = []  # ids en orden creciente, incluidos eliminados aún no compactados
+        self._eliminados = 0
+        self._ultimo_id = 0
+        self._lock = threading.Lock()
+        self._franjas = [threading.Lock() for _ in range(FRANJAS)]
+        for item in sorted(iniciales, key=lambda i: i['id']):
+            self._items[item['id']] = dict(item)
+            self._ids.append(item['id'])
+            self._ultimo_id = item['id']
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def obtener(self, item_id: int) -> Optional[Dict]:
+        return self._items.get(item_id)
+
+    def listar(self) -> List[Dict]:
+        """Todos los items en orden de id."""
+        with self._lock:
+            return list(self._items.values())
+
+    def pagina(self, cursor: Optional[int] = None, limite: int = LIMITE_PAGINA) -> Tuple[List[Dict], Optional[int]]:
+        """
+        Hasta `limite` items con id mayor que cursor, en orden de id.
+
+        Returns:
+            tuple: (items, cursor de la página siguiente o None si no quedan más)
+        """
+        if limite < 1:
+            raise ValueError("limit debe ser mayor que 0")
+        items = []
+        with self._lock:
+            ids = self._ids
+            posicion = bisect_right(ids, cursor) if cursor is not None else 0
+            while posicion < len(ids) and len(items) < limite:
+                item = self._items.get(ids[posicion])
+                if item is not None:
+                    items.append(item)
+                posicion += 1
+            # Salta eliminados para no devolver un cursor que lleve a una página vacía
+            while posicion < len(ids) and ids[posicion] not in self._items:
+                posicion += 1
+            quedan = posicion < len(ids)
+        return items, (items[-1]['id'] if quedan and items else None)
+
+    def crear(self, nombre: str) -> Dict:
+        with self._lock:
+            return self._crear(nombre)
+
+    def actualizar(self, item_id: int, nombre: Optional[str] = None) -> Optional[Dict]:
+        """Cambia el nombre del item; devuelve None si no existe."""
+        with self._franjas[item_id % FRANJAS]:
+            return self._actualizar(item_id, nombre)
+
+    def eliminar(self, item_id: int) -> bool:
+        """Elimina el item; devuelve False si no existía."""
+        with self._franjas[item_id % FRANJAS], self._lock:
+            return self._eliminar(item_id) is not None
+
+    def aplicar_lote(self, operacion: str, entradas: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Aplica una misma operación a todas las entradas sin que otra escritura se intercale.
+
+        Args:
+            operacion (str): 'crear' (entradas {"name"}), 'actualizar' ({"id", "name"}) o 'eliminar' ({"id"})
+            entradas (List[Dict]): Entradas ya validadas
+
+        Returns:
+            List[Optional[Dict]]: Por entrada, el item creado, actualizado o eliminado, o None si el id no existía
+
+        Raises:
+            ValueError: Si la operación no es una de OPERACIONES_LOTE
+        """
+        if operacion not in OPERACIONES_LOTE:
+            raise ValueError(f"Operación no soportada: {operacion}")
+        with ExitStack() as locks:
+            # Mismo orden que eliminar(): franjas y después el lock estructural
+            for lock in self._franjas:
+                locks.enter_context(lock)
+            locks.enter_context(self._lock)
+            if operacion == 'crear':
+                return [self._crear(e.get('name', 'Unnamed')) for e in entradas]
+            if operacion == 'actualizar':
+                return [self._actualizar(e['id'], e.get('name')) for e in entradas]
+            return [self._eliminar(e['id']) for e in entradas]
+
+    def _crear(self, nombre: str) -> Dict:
+        self._ultimo_id += 1
+        item = {"id": self._ultimo_id, "name": nombre}
+        self._items[item['id']] = item
+        self._ids.append(item['id'])
+        return item
+
+    def _actualizar(self, item_id: int, nombre: Optional[str]) -> Optional[Dict]:
+        actual = self._items.get(item_id)
+        if actual is None:
+            return None
+        item = {**actual, "name": actual['name'] if nombre is None else nombre}
+        self._items[item_id] = item
+        return item
+
+    def _eliminar(self, item_id: int) -> Optional[Dict]:
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return None
+        self._eliminados += 1
+        if self._eliminados > len(self._items):
+            self._ids = list(self._items)
+            self._eliminados = 0
+        return item
+
+
+# Sentencias fijas: sqlite3 las prepara una vez y las reutiliza desde la caché de cada conexión
+_SQL_ESQUEMA = (
+    'CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS items_name ON items (name)',
+)
+_SQL_OBTENER = 'SELECT id, name FROM items WHERE id = ?'
+_SQL_LISTAR = 'SELECT id, name FROM items ORDER BY id'
+_SQL_PAGINA = 'SELECT id, name FROM items WHERE id > ? ORDER BY id LIMIT ?'
+_SQL_CONTAR = 'SELECT COUNT(*) FROM items'
+_SQL_CREAR = 'INSERT INTO items (name) VALUES (?) RETURNING id, name'
+_SQL_INICIAL = 'INSERT OR IGNORE INTO items (id, name) VALUES (?, ?)'
+_SQL_ACTUALIZAR = 'UPDATE items SET name = COALESCE(?, name) WHERE id = ? RETURNING id, name'
+_SQL_ELIMINAR = 'DELETE FROM items WHERE id = ? RETURNING id, name'
+
+
+class AlmacenItemsSQLite:
+    """
+    Items guardados en un archivo SQLite en modo WAL, compartidos por hilos y procesos.
+
+    Las conexiones salen de un pool: cada operación toma una conexión libre (o
+    abre una nueva) y la devuelve al terminar, así que las lecturas de hilos
+    distintos no se esperan entre sí ni esperan a los escritores, y el servidor
+    no deja una conexión abierta por cada hilo que atendió una petición. Se
+    conservan a lo sumo max_conexiones libres; las demás se cierran al
+    devolverse. Un proceso hijo creado con fork no usa las conexiones del padre:
+    abre las suyas. Cada escritura es una transacción; aplicar_lote escribe todo
+    el lote en una sola. Los ids son AUTOINCREMENT: como en AlmacenItems, nunca
+    se reutilizan.
+
+    Args:
+        ruta (str): Archivo de la base de datos
+        iniciales (Iterable[Dict]): Items que se insertan solo al crear la tabla
+        espera_segundos (float): Cuánto espera una escritura a que otra libere la base
+        max_conexiones (int): Conexiones libres que se conservan para reutilizar
+    """
+
+    def __init__(self, ruta: str = 'items.db', iniciales: Iterable[Dict] = (), espera_segundos: float = 30.0,
+                 max_conexiones: int = 8):
+        self.ruta = ruta
+        self.espera_segundos = espera_segundos
+        self.max_conexiones = max_conexiones
+        self._libres: List[sqlite3.Connection] = []
+        self._heredadas: List[sqlite3.Connection] = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        with self._conexion() as conexion:
+            # Varios procesos pueden abrir la misma base a la vez: BEGIN IMMEDIATE hace que
+            # solo uno a la vez compruebe si la tabla existe, la cree y la llene
+            conexion.execute('BEGIN IMMEDIATE')
+            try:
+                nueva = conexion.execute("SELECT 1 FROM sqlite_master WHERE name = 'items'").fetchone() is None
+                for sentencia in _SQL_ESQUEMA:
+                    conexion.execute(sentencia)
+                if nueva:
+                    conexion.executemany(_SQL_INICIAL, [(i['id'], i['name']) for i in iniciales])
+                conexion.execute('COMMIT')
+            except BaseException:
+                conexion.execute('ROLLBACK')
+                raise
+
+    def _abrir(self) -> sqlite3.Connection:
+        # isolation_level=None: las transacciones se abren explícitamente con BEGIN IMMEDIATE.
+        # check_same_thread=False: la conexión pasa de un hilo a otro por el pool, pero
+        # solo un hilo a la vez la usa
+        conexion = sqlite3.connect(self.ruta, timeout=self.espera_segundos, isolation_level=None,
+                                   cached_statements=32, check_same_thread=False)
+        conexion.execute('PRAGMA journal_mode=WAL')
+        conexion.execute('PRAGMA synchronous=NORMAL')
+        return conexion
+
+    @contextmanager
+    def _conexion(self) -> Iterator[sqlite3.Connection]:
+        """Conexión del pool durante el bloque with."""
+        with self._lock:
+            if os.getpid() != self._pid:
+                # Después de un fork las conexiones son del padre: no se usan ni se cierran aquí
+                self._heredadas.extend(self._libres)
+                self._libres = []
+                self._pid = os.getpid()
+            conexion = self._libres.pop() if self._libres else None
+        if conexion is None:
+            conexion = self._abrir()
+        try:
+            yield conexion
+        finally:
+            with self._lock:
+                devolver = (not conexion.in_transaction and os.getpid() == self._pid
+                            and len(self._libres) < self.max_conexiones)
+                if devolver:
+                    self._libres.append(conexion)
+            if not devolver:
+                conexion.close()
+
+    def _escribir(self, sql: str, parametros: List[tuple]) -> List[Optional[Dict]]:
+        """Ejecuta sql con cada juego de parámetros en una sola transacción."""
+        with self._conexion() as conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            try:
+                filas = [conexion.execute(sql, p).fetchone() for p in parametros]
+                conexion.execute('COMMIT')
+            except BaseException:
+                conexion.execute('ROLLBACK')
+                raise
+        return [{"id": f[0], "name": f[1]} if f is not None else None for f in filas]
+
+    def __len__(self) -> int:
+        with self._conexion() as conexion:
+            return conexion.execute(_SQL_CONTAR).fetchone()[0]
+
+    def obtener(self, item_id: int) -> Optional[Dict]:
+        with self._conexion() as conexion:
+            fila = conexion.execute(_SQL_OBTENER, (item_id,)).fetchone()
+        return {"id": fila[0], "name": fila[1]} if fila is not None else None
+
+    def listar(self) -> List[Dict]:
+        """Todos los items en orden de id."""
+        with self._conexion() as conexion:
+            return [{"id": i, "name": n} for i, n in conexion.execute(_SQL_LISTAR)]
+
+    def pagina(self, cursor: Optional[int] = None, limite: int = LIMITE_PAGINA) -> Tuple[List[Dict], Optional[int]]:
+        """Igual que AlmacenItems.pagina."""
+        if limite < 1:
+            raise ValueError("limit debe ser mayor que 0")
+        with self._conexion() as conexion:
+            filas = conexion.execute(_SQL_PAGINA, (cursor if cursor is not None else -1, limite + 1)).fetchall()
+        items = [{"id": i, "name": n} for i, n in filas[:limite]]
+        return items, (items[-1]['id'] if len(filas) > limite else None)
+
+    def crear(self, nombre: str) -> Dict:
+        return self._escribir(_SQL_CREAR, [(nombre,)])[0]
+
+    def actualizar(self, item_id: int, nombre: Optional[str] = None) -> Optional[Dict]:
+        """Cambia el nombre del item; devuelve None si no existe."""
+        return self._escribir(_SQL_ACTUALIZAR, [(nombre, item_id)])[0]
+
+    def eliminar(self, item_id: int) -> bool:
+        """Elimina el item; devuelve False si no existía."""
+        return self._escribir(_SQL_ELIMINAR, [(item_id,)])[0] is not None
+
+    def aplicar_lote(self, operacion: str, entradas: List[Dict]) -> List[Optional[Dict]]:
+        """Igual que AlmacenItems.aplicar_lote, en una sola transacción."""
+        if operacion == 'crear':
+            return self._escribir(_SQL_CREAR, [(e.get('name', 'Unnamed'),) for e in entradas])
+        if operacion == 'actualizar':
+            return self._escribir(_SQL_ACTUALIZAR, [(e.get('name'), e['id']) for e in entradas])
+        if operacion == 'eliminar':
+            return self._escribir(_SQL_ELIMINAR, [(e['id'],) for e in entradas])
+        raise ValueError(f"Operación no soportada: {operacion}")
+
+    def cerrar(self):
+        """Cierra las conexiones libres del pool (las que están en uso se cierran al devolverse)."""
+        with self._lock:
+            libres, self._libres = self._libres, []
+            self.max_conexiones = 0
+        for conexion in libres:
+            conexion.close()
+
+
+BACKENDS = {
+    'memoria': lambda iniciales, **op: AlmacenItems(iniciales),
+    'sqlite': lambda iniciales, **op: AlmacenItemsSQLite(iniciales=iniciales, **op),
+}
+
+
+def crear_almacen(backend: Optional[str] = None, iniciales: Iterable[Dict] = (), **opciones):
+    """
+    Crea el almacén de items indicado o el de ITEMS_BACKEND (ver BACKENDS).
+
+    Con 'sqlite' la ruta de la base es opciones['ruta'] o ITEMS_DB ('items.db').
+
+    Raises:
+        ValueError: Si el backend no existe
+    """
+    backend = backend or os.environ.get('ITEMS_BACKEND', 'memoria')
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de items no soportado: {backend}. Use uno de {', '.join(BACKENDS)}")
+    if backend == 'sqlite':
+        opciones.setdefault('ruta', os.environ.get('ITEMS_DB', 'items.db'))
+    return BACKENDS[backend](iniciales, **opciones)
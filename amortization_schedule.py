@@ -0,0 +1,74 @@
+import io
+import numpy as np
+from flask import Response, jsonify, request
+
+from almacen_columnar import cargar_ingerido
+from motor_prestamos import iterar_bloques_amortizacion
+
+COLUMNAS = ['Prestamo', 'Mes', 'Pago', 'Interes', 'Abono_Capital', 'Saldo']
+
+# Formato de una fila completa para np.savetxt, por formato de salida
+FORMATOS_FILA = {
+    'csv': '%d,%d,%.2f,%.2f,%.2f,%.2f',
+    'ndjson': '{"Prestamo": %d, "Mes": %d, "Pago": %.2f, "Interes": %.2f, '
+              '"Abono_Capital": %.2f, "Saldo": %.2f}',
+}
+TIPOS_CONTENIDO = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+# Límites de una petición: 50 años por préstamo y préstamos por lote
+MAX_MESES = 600
+MAX_PRESTAMOS = 100_000
+
+
+def _leer_prestamos(data):
+    """Construye las columnas de préstamos a partir del cuerpo de la petición o de loan_data.csv."""
+    if 'prestamos' not in data:
+        datos = cargar_ingerido('loan_data.csv', columnas=['Monto_Prestamo', 'Tasa_Interes_Anual', 'Tiempo_Meses'])
+        return (datos['Monto_Prestamo'].to_numpy(dtype=np.float64),
+                datos['Tasa_Interes_Anual'].to_numpy(dtype=np.float64),
+                datos['Tiempo_Meses'].to_numpy(dtype=np.int64))
+
+    prestamos = data['prestamos']
+    if not isinstance(prestamos, list) or not prestamos:
+        raise ValueError("'prestamos' debe ser una lista no vacía de {monto, tasa, meses}")
+    if len(prestamos) > MAX_PRESTAMOS:
+        raise ValueError(f"Se enviaron {len(prestamos)} préstamos; el máximo es {MAX_PRESTAMOS}")
+    monto = np.array([p['monto'] for p in prestamos], dtype=np.float64)
+    tasa = np.array([p['tasa'] for p in prestamos], dtype=np.float64)
+    meses = np.array([p['meses'] for p in prestamos], dtype=np.int64)
+    if not (np.isfinite(monto).all() and np.isfinite(tasa).all()):
+        raise ValueError('monto y tasa deben ser números finitos')
+    if (monto <= 0).any() or (tasa < 0).any() or (meses <= 0).any():
+        raise ValueError('monto y meses deben ser positivos y tasa no negativa')
+    if (meses > MAX_MESES).any():
+        raise ValueError(f'meses no puede pasar de {MAX_MESES}')
+    return monto, tasa, meses
+
+
+def amortization_schedule():
+    """
+    Transmite la tabla de amortización de uno o muchos préstamos como CSV o NDJSON.
+
+    Las filas se generan por bloques de préstamos a medida que se envían, de modo
+    que la tabla completa nunca se construye en memoria.
+    """
+    data = request.get_json(silent=True) or {}
+    formato = data.get('formato', request.args.get('formato', 'csv'))
+    if formato not in FORMATOS_FILA:
+        return jsonify({'error': f"Formato no soportado: {formato}. Use 'csv' o 'ndjson'"}), 400
+    try:
+        monto, tasa, meses = _leer_prestamos(data)
+    except KeyError as e:
+        return jsonify({'error': f"Falta el campo {e} en 'prestamos'"}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generar():
+        if formato == 'csv':
+            yield ','.join(COLUMNAS) + '\n'
+        for bloque in iterar_bloques_amortizacion(monto, tasa, meses):
+            buffer = io.StringIO()
+            np.savetxt(buffer, np.column_stack([bloque[c] for c in COLUMNAS]), fmt=FORMATOS_FILA[formato])
+            yield buffer.getvalue()
+
+    return Response(generar(), mimetype=TIPOS_CONTENIDO[formato])
@@ -1,74 +1,145 @@
-from flask import Flask, jsonify, request, send_file, send_from_directory
-import pandas as pd
-import io
+from flask import Flask, jsonify, request, send_from_directory
+import importlib
 import os
+import time
+
+from almacen_items import LIMITE_PAGINA, MAX_ID, MAX_LIMITE_PAGINA, crear_almacen, error_id, error_nombre
 
 app = Flask(__name__)
 
-# Example in-memory data
-items = [
+# Per-endpoint latency, size and in-flight metrics served on /metrics (APP_METRICS=0 turns them off)
+if os.environ.get('APP_METRICS') != '0':
+    from metricas import instrumentar
+    instrumentar(app)
+
+# Endpoint handlers are imported inside each route on first use, so starting a
+# worker only loads Flask. warm_up() imports them ahead of time instead.
+ENDPOINT_MODULES = [
+    'upload_csv_file', 'upload_xlsx_file', 'csv_summary_file', 'xlsx_summary_file',
+    'convert_csv_to_xlsx_file', 'generic_function_one', 'endpoints_mortalidad',
+    'generic_function_two', 'function_one', 'function_two', 'function_three',
+    'amortization_schedule', 'endpoints_trabajos', 'endpoints_graficos', 'function_four'
+]
+
+
+def warm_up(modules=None):
+    """Imports the endpoint modules now and returns the seconds each one took."""
+    timings = {}
+    for name in modules or ENDPOINT_MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+# Example data, in memory or in SQLite with ITEMS_BACKEND=sqlite (see almacen_items)
+items = crear_almacen(iniciales=[
     {"id": 1, "name": "Item 1"},
     {"id": 2, "name": "Item 2"}
-]
+])
 
 @app.route('/items', methods=['GET'])
 def get_items():
-    return jsonify(items)
+    """
+    Without parameters returns every item; ?limit=N&cursor=<next_cursor> returns one page.
+    With Accept: application/x-ndjson or ?format=ndjson every item is streamed, one per line.
+    """
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        from endpoints_items import items_ndjson, pide_ndjson
+        if pide_ndjson():
+            return items_ndjson(items)
+        return jsonify(items.listar())
+    try:
+        limit = min(int(request.args.get('limit', LIMITE_PAGINA)), MAX_LIMITE_PAGINA)
+        cursor = int(request.args['cursor']) if request.args.get('cursor') else None
+        if cursor is not None and not -MAX_ID - 1 <= cursor <= MAX_ID:
+            raise ValueError("cursor fuera del rango de los ids")
+        page, next_cursor = items.pagina(cursor, limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({"items": page, "next_cursor": next_cursor})
+
+@app.route('/items/bulk', methods=['POST', 'PUT', 'DELETE'])
+def items_bulk_endpoint():
+    from endpoints_items import items_bulk
+    return items_bulk(items)
+
+def _item_body():
+    """JSON object of an item request, or an error response tuple."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None, (jsonify({"error": "The body must be a JSON object"}), 400)
+    if "name" in data and error_nombre(data["name"]):
+        return None, (jsonify({"error": error_nombre(data["name"])}), 400)
+    return data, None
 
 @app.route('/items/<int:item_id>', methods=['GET'])
 def get_item(item_id):
-    item = next((item for item in items if item["id"] == item_id), None)
+    if error_id(item_id):
+        return jsonify({"error": error_id(item_id)}), 400
+    item = items.obtener(item_id)
     if item:
         return jsonify(item)
     return jsonify({"error": "Item not found"}), 404
 
 @app.route('/items', methods=['POST'])
 def create_item():
-    data = request.get_json()
-    new_id = max(item["id"] for item in items) + 1 if items else 1
-    new_item = {"id": new_id, "name": data.get("name", "Unnamed")}
-    items.append(new_item)
+    data, error = _item_body()
+    if error:
+        return error
+    new_item = items.crear(data.get("name", "Unnamed"))
     return jsonify(new_item), 201
 
 @app.route('/items/<int:item_id>', methods=['PUT'])
 def update_item(item_id):
-    data = request.get_json()
-    for item in items:
-        if item["id"] == item_id:
-            item["name"] = data.get("name", item["name"])
-            return jsonify(item)
+    if error_id(item_id):
+        return jsonify({"error": error_id(item_id)}), 400
+    data, error = _item_body()
+    if error:
+        return error
+    item = items.actualizar(item_id, data.get("name"))
+    if item:
+        return jsonify(item)
     return jsonify({"error": "Item not found"}), 404
 
 @app.route('/items/<int:item_id>', methods=['DELETE'])
 def delete_item(item_id):
-    global items
-    items = [item for item in items if item["id"] != item_id]
+    if error_id(item_id):
+        return jsonify({"error": error_id(item_id)}), 400
+    items.eliminar(item_id)
     return jsonify({"result": "Item deleted"})
 
 @app.route('/status', methods=['GET'])
 def status():
     return jsonify({"status": "API is running"})
 
-from file_endpoints import upload_csv_file, upload_xlsx_file, csv_summary_file, xlsx_summary_file, convert_csv_to_xlsx_file
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    from metricas import respuesta_metricas
+    return respuesta_metricas()
 
 @app.route('/upload/csv', methods=['POST'])
 def upload_csv():
+    from upload_csv_file import upload_csv_file
     return upload_csv_file()
 
 @app.route('/upload/xlsx', methods=['POST'])
 def upload_xlsx():
+    from upload_xlsx_file import upload_xlsx_file
     return upload_xlsx_file()
 
 @app.route('/csv/summary', methods=['POST'])
 def csv_summary():
+    from csv_summary_file import csv_summary_file
     return csv_summary_file()
 
 @app.route('/xlsx/summary', methods=['POST'])
 def xlsx_summary():
+    from xlsx_summary_file import xlsx_summary_file
     return xlsx_summary_file()
 
 @app.route('/convert/csv-to-xlsx', methods=['POST'])
 def convert_csv_to_xlsx():
+    from convert_csv_to_xlsx_file import convert_csv_to_xlsx_file
     return convert_csv_to_xlsx_file()
 
 @app.route('/interface')
@@ -84,11 +155,46 @@ def generic_one():
     from generic_function_one import generic_function_one
     return generic_function_one()
 
+@app.route('/mortalidad/max', methods=['GET'])
+def mortalidad_max_endpoint():
+    from endpoints_mortalidad import mortalidad_maxima
+    return mortalidad_maxima()
+
+@app.route('/mortalidad/consulta', methods=['GET'])
+def mortalidad_consulta_endpoint():
+    from endpoints_mortalidad import mortalidad_consulta
+    return mortalidad_consulta()
+
+@app.route('/mortalidad/<localidad>/<int:anio>', methods=['GET'])
+def mortalidad_localidad_endpoint(localidad, anio):
+    from endpoints_mortalidad import mortalidad_localidad
+    return mortalidad_localidad(localidad, anio)
+
+@app.route('/mortalidad/ranking/<int:anio>', methods=['GET'])
+def mortalidad_ranking_endpoint(anio):
+    from endpoints_mortalidad import mortalidad_ranking
+    return mortalidad_ranking(anio)
+
 @app.route('/generic/two', methods=['POST'])
 def generic_two():
     from generic_function_two import generic_function_two
     return generic_function_two()
 
+@app.route('/graficos/prestamos/<nombre>', methods=['GET'])
+def graficos_prestamos_endpoint(nombre):
+    from endpoints_graficos import grafico_prestamos
+    return grafico_prestamos(nombre)
+
+@app.route('/graficos/cache', methods=['GET'])
+def graficos_cache_endpoint():
+    from endpoints_graficos import graficos_cache
+    return graficos_cache()
+
+@app.route('/graficos/<clave>', methods=['GET'])
+def graficos_guardado_endpoint(clave):
+    from endpoints_graficos import grafico_guardado
+    return grafico_guardado(clave)
+
 @app.route('/function/one', methods=['POST'])
 def function_one_endpoint():
     from function_one import function_one
@@ -104,10 +210,51 @@ def function_three_endpoint():
     from function_three import function_three
     return function_three()
 
+@app.route('/function/three/cache', methods=['GET', 'DELETE'])
+def function_three_cache_endpoint():
+    from function_three import function_three_cache
+    return function_three_cache()
+
+@app.route('/function/three/schedule', methods=['POST'])
+def function_three_schedule_endpoint():
+    from amortization_schedule import amortization_schedule
+    return amortization_schedule()
+
+@app.route('/jobs', methods=['GET'])
+def jobs_list_endpoint():
+    from endpoints_trabajos import listar_trabajos
+    return listar_trabajos()
+
+@app.route('/jobs/<tipo>', methods=['POST'])
+def jobs_submit_endpoint(tipo):
+    from endpoints_trabajos import enviar_trabajo
+    return enviar_trabajo(tipo)
+
+@app.route('/jobs/<id_trabajo>', methods=['GET', 'DELETE'])
+def jobs_status_endpoint(id_trabajo):
+    from endpoints_trabajos import cancelar_trabajo, estado_trabajo
+    if request.method == 'DELETE':
+        return cancelar_trabajo(id_trabajo)
+    return estado_trabajo(id_trabajo)
+
+@app.route('/jobs/<id_trabajo>/result', methods=['GET'])
+def jobs_result_endpoint(id_trabajo):
+    from endpoints_trabajos import resultado_trabajo
+    return resultado_trabajo(id_trabajo)
+
 @app.route('/function/four', methods=['POST'])
 def function_four_endpoint():
     from function_four import function_four
     return function_four()
 
+@app.route('/function/four/batch', methods=['POST'])
+def function_four_batch_endpoint():
+    from function_four import function_four_batch
+    return function_four_batch()
+
+# Set APP_WARM_UP=1 to pay the import cost at startup instead of on the first requests
+if os.environ.get('APP_WARM_UP') == '1':
+    warm_up()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
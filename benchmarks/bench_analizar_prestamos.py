@@ -0,0 +1,58 @@
+"""
+Benchmark del motor vectorizado de CalculadoraPrestamos.analizar_todos_prestamos.
+
+Uso:
+    python benchmarks/bench_analizar_prestamos.py [n1 n2 ...]
+
+Por defecto mide 10^4, 10^6 y 10^7 préstamos. El recorrido fila por fila
+original solo se mide en el tamaño más pequeño como referencia.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from benchmarks.datos_sinteticos import generar_prestamos
+from function_three import CalculadoraPrestamos
+from motor_prestamos import analizar_prestamos
+
+
+def analizar_fila_por_fila(calculadora, datos):
+    """Recorrido original con iterrows, usado como referencia."""
+    resultados = []
+    for _, row in datos.iterrows():
+        pago = calculadora.calcular_pago_mensual(
+            row['Monto_Prestamo'], row['Tasa_Interes_Anual'], row['Tiempo_Meses'])
+        calculo = calculadora.calcular_interes_compuesto(
+            row['Monto_Prestamo'], row['Tasa_Interes_Anual'], row['Tiempo_Meses'])
+        resultados.append((pago, pago * row['Tiempo_Meses'], calculo['monto_final'],
+                           calculo['diferencia_compuesto_simple']))
+    return np.array(resultados)
+
+
+def medir(n: int, referencia: bool):
+    datos = generar_prestamos(n)
+    inicio = time.perf_counter()
+    resultado = analizar_prestamos(datos)
+    segundos = time.perf_counter() - inicio
+    linea = f"{n:>12,} préstamos  {segundos:8.3f} s  {n / segundos:>14,.0f} préstamos/s"
+
+    if referencia:
+        calculadora = CalculadoraPrestamos()
+        inicio = time.perf_counter()
+        esperado = analizar_fila_por_fila(calculadora, datos)
+        segundos_ref = time.perf_counter() - inicio
+        obtenido = resultado[['Pago_Mensual', 'Costo_Total', 'Monto_Final_Compuesto',
+                              'Diferencia_Simple_Compuesto']].to_numpy()
+        assert np.allclose(obtenido, esperado, rtol=1e-9), "El motor vectorizado no coincide"
+        linea += f"  (iterrows: {n / segundos_ref:,.0f} préstamos/s, x{segundos_ref / segundos:,.0f})"
+    print(linea)
+
+
+if __name__ == '__main__':
+    tamanos = [int(float(a)) for a in sys.argv[1:]] or [10**4, 10**6, 10**7]
+    for i, n in enumerate(tamanos):
+        medir(n, referencia=(i == 0 and n <= 10**5))
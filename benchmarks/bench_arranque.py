@@ -0,0 +1,104 @@
+"""
+Arranque en frío de app.py y reporte de tiempo de importación por módulo.
+
+Uso:
+    python benchmarks/bench_arranque.py [--repeticiones N] [--objetivo SEGUNDOS] [--top N]
+
+Cada medición corre en un proceso nuevo de Python:
+
+- Arranque en frío: importar app y atender GET /status con el cliente de pruebas.
+  Se reporta la mediana de N repeticiones y el script termina con código 1 si
+  supera el objetivo (0.5 s por defecto).
+- Reporte por módulo: el costo de importar cada módulo de app.ENDPOINT_MODULES
+  después de app, es decir, lo que paga la primera petición a ese endpoint (o
+  app.warm_up() si se precarga).
+- Los módulos más costosos dentro de "import app" según python -X importtime.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+
+ARRANQUE = """
+import time
+inicio = time.perf_counter()
+import app
+respuesta = app.app.test_client().get('/status')
+assert respuesta.status_code == 200
+print(time.perf_counter() - inicio)
+"""
+
+IMPORTAR_MODULO = """
+import time
+import app
+inicio = time.perf_counter()
+app.warm_up([{modulo!r}])
+print(time.perf_counter() - inicio)
+"""
+
+
+def ejecutar(codigo: str, *opciones: str) -> subprocess.CompletedProcess:
+    # Sin APP_WARM_UP, para medir el arranque sin precarga
+    entorno = {k: v for k, v in os.environ.items() if k != 'APP_WARM_UP'}
+    return subprocess.run([sys.executable, *opciones, '-c', codigo], cwd=RAIZ, env=entorno,
+                          capture_output=True, text=True, check=True)
+
+
+def arranque_en_frio(repeticiones: int) -> float:
+    tiempos = [float(ejecutar(ARRANQUE).stdout) for _ in range(repeticiones)]
+    return statistics.median(tiempos)
+
+
+def costo_por_modulo():
+    from app import ENDPOINT_MODULES
+    costos = {}
+    for modulo in ENDPOINT_MODULES:
+        try:
+            costos[modulo] = float(ejecutar(IMPORTAR_MODULO.format(modulo=modulo)).stdout)
+        except subprocess.CalledProcessError as e:
+            costos[modulo] = e.stderr.strip().splitlines()[-1]
+    return costos
+
+
+def importtime_app(top: int):
+    """Módulos con mayor tiempo acumulado al importar app (python -X importtime)."""
+    salida = ejecutar('import app', '-X', 'importtime').stderr
+    filas = []
+    for linea in salida.splitlines():
+        campos = linea[len('import time:'):].split('|')
+        if not linea.startswith('import time:') or not campos[0].strip().isdigit():
+            continue
+        filas.append((int(campos[1]), int(campos[0]), campos[2].strip()))
+    return sorted(filas, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--objetivo', type=float, default=0.5, help='Máximo de la mediana en segundos')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    print("Módulos más costosos en 'import app' (acumulado, propio):")
+    for acumulado, propio, nombre in importtime_app(args.top):
+        print(f"  {acumulado / 1e3:9.1f} ms  {propio / 1e3:8.1f} ms  {nombre}")
+
+    print("\nCosto de la primera importación de cada endpoint:")
+    costos = costo_por_modulo()
+    for modulo, costo in sorted(costos.items(), key=lambda m: -m[1] if isinstance(m[1], float) else 0):
+        print(f"  {costo * 1e3:9.1f} ms  {modulo}" if isinstance(costo, float) else f"  {'error':>12}  {modulo}: {costo}")
+
+    mediana = arranque_en_frio(args.repeticiones)
+    print(f"\nArranque en frío (import app + GET /status): mediana {mediana:.3f} s "
+          f"en {args.repeticiones} repeticiones, objetivo {args.objetivo:.3f} s")
+    if mediana > args.objetivo:
+        print("El arranque en frío supera el objetivo")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
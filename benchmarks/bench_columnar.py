@@ -0,0 +1,90 @@
+"""
+Benchmark de carga de préstamos desde CSV frente al almacén columnar.
+
+Uso:
+    python benchmarks/bench_columnar.py [n1 n2 ...]
+
+Por defecto mide 10^5 y 10^6 préstamos con el esquema de loan_data.csv. Cada
+lectura corre en un proceso nuevo y reporta su tiempo y el aumento de memoria
+residente máxima que produjo:
+
+- csv: pd.read_csv del archivo completo, como hacía cargar_datos.
+- ingesta: primera llamada a cargar_ingerido (interpreta el CSV y guarda las columnas).
+- columnar: cargar_ingerido con la tabla ya ingerida (columnas con memmap).
+- numericas: solo Monto_Prestamo, Tasa_Interes_Anual y Tiempo_Meses, como
+  amortization_schedule.
+- resumen csv / resumen columnar: el resumen de /csv/summary desde el CSV y
+  desde la tabla ingerida.
+
+En las lecturas columnares la memoria incluye las páginas de los archivos
+mapeados con memmap, que son caché de disco compartida entre procesos.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, RAIZ)
+
+from benchmarks.datos_sinteticos import generar_prestamos
+
+# VmHWM (pico de memoria residente del proceso) en lugar de ru_maxrss, que en
+# Linux arrastra el pico del proceso padre
+PLANTILLA = """
+import time
+def pico():
+    with open('/proc/self/status') as f:
+        return next(int(l.split()[1]) for l in f if l.startswith('VmHWM'))
+import numpy as np, pandas as pd
+from almacen_columnar import cargar_ingerido, directorio_ingesta, iterar_bloques
+from csv_summary_file import CHUNK_ROWS, summarize_csv
+from streaming_summary import summarize_chunks
+base = pico()
+inicio = time.perf_counter()
+{codigo}
+print(time.perf_counter() - inicio, (pico() - base) / 1024)
+"""
+
+LECTURAS = {
+    'csv': "df = pd.read_csv(RUTA); float(df['Monto_Prestamo'].sum())",
+    'ingesta': "df = cargar_ingerido(RUTA); float(df['Monto_Prestamo'].sum())",
+    'columnar': "df = cargar_ingerido(RUTA); float(df['Monto_Prestamo'].sum())",
+    'numericas': "df = cargar_ingerido(RUTA, columnas=['Monto_Prestamo', 'Tasa_Interes_Anual', "
+                 "'Tiempo_Meses']); float(df['Monto_Prestamo'].sum())",
+    'resumen csv': "summarize_csv(RUTA)",
+    'resumen columnar': "summarize_chunks(iterar_bloques(directorio_ingesta(RUTA), CHUNK_ROWS))",
+}
+# Lectura -> lectura con la que se compara
+COMPARAR = {'columnar': 'csv', 'numericas': 'csv', 'resumen columnar': 'resumen csv'}
+
+
+def ejecutar(codigo: str, ruta: str, directorio: str):
+    entorno = dict(os.environ, COLUMNAR_DIR=directorio)
+    programa = f"RUTA = {ruta!r}\n" + PLANTILLA.format(codigo=codigo)
+    salida = subprocess.run([sys.executable, '-c', programa], cwd=RAIZ, env=entorno,
+                            capture_output=True, text=True, check=True).stdout
+    segundos, megabytes = salida.split()
+    return float(segundos), float(megabytes)
+
+
+def medir(n: int):
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'prestamos.csv')
+        generar_prestamos(n).to_csv(ruta, index=False)
+        tamano = os.path.getsize(ruta) / 2**20
+        print(f"{n:,} préstamos ({tamano:.1f} MB de CSV)")
+        tiempos = {}
+        for nombre, codigo in LECTURAS.items():
+            segundos, megabytes = ejecutar(codigo, ruta, os.path.join(directorio, 'columnar'))
+            tiempos[nombre] = segundos
+            linea = f"  {nombre:<17} {segundos:8.3f} s  {megabytes:8.1f} MB"
+            if nombre in COMPARAR:
+                linea += f"  x{tiempos[COMPARAR[nombre]] / segundos:.1f} frente a {COMPARAR[nombre]}"
+            print(linea)
+
+
+if __name__ == '__main__':
+    tamanos = [int(float(n)) for n in sys.argv[1:]] or [10**5, 10**6]
+    for n in tamanos:
+        medir(n)
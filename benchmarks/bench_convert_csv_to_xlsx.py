@@ -0,0 +1,45 @@
+"""
+Benchmark de la conversión CSV→XLSX por bloques (stream_convert.csv_to_xlsx).
+
+Uso:
+    python benchmarks/bench_convert_csv_to_xlsx.py [n1 n2 ...]
+
+Por defecto mide 10^4, 10^5 y 10^6 filas con el esquema de loan_data.csv. En
+el tamaño más pequeño también mide la conversión original (pandas + BytesIO).
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pandas as pd
+
+from benchmarks.datos_sinteticos import generar_prestamos
+from stream_convert import csv_to_xlsx
+
+
+def medir(n: int, referencia: bool):
+    with tempfile.TemporaryDirectory() as directorio:
+        origen = os.path.join(directorio, 'prestamos.csv')
+        generar_prestamos(n).to_csv(origen, index=False)
+
+        with tempfile.TemporaryFile() as destino:
+            resultado = csv_to_xlsx(origen, destino)
+        linea = (f"{n:>10,} filas  {resultado['seconds']:8.2f} s  "
+                 f"{n / resultado['seconds']:>10,.0f} filas/s  {resultado['sheets']} hoja(s)")
+
+        if referencia:
+            inicio = time.perf_counter()
+            pd.read_csv(origen).to_excel(io.BytesIO(), index=False, engine='openpyxl')
+            segundos = time.perf_counter() - inicio
+            linea += f"  (pandas + BytesIO: {n / segundos:,.0f} filas/s)"
+    print(linea)
+
+
+if __name__ == '__main__':
+    tamanos = [int(float(a)) for a in sys.argv[1:]] or [10**4, 10**5, 10**6]
+    for i, n in enumerate(tamanos):
+        medir(n, referencia=(i == 0))
@@ -0,0 +1,89 @@
+"""
+Benchmark de almacen_items.AlmacenItems frente a la lista que usaba /items.
+
+Uso:
+    python benchmarks/bench_items.py [max_items] [escritores]
+
+Para 10^3, 10^4, ... hasta max_items (10^6 por defecto) llena el almacén y mide
+el tiempo medio de obtener un id al azar y de pedir una página de 100 items
+desde un cursor al azar, mientras `escritores` hilos (4 por defecto) crean,
+actualizan y eliminan items sin parar. Al final comprueba que no se perdió
+ninguna escritura. La lista se mide con la búsqueda lineal que hacía get_item,
+sin escritores y solo hasta 10^5 items.
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from almacen_items import AlmacenItems
+
+CONSULTAS = 20_000
+MAX_ITEMS_LISTA = 10**5
+
+
+def escritor(almacen: AlmacenItems, detener: threading.Event, conteo: list):
+    creados = eliminados = 0
+    azar = random.Random()
+    while not detener.is_set():
+        item = almacen.crear('nuevo')
+        creados += 1
+        almacen.actualizar(azar.randint(1, item['id']), 'actualizado')
+        if almacen.eliminar(item['id'] - azar.randint(0, 10)):
+            eliminados += 1
+    conteo.append((creados, eliminados))
+
+
+def medir_almacen(n: int, escritores: int):
+    almacen = AlmacenItems({"id": i, "name": f"Item {i}"} for i in range(1, n + 1))
+    ids = [random.randint(1, n) for _ in range(CONSULTAS)]
+    detener, conteo = threading.Event(), []
+    hilos = [threading.Thread(target=escritor, args=(almacen, detener, conteo)) for _ in range(escritores)]
+    for hilo in hilos:
+        hilo.start()
+
+    inicio = time.perf_counter()
+    for item_id in ids:
+        almacen.obtener(item_id)
+    obtener = (time.perf_counter() - inicio) / CONSULTAS
+    inicio = time.perf_counter()
+    for item_id in ids[:CONSULTAS // 10]:
+        almacen.pagina(item_id, 100)
+    pagina = (time.perf_counter() - inicio) / (CONSULTAS // 10)
+
+    detener.set()
+    for hilo in hilos:
+        hilo.join()
+    creados = sum(c for c, _ in conteo)
+    eliminados = sum(e for _, e in conteo)
+    assert len(almacen) == n + creados - eliminados, "Se perdieron escrituras"
+    assert len({item['id'] for item in almacen.listar()}) == len(almacen)
+    return obtener, pagina, creados + eliminados
+
+
+def medir_lista(n: int):
+    items = [{"id": i, "name": f"Item {i}"} for i in range(1, n + 1)]
+    consultas = max(10, CONSULTAS * 1000 // n)
+    ids = [random.randint(1, n) for _ in range(consultas)]
+    inicio = time.perf_counter()
+    for item_id in ids:
+        next((item for item in items if item["id"] == item_id), None)
+    return (time.perf_counter() - inicio) / consultas
+
+
+if __name__ == '__main__':
+    maximo = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+    escritores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print(f"{escritores} escritores concurrentes; tiempos medios por operación")
+    n = 1000
+    while n <= maximo:
+        obtener, pagina, escrituras = medir_almacen(n, escritores)
+        linea = f"{n:>10,} items  obtener {obtener * 1e6:7.2f} µs  página {pagina * 1e6:8.2f} µs" \
+                f"  ({escrituras:,} escrituras)"
+        if n <= MAX_ITEMS_LISTA:
+            linea += f"  lista {medir_lista(n) * 1e6:10.1f} µs"
+        print(linea)
+        n *= 10
@@ -0,0 +1,86 @@
+"""
+Benchmark de sincronizar items uno por uno frente a /items/bulk.
+
+Uso:
+    python benchmarks/bench_items_lote.py [n]
+
+Sincroniza n items (10^5 por defecto): los crea, actualiza y elimina con
+peticiones individuales y con lotes de 10^4 y de n entradas en JSON y NDJSON,
+todo con el cliente de pruebas de Flask, así que no incluye la latencia de red
+que cada petición individual pagaría además. Las peticiones individuales se
+miden sobre una muestra y se extrapolan a n. Al final compara GET /items como
+JSON y como NDJSON con los n items cargados.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from almacen_items import AlmacenItems
+from endpoints_items import MAX_LOTE
+
+MUESTRA_INDIVIDUAL = 2_000
+
+
+def individual(cliente, n: int):
+    muestra = min(n, MUESTRA_INDIVIDUAL)
+    inicio = time.perf_counter()
+    ids = [cliente.post('/items', json={'name': f'Item {i}'}).json['id'] for i in range(muestra)]
+    for item_id in ids:
+        cliente.put(f'/items/{item_id}', json={'name': 'actualizado'})
+    for item_id in ids:
+        cliente.delete(f'/items/{item_id}')
+    return (time.perf_counter() - inicio) * n / muestra, 3 * n
+
+
+def en_lotes(cliente, n: int, tamano: int, ndjson: bool):
+    peticiones = 0
+
+    def enviar(metodo, entradas):
+        nonlocal peticiones
+        peticiones += 1
+        if ndjson:
+            cuerpo = '\n'.join(json.dumps(e) for e in entradas)
+            respuesta = cliente.open('/items/bulk', method=metodo, data=cuerpo, content_type='application/x-ndjson')
+            return json.loads('[' + ','.join(respuesta.get_data(as_text=True).splitlines()) + ']')
+        return cliente.open('/items/bulk', method=metodo, json=entradas).json['results']
+
+    inicio = time.perf_counter()
+    ids = []
+    for desde in range(0, n, tamano):
+        hasta = min(n, desde + tamano)
+        ids += [r['item']['id'] for r in enviar('POST', [{'name': f'Item {i}'} for i in range(desde, hasta)])]
+    for desde in range(0, n, tamano):
+        enviar('PUT', [{'id': i, 'name': 'actualizado'} for i in ids[desde:desde + tamano]])
+    for desde in range(0, n, tamano):
+        resultados = enviar('DELETE', ids[desde:desde + tamano])
+        assert all(r['status'] == 200 for r in resultados)
+    return time.perf_counter() - inicio, peticiones
+
+
+def listar(cliente, n: int):
+    import app
+    app.items = AlmacenItems({"id": i, "name": f"Item {i}"} for i in range(1, n + 1))
+    for nombre, cabeceras in (('JSON', {}), ('NDJSON', {'Accept': 'application/x-ndjson'})):
+        inicio = time.perf_counter()
+        cuerpo = cliente.get('/items', headers=cabeceras).get_data()
+        segundos = time.perf_counter() - inicio
+        print(f"  GET /items {nombre:<7} {segundos:8.3f} s  {len(cuerpo) / 2**20:7.1f} MB")
+
+
+if __name__ == '__main__':
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**5
+    os.environ['APP_METRICS'] = '0'
+    from app import app
+    cliente = app.test_client()
+    print(f"Sincronizar {n:,} items (crear, actualizar y eliminar)")
+    segundos, peticiones = individual(cliente, n)
+    print(f"  {'individual':<22} {segundos:8.2f} s  {peticiones:>8,} peticiones  (extrapolado)")
+    for tamano in (10**4, min(n, MAX_LOTE)):
+        for ndjson in (False, True):
+            segundos, peticiones = en_lotes(cliente, n, tamano, ndjson)
+            formato = 'NDJSON' if ndjson else 'JSON'
+            print(f"  {f'lotes de {tamano:,} {formato}':<22} {segundos:8.2f} s  {peticiones:>8,} peticiones")
+    listar(cliente, n)
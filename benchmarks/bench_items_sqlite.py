@@ -0,0 +1,112 @@
+"""
+Benchmark de carga de AlmacenItemsSQLite con varios workers.
+
+Uso:
+    python benchmarks/bench_items_sqlite.py [max_workers] [segundos]
+
+Crea una base con 10^5 items y para 1, 2, 4, ... hasta max_workers procesos
+(os.cpu_count() por defecto, mínimo 4) hace correr a todos a la vez contra el
+mismo archivo durante `segundos` (3 por defecto) con tres cargas:
+
+- lectura: obtener un id al azar.
+- mixta: 90 % lecturas y 10 % escrituras (crear o actualizar un item).
+- escritura: crear o actualizar, una transacción por escritura.
+
+Reporta las operaciones por segundo sumadas de todos los workers. Al final mide
+las escrituras en lotes de 1.000 por transacción y, como referencia, el
+almacén en memoria en un solo proceso.
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from almacen_items import AlmacenItems, AlmacenItemsSQLite
+
+N_ITEMS = 10**5
+CARGAS = {'lectura': 0.0, 'mixta': 0.1, 'escritura': 1.0}
+TAMANO_LOTE = 1_000
+
+
+def operar(almacen, fraccion_escrituras: float, segundos: float):
+    """Lecturas y escrituras (en ese orden) hechas durante `segundos`."""
+    azar = random.Random()
+    lecturas = escrituras = 0
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        for _ in range(100):
+            if azar.random() < fraccion_escrituras:
+                if azar.random() < 0.5:
+                    almacen.crear('nuevo')
+                else:
+                    almacen.actualizar(azar.randint(1, N_ITEMS), 'actualizado')
+                escrituras += 1
+            else:
+                almacen.obtener(azar.randint(1, N_ITEMS))
+                lecturas += 1
+    return lecturas, escrituras
+
+
+def worker(ruta: str, fraccion_escrituras: float, segundos: float, inicio, salida):
+    almacen = AlmacenItemsSQLite(ruta)
+    inicio.wait()
+    salida.put(operar(almacen, fraccion_escrituras, segundos))
+    almacen.cerrar()
+
+
+def medir_carga(ruta: str, workers: int, fraccion_escrituras: float, segundos: float):
+    contexto = multiprocessing.get_context('spawn')
+    inicio, salida = contexto.Barrier(workers + 1), contexto.Queue()
+    procesos = [contexto.Process(target=worker, args=(ruta, fraccion_escrituras, segundos, inicio, salida))
+                for _ in range(workers)]
+    for proceso in procesos:
+        proceso.start()
+    inicio.wait()
+    resultados = [salida.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+    return sum(r for r, _ in resultados) / segundos, sum(w for _, w in resultados) / segundos
+
+
+def cantidades_workers(maximo: int):
+    cantidades = [1]
+    while cantidades[-1] * 2 <= maximo:
+        cantidades.append(cantidades[-1] * 2)
+    if cantidades[-1] != maximo:
+        cantidades.append(maximo)
+    return cantidades
+
+
+def medir_lotes(ruta: str, n: int = 50_000):
+    almacen = AlmacenItemsSQLite(ruta)
+    inicio = time.perf_counter()
+    for _ in range(n // TAMANO_LOTE):
+        almacen.aplicar_lote('crear', [{'name': 'lote'}] * TAMANO_LOTE)
+    segundos = time.perf_counter() - inicio
+    almacen.cerrar()
+    return n / segundos
+
+
+if __name__ == '__main__':
+    maximo = int(sys.argv[1]) if len(sys.argv) > 1 else max(4, os.cpu_count() or 1)
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'items.db')
+        AlmacenItemsSQLite(ruta, [{"id": i, "name": f"Item {i}"} for i in range(1, N_ITEMS + 1)]).cerrar()
+        print(f"SQLite WAL, {N_ITEMS:,} items, {os.cpu_count()} CPU; operaciones por segundo de todos los workers")
+        for carga, fraccion in CARGAS.items():
+            for workers in cantidades_workers(maximo):
+                lecturas, escrituras = medir_carga(ruta, workers, fraccion, segundos)
+                print(f"  {carga:<10} {workers:>2} workers  lecturas {lecturas:>10,.0f}/s"
+                      f"  escrituras {escrituras:>9,.0f}/s")
+        print(f"  escrituras en lotes de {TAMANO_LOTE:,}: {medir_lotes(ruta):>12,.0f} items/s")
+
+    memoria = AlmacenItems({"id": i, "name": f"Item {i}"} for i in range(1, N_ITEMS + 1))
+    for carga, fraccion in CARGAS.items():
+        lecturas, escrituras = operar(memoria, fraccion, segundos)
+        print(f"  memoria {carga:<10} 1 proceso  lecturas {lecturas / segundos:>10,.0f}/s"
+              f"  escrituras {escrituras / segundos:>9,.0f}/s")
@@ -0,0 +1,89 @@
+"""
+Benchmark de motor_traduccion.MotorTraduccion.
+
+Uso:
+    python benchmarks/bench_motor_traduccion.py [max_frases]
+
+Genera diccionarios sintéticos de 10^3 hasta max_frases frases (10^6 por
+defecto) de 1 a 4 palabras y, para cada uno, mide el tiempo de compilarlo, de
+leerlo y compilarlo desde un TSV y de traducir el mismo texto de 1.000 palabras: el tiempo
+de traducción debe mantenerse plano. Después traduce textos de 10^2 a 10^5
+palabras con el diccionario de 10^5 frases, donde debe crecer en proporción al
+largo. Como referencia mide la búsqueda ingenua (str.replace de cada frase).
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from motor_traduccion import MotorTraduccion, leer_diccionario
+
+VOCABULARIO = [f'w{i}' for i in range(20_000)]
+MAX_FRASES_INGENUO = 10**4
+
+
+def generar_diccionario(n: int, azar: random.Random):
+    frases = {}
+    while len(frases) < n:
+        frase = ' '.join(azar.choices(VOCABULARIO, k=azar.randint(1, 4)))
+        frases[frase] = frase.upper()
+    return frases
+
+
+def generar_texto(palabras: int, azar: random.Random):
+    return ' '.join(azar.choices(VOCABULARIO, k=palabras)) + '.'
+
+
+def cronometrar(funcion, repeticiones: int = 5):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def ingenuo(frases, texto):
+    for origen in sorted(frases, key=len, reverse=True):
+        texto = texto.replace(origen, frases[origen])
+    return texto
+
+
+if __name__ == '__main__':
+    maximo = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+    azar = random.Random(0)
+    texto = generar_texto(1000, azar)
+    motor_100k = None
+    print("Texto de 1.000 palabras con diccionarios crecientes")
+    with tempfile.TemporaryDirectory() as directorio:
+        n = 1000
+        while n <= maximo:
+            frases = generar_diccionario(n, azar)
+            inicio = time.perf_counter()
+            motor = MotorTraduccion(frases)
+            compilar = time.perf_counter() - inicio
+            ruta = os.path.join(directorio, f'frases_{n}.tsv')
+            with open(ruta, 'w', encoding='utf-8') as f:
+                f.writelines(f'{o}\t{t}\n' for o, t in frases.items())
+            inicio = time.perf_counter()
+            MotorTraduccion(leer_diccionario(ruta))
+            cargar = time.perf_counter() - inicio
+            traducir = cronometrar(lambda: motor.traducir(texto))
+            linea = f"  {n:>9,} frases  compilar {compilar:7.3f} s  cargar TSV {cargar:7.3f} s" \
+                    f"  traducir {traducir * 1e3:7.3f} ms"
+            if n <= MAX_FRASES_INGENUO:
+                linea += f"  ingenuo {cronometrar(lambda: ingenuo(frases, texto), 1) * 1e3:9.1f} ms"
+            print(linea)
+            if n == 10**5:
+                motor_100k = motor
+            n *= 10
+
+    if motor_100k is not None:
+        print("Textos crecientes con el diccionario de 10^5 frases")
+        for palabras in (10**2, 10**3, 10**4, 10**5):
+            largo = generar_texto(palabras, azar)
+            segundos = cronometrar(lambda: motor_100k.traducir(largo), 3)
+            print(f"  {palabras:>9,} palabras  {segundos * 1e3:9.3f} ms  {segundos / palabras * 1e6:6.2f} µs/palabra")
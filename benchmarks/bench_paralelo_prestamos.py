@@ -0,0 +1,55 @@
+"""
+Benchmark de escalamiento de paralelo_prestamos.evaluar_en_paralelo de 1 a N procesos.
+
+Uso:
+    python benchmarks/bench_paralelo_prestamos.py [n] [max_procesos]
+
+Por defecto evalúa 10^7 préstamos con las tareas por defecto (análisis, cambios
+de tasa, prepago y refinanciamiento) con 1, 2, 4, ... procesos hasta
+os.cpu_count(). El arranque del pool se excluye de la medición y se comprueba
+que todos los resultados sean idénticos al de un solo proceso.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.datos_sinteticos import generar_prestamos
+from paralelo_prestamos import EvaluadorParalelo
+
+
+def cantidades_procesos(maximo: int):
+    cantidades = [1]
+    while cantidades[-1] * 2 <= maximo:
+        cantidades.append(cantidades[-1] * 2)
+    if cantidades[-1] != maximo:
+        cantidades.append(maximo)
+    return cantidades
+
+
+def medir(n: int, maximo: int):
+    datos = generar_prestamos(n)
+    referencia = None
+    base = None
+    for procesos in cantidades_procesos(maximo):
+        with EvaluadorParalelo(procesos) as evaluador:
+            # Arranca los procesos del pool antes de medir
+            evaluador.evaluar(datos.head(1000))
+            inicio = time.perf_counter()
+            resultado = evaluador.evaluar(datos)
+            segundos = time.perf_counter() - inicio
+
+        serializado = json.dumps(resultado, sort_keys=True, default=str)
+        if referencia is None:
+            referencia, base = serializado, segundos
+        assert serializado == referencia, f"El resultado con {procesos} procesos no coincide"
+        print(f"{procesos:>3} procesos  {segundos:8.3f} s  {n / segundos:>14,.0f} préstamos/s"
+              f"  aceleración x{base / segundos:.2f}")
+
+
+if __name__ == '__main__':
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**7
+    maximo = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    medir(n, maximo)
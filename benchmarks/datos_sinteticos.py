@@ -0,0 +1,88 @@
+"""Generadores de datos sintéticos con el esquema de los archivos del proyecto."""
+import numpy as np
+import pandas as pd
+
+
+PROPOSITOS = ['Préstamo de Vehículo', 'Hipoteca', 'Préstamo Estudiantil',
+              'Mejoras del Hogar', 'Préstamo Personal', 'Consolidación de Deudas']
+
+PLAZOS = np.array([12, 24, 36, 48, 60, 84, 120, 180, 240, 360])
+
+
+def generar_prestamos(n: int, semilla: int = 0) -> pd.DataFrame:
+    """
+    Genera n préstamos con el esquema de loan_data.csv.
+
+    Aproximadamente el 1% de los préstamos tiene tasa cero para ejercitar
+    ese caso especial de la fórmula PMT.
+    """
+    rng = np.random.default_rng(semilla)
+    tasa = np.round(rng.uniform(2.0, 12.0, n), 1)
+    tasa[rng.random(n) < 0.01] = 0.0
+    return pd.DataFrame({
+        'Nombre': np.char.add('Cliente ', np.arange(n).astype(str)),
+        'Edad': rng.integers(18, 75, n),
+        'Monto_Prestamo': np.round(rng.uniform(5e6, 1.5e9, n), -3),
+        'Tasa_Interes_Anual': tasa,
+        'Tiempo_Meses': rng.choice(PLAZOS, n),
+        'Proposito': rng.choice(PROPOSITOS, n),
+    })
+
+
+LOCALIDADES = ['Usaquén', 'Chapinero', 'Santa Fe', 'San Cristóbal', 'Usme', 'Tunjuelito', 'Bosa',
+               'Kennedy', 'Fontibón', 'Engativá', 'Suba', 'Barrios Unidos', 'Teusaquillo',
+               'Los Mártires', 'Antonio Nariño', 'Puente Aranda', 'La Candelaria',
+               'Rafael Uribe Uribe', 'Ciudad Bolívar', 'Sumapaz']
+
+
+def generar_mortalidad(n: int, semilla: int = 0) -> pd.DataFrame:
+    """
+    Genera n filas con el esquema de osb_mortalidad_dnt.csv: las 20 localidades y
+    una fila de Distrito por año, desde 2006. El último año queda como preliminar.
+    """
+    rng = np.random.default_rng(semilla)
+    por_anio = len(LOCALIDADES) + 1
+    fila = np.arange(n)
+    posicion = fila % por_anio
+    anio = 2006 + fila // por_anio
+    es_distrito = posicion == len(LOCALIDADES)
+    poblacion = rng.integers(300, 90_000, n)
+    muertes = rng.poisson(2, n)
+    tasa = np.round(muertes / poblacion * 1e5, 1)
+    texto_anio = anio.astype(str).astype(object)
+    texto_anio[anio == anio[-1]] += ' p '
+    return pd.DataFrame({
+        'Cod': np.where(es_distrito, '', (posicion + 1).astype(str)),
+        'Localidad': np.where(es_distrito, 'Distrito', np.array(LOCALIDADES + [''])[posicion]),
+        'Año': texto_anio,
+        'Muertes': muertes,
+        'Proyección poblacional': poblacion,
+        'Tasa': tasa,
+    })
+
+
+def escribir_mortalidad(datos: pd.DataFrame, ruta: str):
+    """Escribe la mortalidad como el archivo original: ';', coma decimal y Latin-1."""
+    datos.to_csv(ruta, sep=';', decimal=',', index=False, encoding='latin-1')
+
+
+DEPARTAMENTOS = pd.DataFrame({
+    'iddepto': [5, 8, 11, 13, 15, 17, 19, 23, 25, 41, 47, 50, 52, 54, 63, 66, 68, 73, 76],
+    'departamento': ['Antioquia', 'Atlántico', 'Bogotá D.C.', 'Bolívar', 'Boyacá', 'Caldas', 'Cauca',
+                     'Córdoba', 'Cundinamarca', 'Huila', 'Magdalena', 'Meta', 'Nariño',
+                     'Norte de Santander', 'Quindío', 'Risaralda', 'Santander', 'Tolima',
+                     'Valle del Cauca'],
+})
+
+
+def generar_hurtos(n: int, semilla: int = 0) -> pd.DataFrame:
+    """Genera n hurtos con las columnas que usa generic_function_two (fechas en dd/mm/aaaa)."""
+    rng = np.random.default_rng(semilla)
+    fechas = pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 14 * 365, n), unit='D')
+    return pd.DataFrame({
+        'COD_DEPTO': rng.choice(DEPARTAMENTOS['iddepto'].to_numpy(), n),
+        'FECHA HECHO': fechas.strftime('%d/%m/%Y'),
+        'ARMAS MEDIOS': rng.choice(['ARMA BLANCA', 'ARMA DE FUEGO', 'SIN EMPLEO DE ARMAS'], n),
+        'CANTIDAD': rng.integers(1, 5, n),
+    })
+
@@ -0,0 +1,514 @@
+"""
+Suite de benchmarks de los endpoints de app.py y de los métodos de CalculadoraPrestamos.
+
+Uso:
+    python benchmarks/suite.py [--tamanos 1e3 1e4 1e5] [--casos PATRON ...] [--repeticiones N]
+                               [--umbral 0.25] [--base ARCHIVO] [--guardar-base] [--listar]
+
+Para cada tamaño se generan datos sintéticos con el esquema de loan_data.csv,
+osb_mortalidad_dnt.csv y de los hurtos de generic_function_two (10^3 a 10^7
+filas) en un directorio temporal, que pasa a ser el directorio de trabajo: los
+endpoints leen de ahí loan_data.csv y las fuentes de hurtos se apuntan a
+archivos locales, así que nada sale a la red.
+
+Cada caso se ejecuta N veces y se reporta la primera ejecución (cachés frías),
+la mediana de las demás y el pico de memoria de Python de una ejecución más con tracemalloc
+(no incluye la memoria de procesos hijos, como los de /jobs o analisis_paralelo).
+Los casos que no dependen del tamaño de los datos se miden una sola vez, y los
+que tienen límite de filas (los de Excel, la matriz de saldos) se omiten por
+encima de él.
+
+La mediana y el pico se comparan con la línea base (benchmarks/linea_base.json
+por defecto): un caso es una regresión si empeora más que el umbral relativo y
+más que un mínimo absoluto (--minimo-segundos, --minimo-mb), y en ese caso el
+script termina con código 1. --guardar-base reemplaza en la línea base los
+casos medidos.
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.datos_sinteticos import (
+    DEPARTAMENTOS, escribir_mortalidad, generar_hurtos, generar_mortalidad, generar_prestamos
+)
+
+BASE_POR_DEFECTO = os.path.join(RAIZ, 'benchmarks', 'linea_base.json')
+TAMANOS_POR_DEFECTO = [10**3, 10**4, 10**5]
+# Casos de Excel: openpyxl escribe y lee unas 10^4 filas por segundo
+MAX_FILAS_EXCEL = 10**5
+# Acciones de POST /function/three (sin 'exportar', que escribe un CSV por petición)
+ACCIONES_SERVICIO = ['analisis', 'escenarios', 'resumen']
+
+
+class Caso:
+    """
+    Un benchmark: preparar(contexto) devuelve la función sin argumentos que se mide.
+
+    Args:
+        nombre (str): Nombre del caso ('GET /status', 'CalculadoraPrestamos.escenario_prepago', ...)
+        preparar (Callable): Función contexto -> función a medir
+        escala (bool): Si depende del tamaño de los datos; si no, se mide una sola vez
+        max_filas (int): Tamaño máximo en el que se mide (None = sin límite)
+    """
+
+    def __init__(self, nombre: str, preparar: Callable, escala: bool = True, max_filas: Optional[int] = None):
+        self.nombre = nombre
+        self.preparar = preparar
+        self.escala = escala
+        self.max_filas = max_filas
+
+
+CASOS: List[Caso] = []
+
+
+def caso(nombre: str, escala: bool = True, max_filas: Optional[int] = None):
+    """Registra la función decorada como preparación de un caso."""
+    def registrar(preparar):
+        CASOS.append(Caso(nombre, preparar, escala, max_filas))
+        return preparar
+    return registrar
+
+
+class Contexto:
+    """
+    Datos sintéticos de un tamaño y objetos compartidos por los casos.
+
+    Los archivos se generan la primera vez que un caso los pide.
+    """
+
+    def __init__(self, n: int, directorio: str, cliente):
+        self.n = n
+        self.directorio = directorio
+        self.cliente = cliente
+        self._archivos = {}
+        self._calculadora = None
+
+    def archivo(self, nombre: str) -> str:
+        """Ruta del archivo sintético 'nombre' de este tamaño, generándolo si no existe."""
+        if nombre not in self._archivos:
+            ruta = os.path.join(self.directorio, nombre)
+            if nombre == 'loan_data.csv':
+                generar_prestamos(self.n).to_csv(ruta, index=False)
+            elif nombre == 'prestamos.xlsx':
+                generar_prestamos(self.n).to_excel(ruta, index=False, engine='openpyxl')
+            elif nombre == 'mortalidad.csv':
+                escribir_mortalidad(generar_mortalidad(self.n), ruta)
+            elif nombre == 'hurtos.csv':
+                generar_hurtos(self.n).to_csv(ruta, index=False)
+            elif nombre == 'departamentos.csv':
+                DEPARTAMENTOS.to_csv(ruta, index=False)
+            else:
+                raise KeyError(nombre)
+            self._archivos[nombre] = ruta
+        return self._archivos[nombre]
+
+    def contenido(self, nombre: str) -> bytes:
+        with open(self.archivo(nombre), 'rb') as f:
+            return f.read()
+
+    def calculadora(self):
+        """CalculadoraPrestamos con los préstamos sintéticos cargados y analizados."""
+        if self._calculadora is None:
+            from function_three import CalculadoraPrestamos
+            calculadora = CalculadoraPrestamos(self.archivo('loan_data.csv'))
+            with silencio():
+                calculadora.cargar_datos()
+                calculadora.analizar_todos_prestamos()
+            self._calculadora = calculadora
+        return self._calculadora
+
+
+@contextlib.contextmanager
+def silencio():
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+
+def peticion(cliente, metodo: str, url: str, esperado: int = 200, archivo: Optional[bytes] = None,
+             nombre_archivo: str = 'datos.csv', **opciones) -> Callable[[], None]:
+    """Función que hace la petición con el cliente de pruebas y comprueba el código de respuesta."""
+    def ejecutar():
+        if archivo is not None:
+            opciones['data'] = {'file': (io.BytesIO(archivo), nombre_archivo)}
+        respuesta = cliente.open(url, method=metodo, **opciones)
+        respuesta.get_data()
+        assert respuesta.status_code == esperado, \
+            f'{metodo} {url}: {respuesta.status_code} {respuesta.get_data(as_text=True)[:200]}'
+    return ejecutar
+
+
+def metodo(nombre: str, *args, **kwargs) -> Callable:
+    """Preparación de un caso que llama a un método de CalculadoraPrestamos sin imprimir."""
+    def preparar(ctx):
+        calculadora = ctx.calculadora()
+
+        def ejecutar():
+            with silencio():
+                return getattr(calculadora, nombre)(*args, **kwargs)
+        return ejecutar
+    return preparar
+
+
+# --- Endpoints ---------------------------------------------------------------
+
+for _metodo, _url in [('GET', '/status'), ('GET', '/items'), ('GET', '/items?limit=100'), ('GET', '/items/1'),
+                      ('POST', '/function/one'), ('POST', '/function/two'), ('POST', '/function/four'),
+                      ('GET', '/interface')]:
+    caso(f'{_metodo} {_url}', escala=False)(lambda ctx, m=_metodo, u=_url: peticion(ctx.cliente, m, u))
+
+
+@caso('POST /items', escala=False)
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/items', 201, json={'name': 'Benchmark'})
+
+
+@caso('PUT /items/<id>', escala=False)
+def _(ctx):
+    return peticion(ctx.cliente, 'PUT', '/items/1', json={'name': 'Item 1'})
+
+
+# Lote de n items creados una vez al preparar el caso; se mide su actualización
+@caso('PUT /items/bulk', max_filas=10**5)
+def _(ctx):
+    respuesta = ctx.cliente.post('/items/bulk', json=[{'name': f'Lote {i}'} for i in range(ctx.n)])
+    assert respuesta.status_code == 200, respuesta.get_data(as_text=True)[:200]
+    lote = [{'id': r['item']['id'], 'name': 'Actualizado'} for r in respuesta.get_json()['results']]
+    return peticion(ctx.cliente, 'PUT', '/items/bulk', json=lote)
+
+
+# Después de los demás casos de items, con todos los endpoints ya registrados en las métricas
+@caso('GET /metrics', escala=False)
+def _(ctx):
+    return peticion(ctx.cliente, 'GET', '/metrics')
+
+
+@caso('POST /upload/csv')
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/upload/csv', data=ctx.contenido('loan_data.csv'),
+                    content_type='text/csv')
+
+
+@caso('POST /upload/csv?full=true')
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/upload/csv?full=true', archivo=ctx.contenido('loan_data.csv'))
+
+
+@caso('POST /upload/csv?ingest=true')
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/upload/csv?ingest=true', archivo=ctx.contenido('loan_data.csv'))
+
+
+@caso('POST /csv/summary')
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/csv/summary', archivo=ctx.contenido('loan_data.csv'))
+
+
+@caso('POST /upload/xlsx', max_filas=MAX_FILAS_EXCEL)
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/upload/xlsx', archivo=ctx.contenido('prestamos.xlsx'),
+                    nombre_archivo='datos.xlsx')
+
+
+@caso('POST /xlsx/summary', max_filas=MAX_FILAS_EXCEL)
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/xlsx/summary', archivo=ctx.contenido('prestamos.xlsx'),
+                    nombre_archivo='datos.xlsx')
+
+
+@caso('POST /convert/csv-to-xlsx', max_filas=MAX_FILAS_EXCEL)
+def _(ctx):
+    return peticion(ctx.cliente, 'POST', '/convert/csv-to-xlsx', archivo=ctx.contenido('loan_data.csv'))
+
+
+def _mortalidad(ctx):
+    import indice_mortalidad
+    indice_mortalidad._ruta_csv = ctx.archivo('mortalidad.csv')
+
+
+for _url in ['/generic/one', '/mortalidad/max', '/mortalidad/consulta?tipo=top&k=10',
+             '/mortalidad/consulta?tipo=agregado&por=localidad', '/mortalidad/Kennedy/2006',
+             '/mortalidad/ranking/2006']:
+    def _preparar(ctx, url=_url):
+        _mortalidad(ctx)
+        return peticion(ctx.cliente, 'POST' if url == '/generic/one' else 'GET', url)
+    caso(f"{'POST' if _url == '/generic/one' else 'GET'} {_url}")(_preparar)
+
+
+@caso('POST /generic/two')
+def _(ctx):
+    # generic_function_two lee las fuentes de HURTOS_FUENTE y DEPARTAMENTOS_FUENTE
+    ctx.archivo('hurtos.csv')
+    ctx.archivo('departamentos.csv')
+    return peticion(ctx.cliente, 'POST', '/generic/two')
+
+
+@caso('GET /graficos/prestamos/panel')
+def _(ctx):
+    ctx.archivo('loan_data.csv')
+    return peticion(ctx.cliente, 'GET', '/graficos/prestamos/panel')
+
+
+@caso('GET /graficos/<clave>')
+def _(ctx):
+    ctx.archivo('loan_data.csv')
+    respuesta = ctx.cliente.get('/graficos/prestamos/tasas')
+    return peticion(ctx.cliente, 'GET', f"/graficos/{respuesta.headers['ETag'].strip(chr(34))}")
+
+
+@caso('GET /graficos/cache', escala=False)
+def _(ctx):
+    return peticion(ctx.cliente, 'GET', '/graficos/cache')
+
+
+@caso('POST /function/three')
+def _(ctx):
+    ctx.archivo('loan_data.csv')
+    return peticion(ctx.cliente, 'POST', '/function/three', json={'acciones': ACCIONES_SERVICIO})
+
+
+@caso('GET /function/three/cache', escala=False)
+def _(ctx):
+    return peticion(ctx.cliente, 'GET', '/function/three/cache')
+
+
+# Frases cortas con repeticiones, como las de un flujo de localización; la
+# primera corrida llena la caché y las siguientes miden los aciertos
+@caso('POST /function/four/batch')
+def _(ctx):
+    from function_four import CLAVES
+    frases = [f'{CLAVES[i % len(CLAVES)].title()} {i % 1000}' for i in range(ctx.n)]
+    return peticion(ctx.cliente, 'POST', '/function/four/batch', json={'phrases': frases})
+
+
+# La respuesta tiene una fila por préstamo y mes (unas 100 por préstamo)
+@caso('POST /function/three/schedule', max_filas=10**4)
+def _(ctx):
+    ctx.archivo('loan_data.csv')
+    return peticion(ctx.cliente, 'POST', '/function/three/schedule', json={})
+
+
+@caso('POST /jobs/csv-summary (hasta terminar)')
+def _(ctx):
+    contenido = ctx.contenido('loan_data.csv')
+
+    def ejecutar():
+        respuesta = ctx.cliente.post('/jobs/csv-summary', data={'file': (io.BytesIO(contenido), 'datos.csv')})
+        assert respuesta.status_code == 202, respuesta.get_data(as_text=True)
+        url = f"/jobs/{respuesta.get_json()['id']}/result"
+        while (respuesta := ctx.cliente.get(url)).status_code == 202:
+            time.sleep(0.005)
+        assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+    return ejecutar
+
+
+@caso('GET /jobs', escala=False)
+def _(ctx):
+    return peticion(ctx.cliente, 'GET', '/jobs')
+
+
+# --- Métodos de CalculadoraPrestamos -------------------------------------------
+
+
+@caso('CalculadoraPrestamos.cargar_datos')
+def _(ctx):
+    from function_three import CalculadoraPrestamos
+    calculadora = CalculadoraPrestamos(ctx.archivo('loan_data.csv'))
+
+    def ejecutar():
+        with silencio():
+            assert calculadora.cargar_datos()
+    return ejecutar
+
+
+caso('CalculadoraPrestamos.calcular_interes_compuesto', escala=False)(
+    metodo('calcular_interes_compuesto', 50_000_000, 12.5, 60))
+caso('CalculadoraPrestamos.calcular_pago_mensual', escala=False)(
+    metodo('calcular_pago_mensual', 50_000_000, 12.5, 60))
+
+
+@caso('CalculadoraPrestamos.tabla_amortizacion', escala=False)
+def _(ctx):
+    calculadora = ctx.calculadora()
+    return lambda: list(calculadora.tabla_amortizacion(500_000_000, 9.5, 360))
+
+
+caso('CalculadoraPrestamos.matriz_saldos', max_filas=10**5)(metodo('matriz_saldos'))
+caso('CalculadoraPrestamos.analizar_todos_prestamos')(metodo('analizar_todos_prestamos'))
+caso('CalculadoraPrestamos.mostrar_ejemplos_detallados')(metodo('mostrar_ejemplos_detallados'))
+caso('CalculadoraPrestamos.escenario_que_pasaria_si')(metodo('escenario_que_pasaria_si'))
+caso('CalculadoraPrestamos.escenario_rejilla_tasas')(metodo('escenario_rejilla_tasas'))
+caso('CalculadoraPrestamos.escenario_prepago')(metodo('escenario_prepago'))
+caso('CalculadoraPrestamos.escenario_refinanciamiento')(metodo('escenario_refinanciamiento'))
+caso('CalculadoraPrestamos.analisis_paralelo')(metodo('analisis_paralelo', procesos=2))
+caso('CalculadoraPrestamos.crear_visualizaciones')(metodo('crear_visualizaciones'))
+caso('CalculadoraPrestamos.exportar_resultados')(metodo('exportar_resultados'))
+caso('CalculadoraPrestamos.generar_resumen_ejecutivo')(metodo('generar_resumen_ejecutivo'))
+
+
+# --- Medición y comparación ----------------------------------------------------
+
+def medir(funcion: Callable, repeticiones: int) -> Dict:
+    """
+    Tiempo de la primera ejecución, mediana de las siguientes (cachés calientes) y
+    pico de memoria de una ejecución más con tracemalloc.
+    """
+    tiempos = []
+    for _ in range(max(repeticiones, 2)):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'primera': tiempos[0], 'mediana': statistics.median(tiempos[1:]), 'pico_mb': pico / 2**20}
+
+
+def comparar(resultado: Dict, base: Optional[Dict], umbral: float, minimo_segundos: float,
+             minimo_mb: float) -> List[str]:
+    """Métricas de resultado que empeoraron respecto a base más allá del umbral."""
+    if base is None:
+        return []
+    regresiones = []
+    for metrica, minimo in (('mediana', minimo_segundos), ('pico_mb', minimo_mb)):
+        anterior, actual = base[metrica], resultado[metrica]
+        if actual > anterior * (1 + umbral) and actual - anterior > minimo:
+            regresiones.append(metrica)
+    return regresiones
+
+
+def entorno() -> Dict:
+    import numpy
+    import pandas
+    return {'python': platform.python_version(), 'plataforma': platform.platform(),
+            'cpus': os.cpu_count(), 'numpy': numpy.__version__, 'pandas': pandas.__version__}
+
+
+def preparar_entorno(directorio: str):
+    """Apunta las cachés y fuentes de datos al directorio temporal antes de importar la aplicación."""
+    os.environ.update({
+        'COLUMNAR_DIR': os.path.join(directorio, '.columnar'),
+        'FUENTES_CACHE_DIR': os.path.join(directorio, '.cache_fuentes'),
+        'FUENTES_TTL_SEGUNDOS': '0',
+        # Relativas al directorio de trabajo, que cambia con cada tamaño
+        'HURTOS_FUENTE': 'hurtos.csv',
+        'DEPARTAMENTOS_FUENTE': 'departamentos.csv',
+    })
+    os.environ.pop('APP_WARM_UP', None)
+    os.chdir(directorio)
+
+
+def seleccionar(patrones: Optional[List[str]]) -> List[Caso]:
+    if not patrones:
+        return CASOS
+    return [c for c in CASOS if any(fnmatch.fnmatch(c.nombre, p) or p in c.nombre for p in patrones)]
+
+
+def ejecutar_suite(casos: List[Caso], tamanos: List[int], repeticiones: int, base: Dict,
+                   umbral: float, minimo_segundos: float, minimo_mb: float):
+    """Mide los casos en cada tamaño, imprime la tabla y devuelve (resultados, regresiones)."""
+    resultados, regresiones = {}, []
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='bench_suite_') as raiz:
+        preparar_entorno(raiz)
+        try:
+            from app import app
+            cliente = app.test_client()
+            print(f"{'caso':<52} {'filas':>10} {'primera':>10} {'mediana':>10} {'pico MB':>9}  comparación")
+            for indice, n in enumerate(sorted(tamanos)):
+                directorio = os.path.join(raiz, str(n))
+                os.makedirs(directorio)
+                os.chdir(directorio)
+                ctx = Contexto(n, directorio, cliente)
+                for c in casos:
+                    if (not c.escala and indice > 0) or (c.max_filas is not None and n > c.max_filas):
+                        continue
+                    clave = f'{c.nombre}|{n if c.escala else "-"}'
+                    try:
+                        resultado = medir(c.preparar(ctx), repeticiones)
+                    except Exception as e:
+                        print(f"{c.nombre:<52} {clave.split('|')[1]:>10}  error: {type(e).__name__}: {e}")
+                        regresiones.append((clave, ['error']))
+                        continue
+                    resultados[clave] = resultado
+                    anterior = base.get(clave)
+                    empeoradas = comparar(resultado, anterior, umbral, minimo_segundos, minimo_mb)
+                    if empeoradas:
+                        regresiones.append((clave, empeoradas))
+                    if anterior is None:
+                        nota = 'sin línea base'
+                    else:
+                        nota = (f"x{resultado['mediana'] / anterior['mediana']:.2f} tiempo, "
+                                f"x{resultado['pico_mb'] / max(anterior['pico_mb'], 1e-9):.2f} memoria")
+                        if empeoradas:
+                            nota += '  REGRESIÓN'
+                    print(f"{c.nombre:<52} {clave.split('|')[1]:>10} {resultado['primera']:10.4f} "
+                          f"{resultado['mediana']:10.4f} {resultado['pico_mb']:9.2f}  {nota}")
+        finally:
+            from trabajos import COLA_TRABAJOS
+            COLA_TRABAJOS.cerrar()
+            os.chdir(directorio_original)
+    return resultados, regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tamanos', nargs='+', type=lambda t: int(float(t)), default=TAMANOS_POR_DEFECTO)
+    parser.add_argument('--casos', nargs='+', help='Patrones (fnmatch o subcadena) de los casos a medir')
+    parser.add_argument('--repeticiones', type=int, default=4)
+    parser.add_argument('--umbral', type=float, default=0.25, help='Empeoramiento relativo tolerado')
+    parser.add_argument('--minimo-segundos', type=float, default=0.02)
+    parser.add_argument('--minimo-mb', type=float, default=1.0)
+    parser.add_argument('--base', default=BASE_POR_DEFECTO)
+    parser.add_argument('--guardar-base', action='store_true', help='Guardar los resultados como línea base')
+    parser.add_argument('--listar', action='store_true', help='Listar los casos y salir')
+    args = parser.parse_args()
+
+    casos = seleccionar(args.casos)
+    if args.listar:
+        for c in casos:
+            limite = f' (hasta {c.max_filas:,} filas)' if c.max_filas else ''
+            print(f"{c.nombre}{'' if c.escala else ' (tamaño fijo)'}{limite}")
+        return
+
+    linea_base = {'entorno': None, 'resultados': {}}
+    if os.path.exists(args.base):
+        with open(args.base, encoding='utf-8') as f:
+            linea_base = json.load(f)
+        if linea_base.get('entorno') != entorno():
+            print(f"Aviso: la línea base se midió en otro entorno: {linea_base.get('entorno')}\n")
+
+    resultados, regresiones = ejecutar_suite(
+        casos, args.tamanos, args.repeticiones, linea_base['resultados'],
+        args.umbral, args.minimo_segundos, args.minimo_mb)
+
+    if args.guardar_base:
+        linea_base['entorno'] = entorno()
+        linea_base['resultados'].update(resultados)
+        with open(args.base, 'w', encoding='utf-8') as f:
+            json.dump(linea_base, f, indent=1, sort_keys=True, ensure_ascii=False)
+        print(f"\nLínea base guardada en {args.base} ({len(resultados)} casos medidos)")
+    elif regresiones:
+        print(f"\n{len(regresiones)} regresión(es):")
+        for clave, metricas in regresiones:
+            print(f"  {clave}: {', '.join(metricas)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
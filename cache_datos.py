@@ -0,0 +1,207 @@
+"""
+Cachés en memoria compartidas por todo el proceso.
+
+CacheLRU guarda valores arbitrarios con un límite de memoria y expulsa los
+menos usados recientemente; CacheArchivos la especializa para datos derivados
+de archivos, usando como clave la ruta junto con su fecha de modificación y
+tamaño (o un hash del contenido), de modo que un archivo modificado se vuelve
+a cargar automáticamente.
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def tamano_en_bytes(valor: Any) -> int:
+    """Estima la memoria que ocupa un valor, recorriendo tuplas, listas y diccionarios."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(index=True, deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, (tuple, list)):
+        return sys.getsizeof(valor) + sum(tamano_en_bytes(v) for v in valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_en_bytes(k) + tamano_en_bytes(v) for k, v in valor.items())
+    return sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """
+    Caché LRU segura para hilos, acotada por memoria y opcionalmente por número de entradas.
+
+    Args:
+        memoria_max_bytes (int): Memoria máxima total de las claves y valores guardados
+        max_entradas (int): Número máximo de entradas (None = sin límite)
+        medir (Callable): Función que estima el tamaño de un valor en bytes
+    """
+
+    def __init__(self, memoria_max_bytes: int, max_entradas: Optional[int] = None,
+                 medir: Callable[[Any], int] = tamano_en_bytes):
+        self.memoria_max_bytes = memoria_max_bytes
+        self.max_entradas = max_entradas
+        self._medir = medir
+        self._entradas = OrderedDict()  # clave -> (valor, tamaño)
+        self._memoria = 0
+        self._lock = threading.RLock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._entradas
+
+    def get(self, clave: Hashable, default: Any = None) -> Any:
+        """Devuelve el valor guardado (marcándolo como usado) o default si no existe."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return default
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[0]
+
+    def put(self, clave: Hashable, valor: Any) -> bool:
+        """
+        Guarda un valor y expulsa las entradas menos usadas hasta respetar los límites.
+
+        Returns:
+            bool: False si la entrada por sí sola supera el límite de memoria y no se guardó
+        """
+        # La clave también ocupa memoria: en cachés de textos puede pesar tanto como el valor
+        tamano = self._medir(valor) + tamano_en_bytes(clave)
+        with self._lock:
+            self._quitar(clave)
+            if tamano > self.memoria_max_bytes:
+                return False
+            self._entradas[clave] = (valor, tamano)
+            self._memoria += tamano
+            while self._memoria > self.memoria_max_bytes or \
+                    (self.max_entradas is not None and len(self._entradas) > self.max_entradas):
+                antigua = next(iter(self._entradas))
+                self._quitar(antigua)
+                self.expulsiones += 1
+            return True
+
+    def obtener_o_calcular(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Devuelve el valor guardado o lo calcula con calcular() y lo guarda."""
+        faltante = object()
+        valor = self.get(clave, faltante)
+        if valor is faltante:
+            valor = calcular()
+            self.put(clave, valor)
+        return valor
+
+    def invalidar(self, clave: Optional[Hashable] = None,
+                  condicion: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Elimina una clave, las claves que cumplan condicion, o todo si no se indica nada.
+
+        Returns:
+            int: Número de entradas eliminadas
+        """
+        with self._lock:
+            if clave is not None:
+                return int(self._quitar(clave))
+            claves = [c for c in self._entradas if condicion is None or condicion(c)]
+            for c in claves:
+                self._quitar(c)
+            return len(claves)
+
+    def estadisticas(self) -> Dict:
+        """Contadores de uso y ocupación de la caché."""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'memoria_bytes': self._memoria,
+                'memoria_max_bytes': self.memoria_max_bytes,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0
+            }
+
+    def _quitar(self, clave: Hashable) -> bool:
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return False
+        self._memoria -= entrada[1]
+        return True
+
+
+def huella_archivo(ruta: str, usar_hash: bool = False) -> tuple:
+    """
+    Identifica la versión actual de un archivo.
+
+    Args:
+        ruta (str): Ruta al archivo
+        usar_hash (bool): Usar un hash SHA-256 del contenido en lugar de mtime y tamaño
+
+    Returns:
+        tuple: (ruta absoluta, mtime en ns, tamaño) o (ruta absoluta, hash)
+    """
+    ruta = os.path.abspath(ruta)
+    if usar_hash:
+        digest = hashlib.sha256()
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                digest.update(bloque)
+        return (ruta, digest.hexdigest())
+    info = os.stat(ruta)
+    return (ruta, info.st_mtime_ns, info.st_size)
+
+
+class CacheArchivos(CacheLRU):
+    """
+    Caché de datos derivados de archivos que se invalida sola cuando el archivo cambia.
+
+    Args:
+        memoria_max_bytes (int): Memoria máxima total de las claves y valores guardados
+        usar_hash (bool): Identificar versiones por hash del contenido en lugar de mtime y tamaño
+        max_entradas (int): Número máximo de archivos en caché
+    """
+
+    def __init__(self, memoria_max_bytes: int, usar_hash: bool = False, max_entradas: Optional[int] = None):
+        super().__init__(memoria_max_bytes, max_entradas)
+        self.usar_hash = usar_hash
+        self.recargas = 0
+
+    def obtener(self, ruta: str, cargar: Callable[[str], Any]) -> Any:
+        """
+        Devuelve los datos del archivo, cargándolos con cargar(ruta) si no están en
+        caché o si el archivo cambió desde la última carga.
+        """
+        huella = huella_archivo(ruta, self.usar_hash)
+        faltante = object()
+        valor = self.get(huella, faltante)
+        if valor is faltante:
+            # Las versiones anteriores del mismo archivo ya no sirven
+            if self.invalidar(condicion=lambda c: c[0] == huella[0] and c != huella):
+                self.recargas += 1
+            valor = cargar(ruta)
+            self.put(huella, valor)
+        return valor
+
+    def invalidar_archivo(self, ruta: Optional[str] = None) -> int:
+        """Elimina todas las versiones guardadas de un archivo, o todo si ruta es None."""
+        if ruta is None:
+            return self.invalidar()
+        ruta = os.path.abspath(ruta)
+        return self.invalidar(condicion=lambda c: c[0] == ruta)
+
+    def estadisticas(self) -> Dict:
+        estadisticas = super().estadisticas()
+        estadisticas['recargas'] = self.recargas
+        return estadisticas
@@ -1,16 +1,26 @@
-import pandas as pd
-import io
+import tempfile
 from flask import jsonify, send_file, request
 
+from metricas import fase
+from stream_convert import csv_to_xlsx
+
+# Workbooks up to this size stay in memory, larger ones are spooled to disk
+SPOOL_THRESHOLD = 32 * 2**20
+
+
 def convert_csv_to_xlsx_file():
-    if 'file' not in request.files:
+    with fase('upload'):
+        files = request.files
+    if 'file' not in files:
         return jsonify({'error': 'No file part'}), 400
-    file = request.files['file']
+    file = files['file']
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_THRESHOLD)
     try:
-        df = pd.read_csv(file)
-        output = io.BytesIO()
-        df.to_excel(output, index=False, engine='openpyxl')
+        # csv_to_xlsx times its CSV reads as 'parse' and the workbook save as 'serialize'
+        with fase('compute'):
+            csv_to_xlsx(file, output)
         output.seek(0)
         return send_file(output, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', as_attachment=True, download_name='converted.xlsx')
     except Exception as e:
+        output.close()
         return jsonify({'error': str(e)}), 400
@@ -1,13 +1,51 @@
 import pandas as pd
 from flask import jsonify, request
 
+from almacen_columnar import directorio_subida, ingerir_subida, iterar_bloques
+from metricas import fase
+from streaming_summary import summarize_chunks
+
+CHUNK_ROWS = 100_000
+
+
+def summarize_csv(source):
+    """Describe-style summary of a CSV file path or stream, read in chunks of CHUNK_ROWS rows."""
+    return summarize_chunks(pd.read_csv(source, chunksize=CHUNK_ROWS))
+
+
+def summarize_table(table_id):
+    """
+    Same summary for a CSV already ingested with /upload/csv?ingest=true, read from its column files.
+
+    Raises:
+        KeyError: If there is no ingested table with that id
+    """
+    return summarize_chunks(iterar_bloques(directorio_subida(table_id), CHUNK_ROWS))
+
+
 def csv_summary_file():
-    if 'file' not in request.files:
+    """
+    Summarizes an uploaded CSV, or an ingested one given as ?table=<id>.
+
+    Uploads are ingested into the columnar store keyed by their content hash, so
+    summarizing the same file again does not parse its text a second time.
+    """
+    table_id = request.args.get('table')
+    with fase('upload'):
+        files = request.files
+    if table_id is None and 'file' not in files:
         return jsonify({'error': 'No file part'}), 400
-    file = request.files['file']
     try:
-        df = pd.read_csv(file)
-        summary = df.describe(include='all').to_dict()
-        return jsonify({'summary': summary})
+        if table_id is None:
+            with fase('parse'):
+                table_id = ingerir_subida(files['file'].stream, CHUNK_ROWS)
+        try:
+            directory = directorio_subida(table_id)
+        except KeyError:
+            return jsonify({'error': f'Unknown table: {table_id}'}), 404
+        with fase('compute'):
+            summary = summarize_chunks(iterar_bloques(directory, CHUNK_ROWS))
+        with fase('serialize'):
+            return jsonify({'summary': summary, 'table': table_id})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -0,0 +1,57 @@
+"""
+Endpoints /graficos: gráficos renderizados sin pantalla y servidos desde caché.
+
+GET /graficos/prestamos/<nombre> dibuja un gráfico de un archivo de préstamos
+('panel' o uno de graficos.GRAFICOS_PRESTAMOS); GET /graficos/<clave> devuelve
+una imagen ya renderizada, como las que enlaza /generic/two. La clave de caché
+se envía como ETag, así que el navegador puede revalidar sin descargarla.
+"""
+import os
+
+from flask import Response, jsonify, request
+
+from cache_datos import huella_archivo
+from graficos import CACHE_GRAFICOS, obtener_grafico, renderizar_prestamos
+from servicio_prestamos import ErrorServicio, obtener_portafolio
+
+# Parámetros enteros de los gráficos y su valor máximo: los valores se recortan a
+# [1, máximo] para que una petición no pueda pedir miles de barras o de intervalos
+PARAMETROS_ENTEROS = {'n': 100, 'bins': 200, 'max_puntos': 50_000}
+
+
+def _respuesta_imagen(contenido, mimetype, clave):
+    if request.if_none_match.contains(clave):
+        return Response(status=304, headers={'ETag': f'"{clave}"'})
+    respuesta = Response(contenido, mimetype=mimetype)
+    respuesta.set_etag(clave)
+    respuesta.headers['Cache-Control'] = 'private, max-age=300'
+    return respuesta
+
+
+def grafico_prestamos(nombre):
+    """
+    Parámetros opcionales: formato (png|svg), archivo (loan_data.csv), n, bins y
+    max_puntos (recortados a PARAMETROS_ENTEROS; cada gráfico usa solo los que acepta).
+    """
+    archivo = os.path.basename(request.args.get('archivo') or 'loan_data.csv')
+    formato = request.args.get('formato', 'png')
+    try:
+        parametros = {p: min(max(int(request.args[p]), 1), maximo)
+                      for p, maximo in PARAMETROS_ENTEROS.items() if p in request.args}
+        datos, resultados = obtener_portafolio(archivo)
+        contenido, mimetype, clave = renderizar_prestamos(
+            nombre, datos, resultados, formato, huella_entrada=huella_archivo(archivo), **parametros)
+    except (ErrorServicio, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return _respuesta_imagen(contenido, mimetype, clave)
+
+
+def grafico_guardado(clave):
+    imagen = obtener_grafico(clave)
+    if imagen is None:
+        return jsonify({'error': 'Gráfico no encontrado o expirado'}), 404
+    return _respuesta_imagen(*imagen, clave)
+
+
+def graficos_cache():
+    return jsonify({'cache': CACHE_GRAFICOS.estadisticas()})
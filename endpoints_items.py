@@ -0,0 +1,132 @@
+"""
+Endpoints /items en lote y en streaming.
+
+POST, PUT y DELETE /items/bulk crean, actualizan o eliminan muchos items en
+una sola petición. El cuerpo es un arreglo JSON o NDJSON (un objeto por línea,
+Content-Type application/x-ndjson): {"name"} para crear, {"id", "name"} para
+actualizar y {"id"} (o solo el id) para eliminar. Todo el lote se aplica de una
+vez con AlmacenItems.aplicar_lote y la respuesta trae un resultado por entrada,
+en el mismo orden, con el código que habría devuelto el endpoint individual.
+Una entrada inválida no detiene el lote: su resultado es un 400. Si la petición
+es NDJSON o pide Accept: application/x-ndjson, los resultados se transmiten
+como NDJSON.
+
+GET /items con Accept: application/x-ndjson o ?format=ndjson transmite todos
+los items, uno por línea, leyéndolos de a una página sin armar la lista
+completa.
+"""
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import Response, jsonify, request
+
+from almacen_items import AlmacenItems, error_id, error_nombre
+
+TIPO_NDJSON = 'application/x-ndjson'
+TIPOS_NDJSON = (TIPO_NDJSON, 'application/jsonl', 'application/ndjson')
+MAX_LOTE = 100_000
+ITEMS_POR_BLOQUE = 1_000
+OPERACIONES = {'POST': 'crear', 'PUT': 'actualizar', 'DELETE': 'eliminar'}
+# json.dumps(..., ensure_ascii=False) crea un codificador nuevo en cada llamada
+_codificar = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def pide_ndjson() -> bool:
+    """True si el cliente pidió la respuesta en NDJSON."""
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', TIPO_NDJSON]) == TIPO_NDJSON
+
+
+def _leer_lote() -> Tuple[List, bool]:
+    """Entradas del cuerpo y si venían en NDJSON."""
+    if request.mimetype in TIPOS_NDJSON:
+        # Cada línea se lee por separado: unirlas en un arreglo aceptaría "1, 2" como dos entradas
+        entradas = []
+        for numero, linea in enumerate(request.get_data(as_text=True).splitlines(), 1):
+            if not linea.strip():
+                continue
+            try:
+                entradas.append(json.loads(linea))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"NDJSON inválido en la línea {numero}: {e.msg}")
+        return entradas, True
+    entradas = request.get_json(silent=True)
+    if not isinstance(entradas, list):
+        raise ValueError("El cuerpo debe ser un arreglo JSON o NDJSON (Content-Type: application/x-ndjson)")
+    return entradas, False
+
+
+def _validar(operacion: str, entrada) -> Optional[str]:
+    """Mensaje de error de una entrada o None si es válida (igual para los dos almacenes)."""
+    if operacion == 'eliminar' and isinstance(entrada, int) and not isinstance(entrada, bool):
+        return error_id(entrada)
+    if not isinstance(entrada, dict):
+        return "Cada entrada debe ser un objeto"
+    if operacion != 'crear':
+        if 'id' not in entrada:
+            return "Falta el id entero del item"
+        if error_id(entrada['id']):
+            return error_id(entrada['id'])
+    if operacion != 'eliminar' and 'name' in entrada:
+        return error_nombre(entrada['name'])
+    return None
+
+
+def _resultado(operacion: str, item: Optional[Dict]) -> Dict:
+    if item is None:
+        return {"status": 404, "error": "Item not found"}
+    if operacion == 'crear':
+        return {"status": 201, "item": item}
+    if operacion == 'actualizar':
+        return {"status": 200, "item": item}
+    return {"status": 200, "result": "Item deleted", "id": item['id']}
+
+
+def _ndjson(filas: Iterable[Dict]) -> Response:
+    def generar():
+        bloque = []
+        for fila in filas:
+            bloque.append(_codificar(fila))
+            if len(bloque) == ITEMS_POR_BLOQUE:
+                yield '\n'.join(bloque) + '\n'
+                bloque = []
+        if bloque:
+            yield '\n'.join(bloque) + '\n'
+    return Response(generar(), mimetype=TIPO_NDJSON)
+
+
+def items_bulk(items: AlmacenItems):
+    """Crea (POST), actualiza (PUT) o elimina (DELETE) un lote de items."""
+    operacion = OPERACIONES[request.method]
+    try:
+        entradas, es_ndjson = _leer_lote()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if len(entradas) > MAX_LOTE:
+        return jsonify({'error': f"El lote tiene {len(entradas)} entradas; el máximo es {MAX_LOTE}"}), 413
+
+    errores = [_validar(operacion, e) for e in entradas]
+    validas = [{'id': e} if isinstance(e, int) else e for e, error in zip(entradas, errores) if error is None]
+    aplicados = iter(items.aplicar_lote(operacion, validas))
+    resultados = [_resultado(operacion, next(aplicados)) if error is None else {"status": 400, "error": error}
+                  for error in errores]
+
+    if es_ndjson or pide_ndjson():
+        return _ndjson(resultados)
+    return jsonify({"results": resultados, "applied": sum(r['status'] < 400 for r in resultados)})
+
+
+def _recorrer(items: AlmacenItems) -> Iterable[Dict]:
+    """Todos los items, leídos de a una página para no copiar la colección completa."""
+    cursor = None
+    while True:
+        pagina, cursor = items.pagina(cursor, ITEMS_POR_BLOQUE)
+        yield from pagina
+        if cursor is None:
+            return
+
+
+def items_ndjson(items: AlmacenItems):
+    """Transmite todos los items como NDJSON, página por página."""
+    return _ndjson(_recorrer(items))
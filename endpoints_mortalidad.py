@@ -0,0 +1,63 @@
+from flask import jsonify, request
+
+from indice_mortalidad import obtener_indice
+
+
+def mortalidad_maxima():
+    """Localidad y año con la mayor tasa de mortalidad (sin contar Distrito)."""
+    maxima = obtener_indice().maxima_tasa()
+    if maxima is None:
+        return jsonify({'error': 'No se encontraron datos válidos de localidades.'}), 404
+    return jsonify(maxima)
+
+
+def mortalidad_localidad(localidad, anio):
+    """Tasa de mortalidad de una localidad en un año."""
+    registro = obtener_indice().tasa_localidad(localidad, anio)
+    if registro is None:
+        return jsonify({'error': f'No hay datos para {localidad} en {anio}'}), 404
+    return jsonify(registro)
+
+
+def mortalidad_ranking(anio):
+    """Localidades de un año ordenadas por tasa de mortalidad."""
+    indice = obtener_indice()
+    if anio not in indice.ranking_por_anio:
+        return jsonify({'error': f'No hay datos para el año {anio}', 'anios': indice.anios}), 404
+    return jsonify({'anio': anio, 'ranking': indice.ranking(anio)})
+
+
+def _si_no(valor):
+    return (valor or '').lower() in ('1', 'true', 'si', 'sí', 'yes')
+
+
+def mortalidad_consulta():
+    """
+    Consulta parametrizada sobre el índice de mortalidad. Parámetros (query string):
+
+    - tipo=top: k (5), por=tasa|muertes, anio (opcional), incluir_distrito
+    - tipo=agregado: por=anio|localidad, incluir_distrito
+    - tipo=tendencia: localidad
+
+    Los resultados se guardan en caché por parámetros hasta que el archivo cambie.
+    """
+    args = request.args
+    tipo = args.get('tipo', 'top')
+    try:
+        if tipo == 'top':
+            parametros = {'k': int(args.get('k', 5)), 'por': args.get('por', 'tasa'),
+                          'anio': int(args['anio']) if args.get('anio') else None,
+                          'incluir_distrito': _si_no(args.get('incluir_distrito'))}
+        elif tipo == 'agregado':
+            parametros = {'por': args.get('por', 'anio'),
+                          'incluir_distrito': _si_no(args.get('incluir_distrito'))}
+        elif tipo == 'tendencia':
+            if not args.get('localidad'):
+                return jsonify({'error': "Falta el parámetro 'localidad'"}), 400
+            parametros = {'localidad': args['localidad']}
+        else:
+            return jsonify({'error': "'tipo' debe ser top, agregado o tendencia"}), 400
+        resultados = obtener_indice().consultar(tipo, **parametros)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'tipo': tipo, 'parametros': parametros, 'resultados': resultados})
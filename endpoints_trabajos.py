@@ -0,0 +1,111 @@
+"""
+Endpoints /jobs: ejecutan en segundo plano los mismos análisis que /function/three,
+/generic/two, /csv/summary, /xlsx/summary y /convert/csv-to-xlsx.
+
+POST /jobs/<tipo> responde de inmediato con el id del trabajo (202); el estado se
+consulta en GET /jobs/<id> y el resultado en GET /jobs/<id>/result. Los trabajos
+se guardan en la memoria del proceso, así que el servidor debe correr con un solo
+worker (ver trabajos).
+"""
+import os
+import shutil
+import tempfile
+
+from flask import jsonify, request, send_file
+
+from trabajos import CANCELADO, COLA_TRABAJOS, COMPLETADO, ERROR, ColaLlena
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _guardar_archivo(directorio, nombre):
+    """Guarda el archivo subido en el directorio del trabajo para que el proceso trabajador lo lea."""
+    ruta = os.path.join(directorio, nombre)
+    request.files['file'].save(ruta)
+    return ruta
+
+
+def _argumentos(tipo, directorio):
+    """Argumentos posicionales y nombrados de cada tipo de trabajo a partir de la petición."""
+    if tipo == 'function-three':
+        return (request.get_json(silent=True) or {},), {}
+    if tipo == 'generic-two':
+        return (), {}
+    if tipo == 'csv-summary':
+        return (_guardar_archivo(directorio, 'entrada.csv'),), {}
+    if tipo == 'xlsx-summary':
+        columns = request.values.get('columns')
+        columns = [c.strip() for c in columns.split(',') if c.strip()] if columns else None
+        return (_guardar_archivo(directorio, 'entrada.xlsx'),), {'sheet': request.values.get('sheet'), 'columns': columns}
+    if tipo == 'convert-csv-to-xlsx':
+        return (_guardar_archivo(directorio, 'entrada.csv'), os.path.join(directorio, 'converted.xlsx')), {}
+    raise ValueError(f'Tipo de trabajo no válido: {tipo}')
+
+
+def enviar_trabajo(tipo):
+    if tipo in ('csv-summary', 'xlsx-summary', 'convert-csv-to-xlsx') and 'file' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    # Con la cola llena se rechaza antes de copiar el archivo subido al disco
+    try:
+        COLA_TRABAJOS.comprobar_lugar()
+    except ColaLlena as e:
+        return jsonify({'error': str(e)}), 429
+    directorio = tempfile.mkdtemp(prefix='trabajo_')
+    try:
+        args, kwargs = _argumentos(tipo, directorio)
+        archivo_resultado = args[1] if tipo == 'convert-csv-to-xlsx' else None
+        trabajo = COLA_TRABAJOS.enviar(tipo, *args, directorio=directorio,
+                                       archivo_resultado=archivo_resultado, **kwargs)
+    except ColaLlena as e:
+        shutil.rmtree(directorio, ignore_errors=True)
+        return jsonify({'error': str(e)}), 429
+    except ValueError as e:
+        shutil.rmtree(directorio, ignore_errors=True)
+        return jsonify({'error': str(e)}), 400
+    respuesta = trabajo.resumen()
+    respuesta['url_estado'] = f'/jobs/{trabajo.id}'
+    respuesta['url_resultado'] = f'/jobs/{trabajo.id}/result'
+    return jsonify(respuesta), 202
+
+
+def listar_trabajos():
+    return jsonify({'trabajos': COLA_TRABAJOS.listar(), 'cola': COLA_TRABAJOS.estadisticas()})
+
+
+def estado_trabajo(id_trabajo):
+    trabajo = COLA_TRABAJOS.obtener(id_trabajo)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(trabajo.resumen())
+
+
+def resultado_trabajo(id_trabajo):
+    """
+    200 con el resultado (o el archivo generado) si el trabajo terminó, 202 si sigue
+    pendiente, 400 si falló y 404 si no existe, se canceló o ya expiró.
+    """
+    trabajo = COLA_TRABAJOS.obtener(id_trabajo)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    estado = trabajo.estado
+    if estado == ERROR:
+        return jsonify(trabajo.resumen()), 400
+    if estado != COMPLETADO:
+        codigo = 404 if estado == CANCELADO else 202
+        return jsonify(trabajo.resumen()), codigo
+    if trabajo.archivo_resultado:
+        return send_file(trabajo.archivo_resultado, mimetype=XLSX_MIMETYPE, as_attachment=True,
+                         download_name='converted.xlsx')
+    respuesta = trabajo.resumen()
+    respuesta['resultado'] = trabajo.resultado()
+    return jsonify(respuesta)
+
+
+def cancelar_trabajo(id_trabajo):
+    cancelado = COLA_TRABAJOS.cancelar(id_trabajo)
+    if cancelado is None:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    trabajo = COLA_TRABAJOS.obtener(id_trabajo)
+    if not cancelado:
+        return jsonify(dict(trabajo.resumen(), error='El trabajo ya empezó o terminó y no se puede cancelar')), 409
+    return jsonify(trabajo.resumen())
@@ -0,0 +1,324 @@
+"""
+Fuentes de datos remotas y locales con caché en disco.
+
+Una FuenteDatos sabe leer una tabla completa y, si es incremental, solo las
+filas agregadas después de las primeras n. CacheFuentes guarda cada tabla en
+el almacén columnar (almacen_columnar) y decide cuándo volver a la red:
+
+- Mientras no vence el TTL se usa la copia en disco sin consultar la fuente.
+- Vencido el TTL se pregunta la versión a la fuente (fecha de modificación,
+  ETag, ...); si no cambió solo se renueva el TTL.
+- Si cambió y la fuente es incremental se descargan solo las filas nuevas y se
+  anexan; cada refresco_completo_segundos se descarga todo de nuevo para
+  recoger también filas editadas o borradas.
+
+obtener_combinado guarda además el resultado de combinar varias fuentes (por
+ejemplo un merge con conversión de fechas), identificado por la versión y el
+número de filas de cada entrada, así que un análisis repetido no vuelve a la
+red ni al merge.
+
+Los backends se eligen por URI con crear_fuente: 'gsheets:<url>' para Google
+Sheets, http(s):// para un CSV remoto y cualquier otra ruta para un archivo
+local (CSV o Excel), que sirve como sustituto sin red de los otros dos.
+"""
+import abc
+import os
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from almacen_columnar import actualizar_meta, anexar_filas, guardar_tabla, leer_meta, leer_tabla
+from cache_datos import CacheLRU, huella_archivo
+
+
+class FuenteDatos(abc.ABC):
+    """
+    Interfaz de una fuente de datos; cada backend implementa leer y leer_desde.
+
+    Args:
+        nombre (str): Identificador de la fuente; es también el nombre de su tabla en disco
+    """
+    # True si la fuente solo crece por el final y puede leer únicamente las filas nuevas
+    incremental = False
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+
+    def version(self) -> Optional[str]:
+        """Versión actual de los datos, consultada de forma barata; None si no se puede saber."""
+        return None
+
+    @abc.abstractmethod
+    def leer(self) -> pd.DataFrame:
+        """Tabla completa."""
+
+    @abc.abstractmethod
+    def leer_desde(self, filas: int) -> pd.DataFrame:
+        """
+        Filas posteriores a las primeras `filas`.
+
+        CacheFuentes solo lo usa con fuentes incrementales, que pueden leerlas sin
+        descargar la tabla completa.
+        """
+
+
+class FuenteArchivoLocal(FuenteDatos):
+    """Archivo CSV o Excel local. Los CSV se tratan como incrementales (solo se agregan filas al final)."""
+
+    def __init__(self, ruta: str, nombre: Optional[str] = None, **opciones_lectura):
+        super().__init__(nombre or os.path.splitext(os.path.basename(ruta))[0])
+        self.ruta = ruta
+        self.opciones_lectura = opciones_lectura
+        self.incremental = not ruta.lower().endswith(('.xlsx', '.xls'))
+
+    def version(self) -> Optional[str]:
+        try:
+            _, mtime, tamano = huella_archivo(self.ruta)
+        except FileNotFoundError:
+            return None
+        return f'{mtime}-{tamano}'
+
+    def leer(self) -> pd.DataFrame:
+        if not self.incremental:
+            return pd.read_excel(self.ruta, **self.opciones_lectura)
+        return pd.read_csv(self.ruta, **self.opciones_lectura)
+
+    def leer_desde(self, filas: int) -> pd.DataFrame:
+        if not self.incremental:
+            return self.leer().iloc[filas:].reset_index(drop=True)
+        return pd.read_csv(self.ruta, skiprows=range(1, filas + 1), **self.opciones_lectura)
+
+
+class FuenteCSVRemota(FuenteDatos):
+    """CSV descargado por HTTP(S). La versión se toma de los encabezados ETag o Last-Modified."""
+
+    def __init__(self, url: str, nombre: Optional[str] = None, timeout: float = 30, **opciones_lectura):
+        url = url.strip()
+        super().__init__(nombre or os.path.splitext(os.path.basename(url.split('?')[0]))[0] or 'csv_remoto')
+        self.url = url
+        self.timeout = timeout
+        self.opciones_lectura = opciones_lectura
+
+    def version(self) -> Optional[str]:
+        try:
+            peticion = urllib.request.Request(self.url, method='HEAD')
+            with urllib.request.urlopen(peticion, timeout=self.timeout) as respuesta:
+                return respuesta.headers.get('ETag') or respuesta.headers.get('Last-Modified')
+        except OSError:
+            return None
+
+    def leer(self) -> pd.DataFrame:
+        return pd.read_csv(self.url, **self.opciones_lectura)
+
+    def leer_desde(self, filas: int) -> pd.DataFrame:
+        # No es incremental: HTTP no permite pedir solo las filas nuevas del CSV
+        return self.leer().iloc[filas:].reset_index(drop=True)
+
+
+class FuenteGoogleSheets(FuenteDatos):
+    """
+    Primera hoja de un Google Sheet, leída con una cuenta de servicio.
+
+    La autenticación se hace una sola vez por proceso y solo cuando hace falta ir
+    a la red. Las filas nuevas se leen por rango, sin descargar la hoja completa.
+    """
+    incremental = True
+    SCOPE = ["https://spreadsheets.google.com/feeds ", "https://www.googleapis.com/auth/drive "]
+
+    def __init__(self, url: str, credenciales: str = 'credentials.json', nombre: Optional[str] = None):
+        super().__init__(nombre or 'google_sheet')
+        self.url = url
+        self.credenciales = credenciales
+        self._hoja = None
+        self._lock = threading.Lock()
+
+    def _obtener_hoja(self):
+        with self._lock:
+            if self._hoja is None:
+                import gspread
+                from oauth2client.service_account import ServiceAccountCredentials
+                try:
+                    credentials = ServiceAccountCredentials.from_json_keyfile_name(self.credenciales, self.SCOPE)
+                except Exception as e:
+                    raise ValueError(f'No se pudo cargar el archivo de credenciales: {e}')
+                self._hoja = gspread.authorize(credentials).open_by_url(self.url)
+            return self._hoja
+
+    def version(self) -> Optional[str]:
+        try:
+            return self._obtener_hoja().get_lastUpdateTime()
+        except ValueError:
+            raise
+        except Exception:
+            return None
+
+    def leer(self) -> pd.DataFrame:
+        return pd.DataFrame(self._obtener_hoja().sheet1.get_all_records())
+
+    def leer_desde(self, filas: int) -> pd.DataFrame:
+        from gspread.utils import numericise_all
+        hoja = self._obtener_hoja().sheet1
+        encabezado = hoja.row_values(1)
+        # Fila 1 = encabezado; las filas de datos ya guardadas ocupan 2..filas+1
+        valores = hoja.get_values(f'A{filas + 2}:ZZZ')
+        registros = [numericise_all(fila + [''] * (len(encabezado) - len(fila)))[:len(encabezado)]
+                     for fila in valores if any(celda != '' for celda in fila)]
+        return pd.DataFrame(registros, columns=encabezado)
+
+
+# Backends por prefijo de URI; los que no coinciden se tratan como archivo local
+BACKENDS = {
+    'gsheets:': lambda uri, **op: FuenteGoogleSheets(uri[len('gsheets:'):], **op),
+    'http://': FuenteCSVRemota,
+    'https://': FuenteCSVRemota,
+}
+
+
+def crear_fuente(uri: str, **opciones) -> FuenteDatos:
+    """Crea la fuente correspondiente al URI (ver BACKENDS)."""
+    uri = uri.strip()
+    for prefijo, backend in BACKENDS.items():
+        if uri.startswith(prefijo):
+            return backend(uri, **opciones)
+    return FuenteArchivoLocal(uri, **opciones)
+
+
+class CacheFuentes:
+    """
+    Caché en disco (y en memoria) de fuentes de datos y de sus combinaciones.
+
+    Args:
+        directorio (str): Directorio de las tablas en caché
+        ttl_segundos (float): Tiempo durante el cual no se consulta la fuente
+        refresco_completo_segundos (float): Cada cuánto una fuente incremental se descarga completa
+        memoria_max_bytes (int): Límite de la copia en memoria de las tablas leídas
+    """
+
+    def __init__(self, directorio: str = '.cache_fuentes', ttl_segundos: float = 3600,
+                 refresco_completo_segundos: float = 24 * 3600, memoria_max_bytes: int = 256 * 2**20):
+        self.directorio = directorio
+        self.ttl_segundos = ttl_segundos
+        self.refresco_completo_segundos = refresco_completo_segundos
+        self.memoria = CacheLRU(memoria_max_bytes)
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.descargas = 0
+        self.anexadas = 0
+        self.combinaciones = 0
+
+    def _lock_de(self, nombre: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(nombre, threading.Lock())
+
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def _leer(self, nombre: str, meta: Dict) -> pd.DataFrame:
+        # La copia en memoria se identifica por la fecha de escritura de la tabla en disco
+        clave = (nombre, meta['guardado'])
+        return self.memoria.obtener_o_calcular(clave, lambda: leer_tabla(self._ruta(nombre), mmap=False))
+
+    def estado(self, fuente: FuenteDatos) -> Dict:
+        """Versión y número de filas de la copia en disco de una fuente, sin ir a la red."""
+        meta = leer_meta(self._ruta(fuente.nombre)) or {'filas': 0, 'extra': {}}
+        return {'filas': meta['filas'], 'version': meta['extra'].get('version')}
+
+    def actualizar(self, fuente: FuenteDatos, forzar: bool = False) -> Dict:
+        """
+        Deja al día la copia en disco de una fuente y devuelve sus metadatos.
+
+        Args:
+            fuente (FuenteDatos): Fuente a actualizar
+            forzar (bool): Descargar la tabla completa aunque el TTL no haya vencido
+        """
+        ruta = self._ruta(fuente.nombre)
+        with self._lock_de(fuente.nombre):
+            meta = leer_meta(ruta)
+            ahora = time.time()
+            if meta is not None and not forzar:
+                extra = meta['extra']
+                if ahora - extra.get('verificado', 0) < self.ttl_segundos:
+                    return meta
+                version = fuente.version()
+                if version is not None and version == extra.get('version'):
+                    return actualizar_meta(ruta, verificado=ahora)
+                completo_vencido = ahora - extra.get('completo', 0) >= self.refresco_completo_segundos
+                if fuente.incremental and not completo_vencido:
+                    nuevas = fuente.leer_desde(meta['filas'])
+                    self.anexadas += len(nuevas)
+                    return anexar_filas(nuevas, ruta, version=version, verificado=ahora)
+            else:
+                version = fuente.version()
+
+            datos = fuente.leer()
+            self.descargas += 1
+            return guardar_tabla(datos, ruta, version=version, verificado=ahora, completo=ahora)
+
+    def obtener(self, fuente: FuenteDatos, forzar: bool = False) -> pd.DataFrame:
+        """Tabla de la fuente desde la caché, actualizándola primero si hace falta."""
+        meta = self.actualizar(fuente, forzar)
+        return self._leer(fuente.nombre, meta)
+
+    def obtener_combinado(self, nombre: str, fuentes: Dict[str, FuenteDatos],
+                          combinar: Callable[..., pd.DataFrame], incremental_en: Optional[str] = None,
+                          forzar: bool = False) -> pd.DataFrame:
+        """
+        Resultado de combinar(**tablas) con las tablas de varias fuentes, guardado en disco.
+
+        Solo se vuelve a combinar si cambió la versión o el número de filas de
+        alguna entrada. Si solo creció la entrada incremental_en por anexado (y
+        combinar trabaja fila por fila sobre ella, como un merge 'inner' o
+        'left'), se combinan únicamente sus filas nuevas y se anexan al
+        resultado; si esa entrada se descargó completa desde la última
+        combinación, se combina todo de nuevo.
+
+        Args:
+            nombre (str): Nombre de la tabla combinada en disco
+            fuentes (Dict[str, FuenteDatos]): Argumento de combinar -> fuente
+            combinar (Callable): Función que recibe las tablas como argumentos nombrados
+            incremental_en (str): Entrada cuyas filas nuevas se pueden combinar por separado
+            forzar (bool): Descargar todas las fuentes y volver a combinar
+        """
+        metas = {arg: self.actualizar(fuente, forzar) for arg, fuente in fuentes.items()}
+        # 'completo' marca la última descarga completa de cada entrada: si cambió, sus
+        # filas pudieron editarse, borrarse o reordenarse y no basta con anexar
+        entradas = {arg: {'version': m['extra'].get('version'), 'filas': m['filas'], 'guardado': m['guardado'],
+                          'completo': m['extra'].get('completo')}
+                    for arg, m in metas.items()}
+        ruta = self._ruta(nombre)
+
+        with self._lock_de(nombre):
+            meta = leer_meta(ruta)
+            previas = meta['extra'].get('entradas') if meta else None
+            if previas == entradas:
+                return self._leer(nombre, meta)
+
+            tablas = {arg: self._leer(fuente.nombre, metas[arg]) for arg, fuente in fuentes.items()}
+            solo_crecio = (
+                previas is not None and incremental_en is not None and not forzar
+                and set(previas) == set(entradas)
+                and all(previas[a] == entradas[a] for a in entradas if a != incremental_en)
+                and previas[incremental_en]['filas'] <= entradas[incremental_en]['filas']
+                and previas[incremental_en].get('completo') == entradas[incremental_en]['completo']
+            )
+            self.combinaciones += 1
+            if solo_crecio:
+                desde = previas[incremental_en]['filas']
+                tablas[incremental_en] = tablas[incremental_en].iloc[desde:]
+                meta = anexar_filas(combinar(**tablas), ruta, entradas=entradas)
+            else:
+                meta = guardar_tabla(combinar(**tablas), ruta, entradas=entradas)
+            return self._leer(nombre, meta)
+
+    def estadisticas(self) -> Dict:
+        return {'descargas': self.descargas, 'filas_anexadas': self.anexadas,
+                'combinaciones': self.combinaciones, 'memoria': self.memoria.estadisticas()}
+
+
+CACHE_FUENTES = CacheFuentes(
+    directorio=os.environ.get('FUENTES_CACHE_DIR', '.cache_fuentes'),
+    ttl_segundos=float(os.environ.get('FUENTES_TTL_SEGUNDOS', 3600)),
+)
@@ -1,9 +1,18 @@
+import os
 import random
-from flask import jsonify
+import time
+from flask import jsonify, request
+
+from cache_datos import CacheLRU
+from metricas import fase
+from motor_traduccion import MotorTraduccion, leer_diccionario
+
+MAX_FRASES_LOTE = 100_000
+MAX_LARGO_FRASE = 10_000
 
 def function_four():
     # Selecciona una clave aleatoria del diccionario
-    clave = random.choice(list(traducciones.keys()))
+    clave = random.choice(CLAVES)
     traduccion = traducciones.get(clave, "Traducción no encontrada.")
     return jsonify({'message': f'Traducción de "{clave}": {traduccion}'})
 
@@ -23,9 +32,88 @@ traducciones = {
     "see you later": "hasta luego"
 }
 
+# Diccionario adicional de frases (.json, .csv o .tsv), por ejemplo uno de 10^5 frases
+if os.environ.get('TRADUCCIONES_ARCHIVO'):
+    traducciones.update(leer_diccionario(os.environ['TRADUCCIONES_ARCHIVO']))
+
+# Se construyen una sola vez: las claves para function_four y el trie de frases para traducir
+CLAVES = tuple(traducciones)
+MOTOR = MotorTraduccion(traducciones)
+
+# Frases del diccionario encontradas en cada frase normalizada (MotorTraduccion.clave), de
+# modo que "Good morning!" y "good morning" comparten la entrada; la traducción se compone
+# después sobre el texto pedido, con sus mayúsculas, tildes y puntuación
+CACHE_TRADUCCIONES = CacheLRU(memoria_max_bytes=64 * 2**20,
+                              max_entradas=int(os.environ.get('TRADUCCIONES_CACHE_ENTRADAS', 100_000)))
+
 def traducir(frase):
-    frase = frase.lower().strip()
-    return traducciones.get(frase, "Traducción no encontrada.")
+    """Traduce la frase u oración completa, frase por frase (ver motor_traduccion)."""
+    traduccion, traducidas = MOTOR.traducir_con_conteo(frase.strip())
+    return traduccion if traducidas else "Traducción no encontrada."
+
+def traducir_en_cache(frase):
+    """Traducción de la frase (None si no hay nada que traducir) y si su clave estaba en la caché."""
+    clave, palabras, separadores = MOTOR.clave(frase)
+    faltante = object()
+    coincidencias = CACHE_TRADUCCIONES.get(clave, faltante)
+    acierto = coincidencias is not faltante
+    if not acierto:
+        coincidencias = MOTOR.coincidencias(clave)
+        CACHE_TRADUCCIONES.put(clave, coincidencias)
+    if not coincidencias:
+        return None, acierto
+    return MOTOR.componer(palabras, separadores, coincidencias), acierto
+
+def function_four_batch():
+    """
+    Traduce un lote de frases: {"phrases": ["Good morning", ...]} o directamente la lista.
+
+    Cada frase se busca en la caché por su forma normalizada (minúsculas, sin
+    tildes) antes de traducirla y las repetidas dentro del lote se traducen una
+    sola vez. La traducción se arma sobre el texto original, así que
+    "Good morning, José!" da "Buenos días, José!". La respuesta trae una
+    traducción por frase, en el mismo orden (null si ninguna palabra estaba en el
+    diccionario), la tasa de aciertos de la caché en el lote y en total, y la
+    latencia del lote.
+    """
+    inicio = time.perf_counter()
+    with fase('parse'):
+        data = request.get_json(silent=True)
+        frases = data.get('phrases') if isinstance(data, dict) else data
+        if not isinstance(frases, list):
+            return jsonify({'error': "Envíe {'phrases': [...]} o una lista de frases"}), 400
+        if len(frases) > MAX_FRASES_LOTE:
+            return jsonify({'error': f"El lote tiene {len(frases)} frases; el máximo es {MAX_FRASES_LOTE}"}), 413
+        invalida = next((i for i, f in enumerate(frases) if not isinstance(f, str)), None)
+        if invalida is not None:
+            return jsonify({'error': f"La frase {invalida} no es un texto"}), 400
+        larga = next((i for i, f in enumerate(frases) if len(f) > MAX_LARGO_FRASE), None)
+        if larga is not None:
+            return jsonify({'error': f"La frase {larga} pasa de {MAX_LARGO_FRASE} caracteres"}), 413
+
+    with fase('compute'):
+        resultados, aciertos = {}, 0
+        for frase in frases:
+            if frase not in resultados:
+                resultados[frase], acierto = traducir_en_cache(frase)
+                aciertos += acierto
+        # Las repetidas dentro del lote también se sirven sin traducir de nuevo
+        aciertos += len(frases) - len(resultados)
+        traducciones_lote = [resultados[f] for f in frases]
+
+    with fase('serialize'):
+        return jsonify({
+            'translations': traducciones_lote,
+            'stats': {
+                'phrases': len(frases),
+                'unique': len(resultados),
+                'cache_hits': aciertos,
+                'cache_misses': len(frases) - aciertos,
+                'hit_ratio': aciertos / len(frases) if frases else 0.0,
+                'latency_ms': (time.perf_counter() - inicio) * 1000,
+                'cache': CACHE_TRADUCCIONES.estadisticas(),
+            }
+        })
 
 if __name__ == "__main__":
     print("Traductor inglés a español. Escriba 'salir' para terminar.")
@@ -1,28 +1,51 @@
-from flask import jsonify
+from flask import jsonify, request
+import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from typing import Dict, List, Optional, Tuple
+from motor_prestamos import (
+    analizar_prestamos, matriz_saldos, rejilla_choques, simular_cambios_tasa, simular_prepago,
+    simular_refinanciamiento, simular_rejilla_choques, tabla_amortizacion
+)
+from almacen_columnar import cargar_ingerido
+from servicio_prestamos import CACHE_PORTAFOLIOS, ErrorServicio, ejecutar_analisis
+from graficos import renderizar_prestamos
 import warnings
 warnings.filterwarnings('ignore')
 
 
 def function_three():
     """
-    Esta función crea una instancia de la clase CalculadoraPrestamos, ejecuta la opción 2 del menú principal automáticamente y retorna un mensaje JSON.
+    Analiza el archivo de préstamos con los parámetros del cuerpo de la petición y
+    retorna los resultados en JSON.
+
+    Usa la capa de servicio (servicio_prestamos), que no depende de input() ni de
+    print(), así que varias peticiones pueden atenderse en paralelo. Sin cuerpo,
+    analiza loan_data.csv y exporta los resultados a data_prestamos.csv.
     """
-    calculadora = CalculadoraPrestamos()
-    # Patch input to simulate selecting option 2 and then 0 to exit
-    import builtins
-    original_input = builtins.input
-    inputs = iter(["1", "5", "data_prestamos.csv", "0"])  # Simula seleccionar la opción 2 y luego salir
-    builtins.input = lambda prompt=None: next(inputs)
+    parametros = request.get_json(silent=True) or {}
     try:
-        calculadora.menu_principal()
-    finally:
-        builtins.input = original_input
-    return jsonify({'message': 'El archivo loan_data.csv fue analizado y los resultados se pueden ver en data_prestamos.csv.'})
+        resultado = ejecutar_analisis(parametros)
+    except (ErrorServicio, KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    mensaje = f"El archivo {resultado['archivo']} fue analizado"
+    if 'exportacion' in resultado:
+        mensaje += f" y los resultados se pueden ver en {resultado['exportacion']['archivo']}"
+    resultado['message'] = mensaje + '.'
+    return jsonify(resultado)
+
+
+def function_three_cache():
+    """
+    GET: contadores de la caché de portafolios (aciertos, fallos, memoria, recargas).
+    DELETE: invalida la caché, o solo el archivo indicado en el campo 'archivo' del cuerpo.
+    """
+    if request.method == 'DELETE':
+        archivo = (request.get_json(silent=True) or {}).get('archivo')
+        eliminadas = CACHE_PORTAFOLIOS.invalidar_archivo(os.path.basename(archivo) if archivo else None)
+        return jsonify({'invalidadas': eliminadas, 'cache': CACHE_PORTAFOLIOS.estadisticas()})
+    return jsonify({'cache': CACHE_PORTAFOLIOS.estadisticas()})
 
 class CalculadoraPrestamos:
     """
@@ -53,7 +76,7 @@ class CalculadoraPrestamos:
             bool: True si la carga fue exitosa, False en caso contrario
         """
         try:
-            self.datos = pd.read_csv(self.archivo_csv)
+            self.datos = cargar_ingerido(self.archivo_csv)
             print("=" * 60)
             print("📊 DATOS DE PRÉSTAMOS CARGADOS EXITOSAMENTE")
             print("=" * 60)
@@ -172,56 +195,53 @@ class CalculadoraPrestamos:
         
         return pago_mensual
     
+    def tabla_amortizacion(self, principal: float, tasa_anual: float, tiempo_meses: int):
+        """
+        Genera la tabla de amortización de un préstamo de forma perezosa, un mes a la vez.
+        
+        Args:
+            principal (float): Monto del préstamo
+            tasa_anual (float): Tasa de interés anual
+            tiempo_meses (int): Tiempo en meses
+            
+        Yields:
+            Dict: Mes, Pago, Interes, Abono_Capital y Saldo de cada periodo
+        """
+        return tabla_amortizacion(principal, tasa_anual, tiempo_meses)
+    
+    def matriz_saldos(self, datos: Optional[pd.DataFrame] = None,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula la evolución del saldo de muchos préstamos en una matriz (préstamos × meses).
+        
+        Args:
+            datos (pd.DataFrame): Préstamos a procesar (por defecto todos los cargados)
+            out (np.ndarray): Matriz preasignada de forma (n, plazo máximo + 1)
+            
+        Returns:
+            np.ndarray: Saldo de cada préstamo tras cada mes (columna 0 = monto inicial)
+        """
+        if datos is None:
+            datos = self.datos
+        return matriz_saldos(
+            datos['Monto_Prestamo'], datos['Tasa_Interes_Anual'], datos['Tiempo_Meses'], out=out
+        )
+    
     def analizar_todos_prestamos(self) -> pd.DataFrame:
         """
         Analiza todos los préstamos del dataset y calcula métricas clave.
-        
+
+        Los cálculos se hacen por columnas completas con NumPy (ver
+        motor_prestamos.analizar_prestamos) en lugar de fila por fila.
+
         Returns:
             pd.DataFrame: DataFrame con análisis completo de todos los préstamos
         """
         if self.datos is None:
             print("❌ Primero debe cargar los datos")
             return None
-        
-        resultados = []
-        
-        for index, row in self.datos.iterrows():
-            # Calcular interés compuesto
-            calculo = self.calcular_interes_compuesto(
-                row['Monto_Prestamo'], 
-                row['Tasa_Interes_Anual'], 
-                row['Tiempo_Meses']
-            )
-            
-            # Calcular pago mensual
-            pago_mensual = self.calcular_pago_mensual(
-                row['Monto_Prestamo'], 
-                row['Tasa_Interes_Anual'], 
-                row['Tiempo_Meses']
-            )
-            
-            # Calcular costo total
-            costo_total = pago_mensual * row['Tiempo_Meses']
-            
-            # Crear registro de resultados
-            resultado = {
-                'Nombre': row['Nombre'],
-                'Edad': row['Edad'],
-                'Proposito': row['Proposito'],
-                'Monto_Original': row['Monto_Prestamo'],
-                'Tasa_Interes': row['Tasa_Interes_Anual'],
-                'Tiempo_Meses': row['Tiempo_Meses'],
-                'Pago_Mensual': pago_mensual,
-                'Costo_Total': costo_total,
-                'Interes_Total': costo_total - row['Monto_Prestamo'],
-                'Monto_Final_Compuesto': calculo['monto_final'],
-                'Diferencia_Simple_Compuesto': calculo['diferencia_compuesto_simple'],
-                'Porcentaje_Interes': (costo_total - row['Monto_Prestamo']) / row['Monto_Prestamo'] * 100
-            }
-            
-            resultados.append(resultado)
-        
-        self.resultados = pd.DataFrame(resultados)
+
+        self.resultados = analizar_prestamos(self.datos)
         return self.resultados
     
     def mostrar_ejemplos_detallados(self, n_ejemplos: int = 3):
@@ -303,36 +323,8 @@ class CalculadoraPrestamos:
         print("🔮 ANÁLISIS DE ESCENARIOS: '¿QUÉ PASARÍA SI?'")
         print("=" * 80)
         
-        resultados_escenarios = []
-        
-        for index, row in self.datos.iterrows():
-            tasa_original = row['Tasa_Interes_Anual']
-            pago_original = self.calcular_pago_mensual(
-                row['Monto_Prestamo'], tasa_original, row['Tiempo_Meses']
-            )
-            costo_original = pago_original * row['Tiempo_Meses']
-            
-            escenario = {
-                'Nombre': row['Nombre'],
-                'Tasa_Original': tasa_original,
-                'Costo_Original': costo_original
-            }
-            
-            for cambio in cambios_tasa:
-                nueva_tasa = max(0.1, tasa_original + cambio)  # Mínimo 0.1%
-                nuevo_pago = self.calcular_pago_mensual(
-                    row['Monto_Prestamo'], nueva_tasa, row['Tiempo_Meses']
-                )
-                nuevo_costo = nuevo_pago * row['Tiempo_Meses']
-                diferencia = nuevo_costo - costo_original
-                
-                escenario[f'Tasa_{cambio:+.0f}%'] = nueva_tasa
-                escenario[f'Costo_{cambio:+.0f}%'] = nuevo_costo
-                escenario[f'Diferencia_{cambio:+.0f}%'] = diferencia
-            
-            resultados_escenarios.append(escenario)
-        
-        df_escenarios = pd.DataFrame(resultados_escenarios)
+        # Todos los préstamos × cambios de tasa en una sola operación
+        df_escenarios = simular_cambios_tasa(self.datos, cambios_tasa)
         
         # Mostrar resumen
         print("\n📊 RESUMEN DE IMPACTO PROMEDIO:")
@@ -350,21 +342,112 @@ class CalculadoraPrestamos:
         
         return df_escenarios
     
-    def escenario_prepago(self, porcentaje_prepago: float = 0.10):
+    def escenario_rejilla_tasas(self, cambios_tasa: Optional[List[float]] = None,
+                                memoria_max_mb: float = 64, detalle: bool = False):
+        """
+        Evalúa una rejilla amplia de cambios de tasa (por ejemplo de -5% a +5% en
+        pasos de 5 puntos básicos) sobre todos los préstamos.
+
+        A diferencia de escenario_que_pasaria_si, no crea tres columnas por
+        cambio: calcula préstamos × cambios por bloques acotados en memoria y
+        devuelve agregados de cartera por cada cambio.
+
+        Args:
+            cambios_tasa (List[float]): Cambios en puntos porcentuales (por defecto
+                la rejilla de -5% a +5% en pasos de 0.05)
+            memoria_max_mb (float): Memoria máxima aproximada por bloque de préstamos
+            detalle (bool): Si es True también devuelve el detalle en formato largo
+
+        Returns:
+            Tuple[pd.DataFrame, Optional[pd.DataFrame]]: (agregados por cambio, detalle)
+        """
+        if self.datos is None:
+            print("❌ Primero debe cargar los datos")
+            return
+
+        if cambios_tasa is None:
+            cambios_tasa = rejilla_choques()
+
+        agregados, df_detalle = simular_rejilla_choques(
+            self.datos, cambios_tasa, memoria_max_mb=memoria_max_mb, detalle=detalle
+        )
+
+        print("=" * 80)
+        print(f"🔮 REJILLA DE ESCENARIOS DE TASA ({len(agregados)} cambios)")
+        print("=" * 80)
+        print(f"\n📊 IMPACTO EN LA CARTERA ({len(self.datos)} préstamos):")
+        print("-" * 50)
+        extremos = agregados.iloc[[0, len(agregados) // 2, -1]] if len(agregados) > 2 else agregados
+        for _, fila in extremos.iterrows():
+            print(f"Cambio de {fila['Cambio']:+.2f}%: ${fila['Diferencia_Total']:+,.0f} total, "
+                  f"${fila['Diferencia_Promedio']:+,.0f} promedio")
+
+        return agregados, df_detalle
+
+    def escenario_prepago(self, porcentaje_prepago=0.10, metodo: str = 'cerrado'):
         """
         Calcula el ahorro si se hacen pagos adicionales.
         
         Args:
-            porcentaje_prepago (float): Porcentaje adicional a pagar mensualmente
+            porcentaje_prepago (float | List[float]): Porcentaje adicional a pagar
+                mensualmente. Con una lista se evalúan varias políticas de prepago
+                en una sola pasada y el resultado incluye la columna Porcentaje_Prepago.
+            metodo (str): 'cerrado' calcula el mes de pago con la fórmula del número
+                de periodos para toda la cartera a la vez; 'iterativo' simula los
+                pagos mes a mes (ruta de referencia, mucho más lenta)
         """
         if self.datos is None:
             print("❌ Primero debe cargar los datos")
             return
         
+        varias_politicas = not np.isscalar(porcentaje_prepago)
+        porcentajes = [float(p) for p in np.atleast_1d(porcentaje_prepago)]
+        
         print("=" * 80)
-        print(f"💰 ESCENARIO DE PREPAGO ({porcentaje_prepago*100:.0f}% ADICIONAL MENSUAL)")
+        etiqueta = ", ".join(f"{p*100:.0f}%" for p in porcentajes)
+        print(f"💰 ESCENARIO DE PREPAGO ({etiqueta} ADICIONAL MENSUAL)")
         print("=" * 80)
         
+        if metodo == 'iterativo':
+            df_prepago = pd.concat(
+                [self._prepago_iterativo(p) for p in porcentajes], ignore_index=True
+            )
+        else:
+            df_prepago = simular_prepago(self.datos, porcentajes)
+        
+        if varias_politicas:
+            # Resumen por política
+            print(f"\n📊 RESUMEN DE AHORROS POR POLÍTICA:")
+            print("-" * 40)
+            resumen = df_prepago.groupby('Porcentaje_Prepago', sort=False).agg(
+                ahorro=('Ahorro_Dinero', 'mean'), tiempo=('Ahorro_Tiempo_Meses', 'mean')
+            )
+            for porcentaje, fila in resumen.iterrows():
+                print(f"{porcentaje*100:.0f}% adicional: ${fila['ahorro']:,.0f} promedio, "
+                      f"{fila['tiempo']:.1f} meses ahorrados")
+            return df_prepago
+        
+        df_prepago = df_prepago.drop(columns='Porcentaje_Prepago')
+        
+        # Mostrar resumen
+        print(f"\n📊 RESUMEN DE AHORROS:")
+        print("-" * 40)
+        ahorro_promedio = df_prepago['Ahorro_Dinero'].mean()
+        tiempo_promedio = df_prepago['Ahorro_Tiempo_Meses'].mean()
+        print(f"Ahorro promedio: ${ahorro_promedio:,.0f}")
+        print(f"Tiempo ahorrado promedio: {tiempo_promedio:.1f} meses")
+        
+        # Top 5 ahorros
+        print(f"\n🎯 TOP 5 MAYORES AHORROS:")
+        print("-" * 40)
+        top_ahorros = df_prepago.nlargest(5, 'Ahorro_Dinero')
+        for _, row in top_ahorros.iterrows():
+            print(f"{row['Nombre']}: ${row['Ahorro_Dinero']:,.0f} ({row['Ahorro_Tiempo_Meses']:.0f} meses)")
+        
+        return df_prepago
+    
+    def _prepago_iterativo(self, porcentaje_prepago: float) -> pd.DataFrame:
+        """Simula el prepago mes a mes para cada préstamo (ruta de referencia)."""
         resultados_prepago = []
         
         for index, row in self.datos.iterrows():
@@ -395,6 +478,7 @@ class CalculadoraPrestamos:
             ahorro_tiempo = row['Tiempo_Meses'] - mes
             
             resultado = {
+                'Porcentaje_Prepago': porcentaje_prepago,
                 'Nombre': row['Nombre'],
                 'Pago_Normal': pago_normal,
                 'Pago_Con_Prepago': pago_con_prepago,
@@ -408,24 +492,7 @@ class CalculadoraPrestamos:
             
             resultados_prepago.append(resultado)
         
-        df_prepago = pd.DataFrame(resultados_prepago)
-        
-        # Mostrar resumen
-        print(f"\n📊 RESUMEN DE AHORROS:")
-        print("-" * 40)
-        ahorro_promedio = df_prepago['Ahorro_Dinero'].mean()
-        tiempo_promedio = df_prepago['Ahorro_Tiempo_Meses'].mean()
-        print(f"Ahorro promedio: ${ahorro_promedio:,.0f}")
-        print(f"Tiempo ahorrado promedio: {tiempo_promedio:.1f} meses")
-        
-        # Top 5 ahorros
-        print(f"\n🎯 TOP 5 MAYORES AHORROS:")
-        print("-" * 40)
-        top_ahorros = df_prepago.nlargest(5, 'Ahorro_Dinero')
-        for _, row in top_ahorros.iterrows():
-            print(f"{row['Nombre']}: ${row['Ahorro_Dinero']:,.0f} ({row['Ahorro_Tiempo_Meses']:.0f} meses)")
-        
-        return df_prepago
+        return pd.DataFrame(resultados_prepago)
     
     def escenario_refinanciamiento(self, nueva_tasa: float = 3.5):
         """
@@ -442,40 +509,7 @@ class CalculadoraPrestamos:
         print(f"🔄 ANÁLISIS DE REFINANCIAMIENTO (Nueva tasa: {nueva_tasa}%)")
         print("=" * 80)
         
-        resultados_refi = []
-        
-        for index, row in self.datos.iterrows():
-            # Costo actual
-            pago_actual = self.calcular_pago_mensual(
-                row['Monto_Prestamo'], row['Tasa_Interes_Anual'], row['Tiempo_Meses']
-            )
-            costo_actual = pago_actual * row['Tiempo_Meses']
-            
-            # Costo con refinanciamiento
-            pago_nuevo = self.calcular_pago_mensual(
-                row['Monto_Prestamo'], nueva_tasa, row['Tiempo_Meses']
-            )
-            costo_nuevo = pago_nuevo * row['Tiempo_Meses']
-            
-            ahorro = costo_actual - costo_nuevo
-            porcentaje_ahorro = (ahorro / costo_actual) * 100
-            
-            resultado = {
-                'Nombre': row['Nombre'],
-                'Tasa_Actual': row['Tasa_Interes_Anual'],
-                'Tasa_Nueva': nueva_tasa,
-                'Pago_Actual': pago_actual,
-                'Pago_Nuevo': pago_nuevo,
-                'Costo_Actual': costo_actual,
-                'Costo_Nuevo': costo_nuevo,
-                'Ahorro': ahorro,
-                'Porcentaje_Ahorro': porcentaje_ahorro,
-                'Conviene_Refinanciar': ahorro > 0
-            }
-            
-            resultados_refi.append(resultado)
-        
-        df_refi = pd.DataFrame(resultados_refi)
+        df_refi = simular_refinanciamiento(self.datos, nueva_tasa)
         
         # Mostrar resumen
         conviene_count = df_refi['Conviene_Refinanciar'].sum()
@@ -497,99 +531,60 @@ class CalculadoraPrestamos:
         
         return df_refi
     
-    def crear_visualizaciones(self):
-        """Crea todas las visualizaciones solicitadas."""
-        if self.resultados is None:
-            print("❌ Primero debe analizar los préstamos")
+    def analisis_paralelo(self, procesos: Optional[int] = None, tareas: Optional[Dict] = None,
+                          top: int = 5) -> Optional[Dict]:
+        """
+        Ejecuta el análisis y los escenarios sobre toda la cartera repartida en
+        varios procesos (ver paralelo_prestamos). Pensado para carteras de
+        millones de préstamos; devuelve agregados y top-k en lugar de una fila
+        por préstamo.
+        
+        Args:
+            procesos (int): Número de procesos (por defecto todos los núcleos)
+            tareas (Dict): Tareas a ejecutar (por defecto paralelo_prestamos.TAREAS)
+            top (int): Tamaño de las listas de préstamos destacados
+        
+        Returns:
+            Dict: Resultados combinados de todos los fragmentos
+        """
+        if self.datos is None:
+            print("❌ Primero debe cargar los datos")
             return
         
-        # Configurar estilo
-        plt.style.use('seaborn-v0_8')
-        fig = plt.figure(figsize=(20, 15))
-        
-        # 1. Gráfico de barras: Costo total por persona
-        plt.subplot(2, 3, 1)
-        top_10 = self.resultados.nlargest(10, 'Costo_Total')
-        plt.barh(range(len(top_10)), top_10['Costo_Total'])
-        plt.yticks(range(len(top_10)), [name.split()[0] for name in top_10['Nombre']])
-        plt.xlabel('Costo Total ($)')
-        plt.title('Top 10 Préstamos por Costo Total')
-        plt.gca().xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
-        
-        # 2. Histograma: Distribución de tasas de interés
-        plt.subplot(2, 3, 2)
-        plt.hist(self.datos['Tasa_Interes_Anual'], bins=15, alpha=0.7, color='skyblue')
-        plt.xlabel('Tasa de Interés Anual (%)')
-        plt.ylabel('Frecuencia')
-        plt.title('Distribución de Tasas de Interés')
-        
-        # 3. Scatter plot: Monto vs Costo Total
-        plt.subplot(2, 3, 3)
-        plt.scatter(self.resultados['Monto_Original'], self.resultados['Costo_Total'], 
-                   alpha=0.7, s=50)
-        plt.xlabel('Monto Original ($)')
-        plt.ylabel('Costo Total ($)')
-        plt.title('Relación Monto Original vs Costo Total')
-        plt.gca().xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
-        plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
-        
-        # 4. Gráfico de barras: Costo por propósito
-        plt.subplot(2, 3, 4)
-        costo_por_proposito = self.resultados.groupby('Proposito')['Costo_Total'].mean()
-        plt.bar(range(len(costo_por_proposito)), costo_por_proposito.values)
-        plt.xticks(range(len(costo_por_proposito)), 
-                  [prop.replace(' ', '\n') for prop in costo_por_proposito.index], 
-                  rotation=45, ha='right')
-        plt.ylabel('Costo Promedio ($)')
-        plt.title('Costo Promedio por Propósito')
-        plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
-        
-        # 5. Evolución del saldo para los primeros 5 préstamos
-        plt.subplot(2, 3, 5)
-        for i in range(min(5, len(self.datos))):
-            row = self.datos.iloc[i]
-            saldo = row['Monto_Prestamo']
-            pago_mensual = self.calcular_pago_mensual(
-                row['Monto_Prestamo'], row['Tasa_Interes_Anual'], row['Tiempo_Meses']
-            )
-            tasa_mensual = row['Tasa_Interes_Anual'] / 100 / 12
-            
-            saldos = [saldo]
-            for mes in range(row['Tiempo_Meses']):
-                interes = saldo * tasa_mensual
-                principal = pago_mensual - interes
-                saldo = max(0, saldo - principal)
-                saldos.append(saldo)
-            
-            plt.plot(saldos, label=row['Nombre'].split()[0], linewidth=2)
-        
-        plt.xlabel('Mes')
-        plt.ylabel('Saldo Pendiente ($)')
-        plt.title('Evolución del Saldo - Primeros 5 Préstamos')
-        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.gca().yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
-        
-        # 6. Comparación Interés Simple vs Compuesto
-        plt.subplot(2, 3, 6)
-        diferencias = []
-        nombres = []
-        for index, row in self.datos.iterrows():
-            calculo = self.calcular_interes_compuesto(
-                row['Monto_Prestamo'], row['Tasa_Interes_Anual'], row['Tiempo_Meses']
-            )
-            diferencias.append(calculo['diferencia_compuesto_simple'])
-            nombres.append(row['Nombre'].split()[0])
+        from paralelo_prestamos import evaluar_en_paralelo
+        resultado = evaluar_en_paralelo(self.datos, tareas, top, procesos)
+        
+        if 'analisis' in resultado:
+            analisis = resultado['analisis']
+            print(f"📊 {analisis['prestamos']:,} préstamos analizados")
+            print(f"Costo total de la cartera: ${analisis['costo_total']:,.0f}")
+            print(f"Interés total: ${analisis['interes_total']:,.0f}")
+        return resultado
+    
+    def crear_visualizaciones(self, archivo_salida: str = "visualizaciones_prestamos.png"):
+        """
+        Crea todas las visualizaciones solicitadas y las guarda como imagen.
+        
+        Se dibujan sin pantalla (ver graficos.py), así que funciona igual en un
+        servidor; el formato (png o svg) se toma de la extensión del archivo.
+        
+        Args:
+            archivo_salida (str): Archivo de imagen de salida
         
-        plt.barh(range(len(diferencias)), diferencias)
-        plt.yticks(range(len(diferencias)), nombres)
-        plt.xlabel('Diferencia Compuesto - Simple ($)')
-        plt.title('Diferencia: Interés Compuesto vs Simple')
-        plt.gca().xaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x/1e3:.0f}K'))
+        Returns:
+            str: Ruta del archivo generado
+        """
+        if self.resultados is None:
+            print("❌ Primero debe analizar los préstamos")
+            return
         
-        plt.tight_layout()
-        plt.show()
+        formato = os.path.splitext(archivo_salida)[1].lstrip('.').lower() or 'png'
+        contenido, _, _ = renderizar_prestamos('panel', self.datos, self.resultados, formato)
+        with open(archivo_salida, 'wb') as f:
+            f.write(contenido)
         
-        print("📊 Visualizaciones generadas exitosamente")
+        print(f"📊 Visualizaciones generadas exitosamente en '{archivo_salida}'")
+        return archivo_salida
     
     def exportar_resultados(self, archivo_salida: str = "resultados_analisis.csv"):
         """
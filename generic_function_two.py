@@ -1,53 +1,74 @@
 from flask import jsonify, request
+import os
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 
+from fuentes_datos import CACHE_FUENTES, crear_fuente
+from graficos import renderizar_hurtos
 
-def generic_function_two():
-    # Configurar credenciales para Google Sheets
-    scope = ["https://spreadsheets.google.com/feeds ", "https://www.googleapis.com/auth/drive "]
-    try:
-        credentials = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-    except Exception as e:
-        return jsonify({'error': f'No se pudo cargar el archivo de credenciales: {e}'}), 400
-    gc = gspread.authorize(credentials)
 
-    # Abrir el Google Sheet por URL
-    spreadsheet_url = 'https://docs.google.com/spreadsheets/d/1IJVH31MqUVSxv3mVnhtST9bwvUFLUqBNxmaEZ9DNEPg/edit?usp=sharing'
-    spreadsheet = gc.open_by_url(spreadsheet_url)
-    worksheet = spreadsheet.sheet1
-    data = worksheet.get_all_records()
-    df_hurtos = pd.DataFrame(data)
+SPREADSHEET_URL = 'https://docs.google.com/spreadsheets/d/1IJVH31MqUVSxv3mVnhtST9bwvUFLUqBNxmaEZ9DNEPg/edit?usp=sharing'
+DEPARTAMENTOS_URL = " https://www.datos.gov.co/resource/ya3g-4kqg.csv "
 
-    # Cargar los datos de departamentos
-    df_departamentos = pd.read_csv(" https://www.datos.gov.co/resource/ya3g-4kqg.csv ")
+# HURTOS_FUENTE / DEPARTAMENTOS_FUENTE permiten usar archivos locales en lugar de la red
+FUENTE_HURTOS = crear_fuente(os.environ.get('HURTOS_FUENTE', 'gsheets:' + SPREADSHEET_URL), nombre='hurtos')
+FUENTE_DEPARTAMENTOS = crear_fuente(os.environ.get('DEPARTAMENTOS_FUENTE', DEPARTAMENTOS_URL), nombre='departamentos')
 
-    # Cruzar datos
-    df = df_hurtos.merge(df_departamentos, how="inner", left_on="COD_DEPTO", right_on="iddepto")
 
-    # Convertir fecha
+def combinar_hurtos(hurtos, departamentos):
+    """Cruza los hurtos con los departamentos y agrega el año; trabaja fila por fila sobre los hurtos."""
+    df = hurtos.merge(departamentos, how="inner", left_on="COD_DEPTO", right_on="iddepto")
     df['FECHA HECHO'] = pd.to_datetime(df['FECHA HECHO'], format='%d/%m/%Y')
     df['AÑO'] = df['FECHA HECHO'].dt.year
+    return df
+
+
+def cargar_hurtos(forzar=False):
+    """
+    Hurtos cruzados con los departamentos y con el año, desde la caché de fuentes.
+
+    La red solo se consulta cuando vence el TTL de la caché; si la hoja de hurtos
+    solo creció, se descargan y cruzan únicamente las filas nuevas.
+
+    Raises:
+        ValueError: Si no se puede cargar el archivo de credenciales
+    """
+    return CACHE_FUENTES.obtener_combinado(
+        'hurtos_departamentos',
+        {'hurtos': FUENTE_HURTOS, 'departamentos': FUENTE_DEPARTAMENTOS},
+        combinar_hurtos, incremental_en='hurtos', forzar=forzar)
+
 
-    # Gráfico de caja
-    plt.figure(figsize=(15, 6))
-    sns.boxplot(y="CANTIDAD", data=df)
-    plt.title("Distribución de la variable cantidad de hurtos a personas")
-    plt.ylabel("Cantidad")
-    plt.show()
+def resumen_hurtos(df):
+    """Estadísticas de la cantidad de hurtos, en total y por año."""
+    por_anio = df.groupby('AÑO')['CANTIDAD'].describe()
+    return {
+        'registros': len(df),
+        'cantidad': df['CANTIDAD'].describe().to_dict(),
+        'por_anio': {int(anio): fila.to_dict() for anio, fila in por_anio.iterrows()}
+    }
 
-    # Gráfico por año
-    plt.figure(figsize=(15, 6))
-    sns.boxplot(x="AÑO", y="CANTIDAD", data=df)
-    plt.title("Distribución por año")
-    plt.xlabel("Año")
-    plt.ylabel("Cantidad")
-    plt.show()
 
-    print("Análisis completado.")
+def analizar_hurtos():
+    """Carga y resume los hurtos sin generar gráficos; es la versión en segundo plano de /generic/two."""
+    return resumen_hurtos(cargar_hurtos())
+
+
+def generic_function_two():
+    try:
+        df = cargar_hurtos()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Los diagramas se renderizan sin pantalla y se sirven desde /graficos/<clave>
+    formato = request.args.get('formato', 'png')
+    try:
+        claves = renderizar_hurtos(df, formato)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify({'message': 'This is a scaffold for generic_function_two.'})
\ No newline at end of file
+    return jsonify({
+        'message': 'Análisis completado.',
+        'resumen': resumen_hurtos(df),
+        'graficos': {nombre: f'/graficos/{clave}' for nombre, clave in claves.items()}
+    })
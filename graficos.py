@@ -0,0 +1,283 @@
+"""
+Renderizado de gráficos sin pantalla, con caché.
+
+Los gráficos se dibujan sobre matplotlib.figure.Figure con el backend Agg (sin
+pyplot ni ventanas) y se devuelven como bytes PNG o SVG. Cada imagen se guarda
+en CACHE_GRAFICOS con una clave que resume los datos de entrada, el gráfico y
+sus parámetros, así que pedir dos veces el mismo gráfico no vuelve a dibujarlo.
+
+Para que el tiempo de dibujo no crezca con la cartera, las series grandes se
+agregan antes de dibujar: los histogramas se calculan con np.histogram, la
+dispersión de más de MAX_PUNTOS_DISPERSION préstamos se dibuja como hexbin, las
+gráficas de barras por préstamo muestran solo los MAX_BARRAS mayores y los
+diagramas de caja se dibujan desde sus estadísticas con un máximo de atípicos.
+"""
+import hashlib
+import inspect
+import io
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from matplotlib import cbook, style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+import numpy as np
+import pandas as pd
+
+from cache_datos import CacheLRU
+from motor_prestamos import matriz_saldos
+
+FORMATOS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+ESTILO = 'seaborn-v0_8'
+MAX_PUNTOS_DISPERSION = 20_000
+MAX_BARRAS = 20
+MAX_ATIPICOS = 500
+
+# Imágenes ya renderizadas: clave -> (bytes, mimetype)
+CACHE_GRAFICOS = CacheLRU(memoria_max_bytes=64 * 2**20, max_entradas=512)
+
+# El estilo y el estado de matplotlib son globales; se dibuja una figura a la vez
+_lock_render = threading.Lock()
+
+
+def _actualizar_huella(digest, valores: np.ndarray):
+    if valores.dtype == object or valores.dtype.kind in 'OUT':
+        # Unir el texto es bastante más rápido que pd.util.hash_pandas_object en columnas de texto
+        digest.update('\x1f'.join(map(str, valores)).encode())
+    else:
+        digest.update(np.ascontiguousarray(valores).tobytes())
+
+
+def huella_datos(*objetos) -> str:
+    """Hash SHA-1 del contenido de DataFrames, Series, arreglos u otros valores."""
+    digest = hashlib.sha1()
+    for objeto in objetos:
+        if isinstance(objeto, pd.DataFrame):
+            digest.update(repr(list(objeto.columns)).encode())
+            for columna in objeto.columns:
+                _actualizar_huella(digest, objeto[columna].to_numpy())
+        elif isinstance(objeto, pd.Series):
+            _actualizar_huella(digest, objeto.to_numpy())
+        elif isinstance(objeto, np.ndarray):
+            _actualizar_huella(digest, objeto)
+        else:
+            digest.update(repr(objeto).encode())
+    return digest.hexdigest()
+
+
+def clave_grafico(nombre: str, huella_entrada, formato: str, parametros: Dict) -> str:
+    """Clave de caché de un gráfico: datos de entrada, nombre, formato y parámetros."""
+    return huella_datos(nombre, huella_entrada, formato, sorted(parametros.items()))
+
+
+def figura_a_bytes(figura: Figure, formato: str = 'png', dpi: int = 100) -> bytes:
+    """Renderiza una figura con el backend Agg (o el de SVG) y devuelve los bytes del archivo."""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no válido: {formato}. Use {list(FORMATOS)}")
+    FigureCanvasAgg(figura)
+    salida = io.BytesIO()
+    figura.savefig(salida, format=formato, dpi=dpi, bbox_inches='tight')
+    return salida.getvalue()
+
+
+def renderizar(clave: str, dibujar: Callable[[], Figure], formato: str = 'png') -> Tuple[bytes, str]:
+    """
+    Devuelve la imagen guardada con esa clave o la dibuja con dibujar() y la guarda.
+
+    Returns:
+        Tuple[bytes, str]: (contenido, mimetype)
+    """
+    def calcular():
+        with _lock_render, style.context(ESTILO):
+            return figura_a_bytes(dibujar(), formato), FORMATOS[formato]
+    return CACHE_GRAFICOS.obtener_o_calcular(clave, calcular)
+
+
+def obtener_grafico(clave: str) -> Optional[Tuple[bytes, str]]:
+    """Imagen ya renderizada por su clave, o None si no existe o fue expulsada."""
+    return CACHE_GRAFICOS.get(clave)
+
+
+def _en_millones(eje):
+    eje.set_major_formatter(FuncFormatter(lambda x, p: f'${x/1e6:.1f}M'))
+
+
+# Gráficos de la cartera de préstamos (los seis de CalculadoraPrestamos.crear_visualizaciones)
+
+def dibujar_costo_top(ax, datos, resultados, n: int = 10):
+    top = resultados.nlargest(n, 'Costo_Total')
+    ax.barh(range(len(top)), top['Costo_Total'])
+    ax.set_yticks(range(len(top)), [str(nombre).split()[0] for nombre in top['Nombre']])
+    ax.set_xlabel('Costo Total ($)')
+    ax.set_title(f'Top {n} Préstamos por Costo Total')
+    _en_millones(ax.xaxis)
+
+
+def dibujar_tasas(ax, datos, resultados, bins: int = 15):
+    conteos, bordes = np.histogram(datos['Tasa_Interes_Anual'].to_numpy(dtype=np.float64), bins=bins)
+    ax.stairs(conteos, bordes, fill=True, alpha=0.7, color='skyblue')
+    ax.set_xlabel('Tasa de Interés Anual (%)')
+    ax.set_ylabel('Frecuencia')
+    ax.set_title('Distribución de Tasas de Interés')
+
+
+def dibujar_monto_vs_costo(ax, datos, resultados, max_puntos: int = MAX_PUNTOS_DISPERSION):
+    monto = resultados['Monto_Original'].to_numpy(dtype=np.float64)
+    costo = resultados['Costo_Total'].to_numpy(dtype=np.float64)
+    if len(monto) <= max_puntos:
+        ax.scatter(monto, costo, alpha=0.7, s=50)
+    else:
+        # Con muchos préstamos se dibuja la densidad por celdas en lugar de cada punto
+        celdas = ax.hexbin(monto, costo, gridsize=60, bins='log', mincnt=1, cmap='viridis')
+        ax.figure.colorbar(celdas, ax=ax, label='Préstamos (log)')
+    ax.set_xlabel('Monto Original ($)')
+    ax.set_ylabel('Costo Total ($)')
+    ax.set_title('Relación Monto Original vs Costo Total')
+    _en_millones(ax.xaxis)
+    _en_millones(ax.yaxis)
+
+
+def dibujar_costo_proposito(ax, datos, resultados):
+    costo_por_proposito = resultados.groupby('Proposito')['Costo_Total'].mean()
+    ax.bar(range(len(costo_por_proposito)), costo_por_proposito.values)
+    ax.set_xticks(range(len(costo_por_proposito)),
+                  [prop.replace(' ', '\n') for prop in costo_por_proposito.index],
+                  rotation=45, ha='right')
+    ax.set_ylabel('Costo Promedio ($)')
+    ax.set_title('Costo Promedio por Propósito')
+    _en_millones(ax.yaxis)
+
+
+def dibujar_saldos(ax, datos, resultados, n: int = 5):
+    primeros = datos.head(n)
+    tiempos = primeros['Tiempo_Meses'].to_numpy()
+    saldos = matriz_saldos(primeros['Monto_Prestamo'], primeros['Tasa_Interes_Anual'], tiempos)
+    for i, nombre in enumerate(primeros['Nombre']):
+        ax.plot(saldos[i, :tiempos[i] + 1], label=str(nombre).split()[0], linewidth=2)
+    ax.set_xlabel('Mes')
+    ax.set_ylabel('Saldo Pendiente ($)')
+    ax.set_title(f'Evolución del Saldo - Primeros {len(primeros)} Préstamos')
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    _en_millones(ax.yaxis)
+
+
+def dibujar_compuesto_simple(ax, datos, resultados, n: int = MAX_BARRAS):
+    # La diferencia ya está en los resultados del análisis; no se recalcula fila por fila
+    if len(resultados) <= n:
+        seleccion = resultados
+        titulo = 'Diferencia: Interés Compuesto vs Simple'
+    else:
+        seleccion = resultados.nlargest(n, 'Diferencia_Simple_Compuesto')
+        titulo = f'Diferencia: Interés Compuesto vs Simple (top {n})'
+    ax.barh(range(len(seleccion)), seleccion['Diferencia_Simple_Compuesto'])
+    ax.set_yticks(range(len(seleccion)), [str(nombre).split()[0] for nombre in seleccion['Nombre']])
+    ax.set_xlabel('Diferencia Compuesto - Simple ($)')
+    ax.set_title(titulo)
+    ax.xaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x/1e3:.0f}K'))
+
+
+GRAFICOS_PRESTAMOS = {
+    'costo_top': dibujar_costo_top,
+    'tasas': dibujar_tasas,
+    'monto_vs_costo': dibujar_monto_vs_costo,
+    'costo_proposito': dibujar_costo_proposito,
+    'saldos': dibujar_saldos,
+    'compuesto_simple': dibujar_compuesto_simple,
+}
+
+
+def figura_prestamos(nombre: str, datos: pd.DataFrame, resultados: pd.DataFrame, **parametros) -> Figure:
+    """Figura de un gráfico de GRAFICOS_PRESTAMOS, o 'panel' con los seis en una cuadrícula de 2x3."""
+    if nombre == 'panel':
+        figura = Figure(figsize=(20, 15))
+        for i, dibujar in enumerate(GRAFICOS_PRESTAMOS.values()):
+            dibujar(figura.add_subplot(2, 3, i + 1), datos, resultados)
+        figura.tight_layout()
+        return figura
+    if nombre not in GRAFICOS_PRESTAMOS:
+        raise ValueError(f"Gráfico no válido: {nombre}. Use {['panel'] + list(GRAFICOS_PRESTAMOS)}")
+    figura = Figure(figsize=(10, 6))
+    GRAFICOS_PRESTAMOS[nombre](figura.add_subplot(), datos, resultados, **parametros)
+    return figura
+
+
+def renderizar_prestamos(nombre: str, datos: pd.DataFrame, resultados: pd.DataFrame, formato: str = 'png',
+                         huella_entrada=None, **parametros) -> Tuple[bytes, str, str]:
+    """
+    Renderiza un gráfico de la cartera (o el panel completo) con caché.
+
+    Args:
+        nombre (str): 'panel' o una clave de GRAFICOS_PRESTAMOS
+        datos (pd.DataFrame): Datos con el esquema de loan_data.csv
+        resultados (pd.DataFrame): Resultado de analizar_prestamos(datos)
+        formato (str): 'png' o 'svg'
+        huella_entrada: Identificador ya conocido de los datos (p. ej. la huella del
+            archivo); si se omite se calcula un hash del contenido de datos
+        **parametros: Parámetros del gráfico (n, bins, max_puntos); se ignoran los que no acepta
+
+    Returns:
+        Tuple[bytes, str, str]: (contenido, mimetype, clave)
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no válido: {formato}. Use {list(FORMATOS)}")
+    if nombre != 'panel' and nombre not in GRAFICOS_PRESTAMOS:
+        raise ValueError(f"Gráfico no válido: {nombre}. Use {['panel'] + list(GRAFICOS_PRESTAMOS)}")
+    # Solo cuentan los parámetros que el gráfico acepta (ninguno en el panel, que dibuja
+    # cada gráfico con sus valores por defecto): los demás no cambian la imagen y no
+    # deben fallar ni crear entradas distintas en la caché
+    aceptados = inspect.signature(GRAFICOS_PRESTAMOS[nombre]).parameters if nombre != 'panel' else {}
+    parametros = {p: v for p, v in parametros.items() if p in aceptados}
+    if huella_entrada is None:
+        huella_entrada = huella_datos(datos)
+    clave = clave_grafico(nombre, huella_entrada, formato, parametros)
+    contenido, mimetype = renderizar(clave, lambda: figura_prestamos(nombre, datos, resultados, **parametros), formato)
+    return contenido, mimetype, clave
+
+
+# Gráficos de hurtos (generic_function_two)
+
+def dibujar_cajas(ax, grupos: Dict, max_atipicos: int = MAX_ATIPICOS):
+    """
+    Diagrama de caja calculado desde las estadísticas de cada grupo; de los atípicos
+    se dibuja como máximo max_atipicos por grupo (los más extremos).
+    """
+    estadisticas = []
+    for etiqueta, valores in grupos.items():
+        valores = np.asarray(valores, dtype=np.float64)
+        stats = cbook.boxplot_stats(valores[~np.isnan(valores)], labels=[etiqueta])[0]
+        atipicos = np.sort(stats['fliers'])
+        if len(atipicos) > max_atipicos:
+            mitad = max_atipicos // 2
+            atipicos = np.concatenate([atipicos[:mitad], atipicos[-(max_atipicos - mitad):]])
+        stats['fliers'] = atipicos
+        estadisticas.append(stats)
+    ax.bxp(estadisticas, showfliers=True)
+
+
+def figura_hurtos(nombre: str, df: pd.DataFrame) -> Figure:
+    figura = Figure(figsize=(15, 6))
+    ax = figura.add_subplot()
+    if nombre == 'hurtos_cantidad':
+        dibujar_cajas(ax, {'CANTIDAD': df['CANTIDAD'].to_numpy()})
+        ax.set_title("Distribución de la variable cantidad de hurtos a personas")
+        ax.set_ylabel("Cantidad")
+    elif nombre == 'hurtos_por_anio':
+        dibujar_cajas(ax, {str(anio): grupo.to_numpy() for anio, grupo in df.groupby('AÑO')['CANTIDAD']})
+        ax.set_title("Distribución por año")
+        ax.set_xlabel("Año")
+        ax.set_ylabel("Cantidad")
+    else:
+        raise ValueError(f"Gráfico no válido: {nombre}")
+    return figura
+
+
+def renderizar_hurtos(df: pd.DataFrame, formato: str = 'png') -> Dict[str, str]:
+    """Renderiza los dos diagramas de caja de hurtos y devuelve la clave de caché de cada uno."""
+    huella_entrada = huella_datos(df[['CANTIDAD', 'AÑO']])
+    claves = {}
+    for nombre in ('hurtos_cantidad', 'hurtos_por_anio'):
+        clave = clave_grafico(nombre, huella_entrada, formato, {})
+        renderizar(clave, lambda: figura_hurtos(nombre, df), formato)
+        claves[nombre] = clave
+    return claves
@@ -0,0 +1,293 @@
+"""
+Índice columnar en memoria del archivo osb_mortalidad_dnt.csv.
+
+El archivo se lee una sola vez por versión: IndiceMortalidad guarda cada columna
+como un arreglo de NumPy, más un diccionario (localidad, año) -> fila y los
+rankings por año ya ordenados, de modo que las consultas no recorren el CSV.
+obtener_indice() lo comparte entre peticiones y lo recarga solo cuando el
+archivo cambia.
+"""
+import csv
+import heapq
+import io
+import os
+import unicodedata
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from almacen_columnar import cargar_ingerido
+from cache_datos import CacheArchivos, CacheLRU
+
+NOMBRE_ARCHIVO = "osb_mortalidad_dnt.csv"
+COLUMNAS_TOP = ('tasa', 'muertes')
+AGRUPACIONES = ('anio', 'localidad')
+
+# Índices compartidos por el proceso, uno por versión de archivo
+CACHE_MORTALIDAD = CacheArchivos(memoria_max_bytes=64 * 2**20)
+
+_ruta_csv = None
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes ni espacios sobrantes, para comparar nombres."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ' '.join(''.join(c for c in texto if not unicodedata.combining(c)).lower().split())
+
+
+def encontrar_csv(nombre_archivo: str) -> Optional[str]:
+    """Busca el archivo en el directorio de este módulo y en los superiores."""
+    ruta = os.path.abspath(os.path.dirname(__file__))
+    while True:
+        posible = os.path.join(ruta, nombre_archivo)
+        if os.path.isfile(posible):
+            return posible
+        padre = os.path.dirname(ruta)
+        if padre == ruta:
+            break
+        ruta = padre
+    return None
+
+
+def _numero(texto: str, miles: bool = False) -> float:
+    """Convierte un número con coma decimal (y punto de miles si miles=True); vacío -> NaN."""
+    texto = (texto or '').strip()
+    if miles:
+        texto = texto.replace('.', '')
+    try:
+        return float(texto.replace(',', '.'))
+    except ValueError:
+        return np.nan
+
+
+def leer_csv_mortalidad(ruta: str) -> pd.DataFrame:
+    """
+    Interpreta el CSV de mortalidad (separado por ';', en UTF-8 o Latin-1).
+
+    Returns:
+        pd.DataFrame: Columnas localidad, anio, preliminar, muertes, poblacion y tasa
+    """
+    with open(ruta, 'rb') as f:
+        contenido = f.read()
+    try:
+        texto = contenido.decode('utf-8')
+    except UnicodeDecodeError:
+        texto = contenido.decode('latin-1')
+
+    lector = csv.reader(io.StringIO(texto), delimiter=';')
+    encabezado = [normalizar(c) for c in next(lector)]
+    # El año aparece como 'Año', 'Ano' o con caracteres dañados según la codificación
+    col_anio = next(i for i, c in enumerate(encabezado) if c.startswith('a') and c.endswith('o') and len(c) <= 4)
+    col_localidad = encabezado.index('localidad')
+    col_muertes = encabezado.index('muertes')
+    col_tasa = encabezado.index('tasa')
+    col_poblacion = next((i for i, c in enumerate(encabezado) if c.startswith('proyecci')), None)
+
+    localidades, anios, preliminares, muertes, poblacion, tasas = [], [], [], [], [], []
+    for fila in lector:
+        if len(fila) <= max(col_anio, col_localidad, col_muertes, col_tasa) or not fila[col_localidad].strip():
+            continue
+        anio_texto = fila[col_anio].strip()
+        digitos = ''.join(c for c in anio_texto if c.isdigit())
+        if not digitos:
+            continue
+        localidades.append(fila[col_localidad].strip())
+        anios.append(int(digitos))
+        # Los años marcados con 'p' son preliminares
+        preliminares.append(not anio_texto.isdigit())
+        muertes.append(_numero(fila[col_muertes]))
+        poblacion.append(_numero(fila[col_poblacion], miles=True) if col_poblacion is not None else np.nan)
+        tasas.append(_numero(fila[col_tasa]))
+
+    return pd.DataFrame({
+        'localidad': np.array(localidades, dtype=object),
+        'anio': np.array(anios, dtype=np.int64),
+        'preliminar': np.array(preliminares, dtype=bool),
+        'muertes': np.array(muertes, dtype=np.float64),
+        'poblacion': np.array(poblacion, dtype=np.float64),
+        'tasa': np.array(tasas, dtype=np.float64),
+    })
+
+
+class IndiceMortalidad:
+    """
+    Columnas del archivo de mortalidad y estructuras de consulta precalculadas.
+
+    Las columnas se toman de la tabla columnar del archivo (almacen_columnar),
+    así que el texto del CSV solo se interpreta cuando el archivo cambia.
+
+    Args:
+        ruta (str): Ruta al archivo CSV (separado por ';', en UTF-8 o Latin-1)
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        datos = cargar_ingerido(ruta, leer=leer_csv_mortalidad, mmap=False)
+        self.localidad = datos['localidad'].to_numpy(dtype=object)
+        self.anio = datos['anio'].to_numpy(dtype=np.int64)
+        self.preliminar = datos['preliminar'].to_numpy(dtype=bool)
+        self.muertes = datos['muertes'].to_numpy(dtype=np.float64)
+        self.poblacion = datos['poblacion'].to_numpy(dtype=np.float64)
+        self.tasa = datos['tasa'].to_numpy(dtype=np.float64)
+        localidades = self.localidad.tolist()
+        anios = self.anio.tolist()
+        self.es_distrito = np.array([normalizar(l) == 'distrito' for l in localidades], dtype=bool)
+
+        self.por_clave = {(normalizar(l), a): i for i, (l, a) in enumerate(zip(localidades, anios))}
+        self.anios = sorted(set(anios))
+
+        # Rankings por año (tasa descendente, sin Distrito y sin tasas vacías)
+        self.ranking_por_anio = {}
+        for anio in self.anios:
+            filas = np.flatnonzero((self.anio == anio) & ~self.es_distrito & ~np.isnan(self.tasa))
+            self.ranking_por_anio[anio] = filas[np.argsort(-self.tasa[filas], kind='stable')]
+
+        # Códigos por localidad para los agregados con bincount
+        self.localidades, self.codigo_localidad = np.unique(
+            np.array([normalizar(l) for l in localidades], dtype=object), return_inverse=True)
+        self.nombre_localidad = {normalizar(l): l for l in localidades}
+        self.filas_por_localidad = {
+            clave: np.flatnonzero(self.codigo_localidad == codigo)
+            for codigo, clave in enumerate(self.localidades)
+        }
+
+        # Resultados de consultas ya calculados; se descartan junto con esta versión del índice
+        self.cache_consultas = CacheLRU(memoria_max_bytes=8 * 2**20, max_entradas=1024)
+
+        # Respuestas de ranking ya armadas: consultarlas no construye registros nuevos
+        self._rankings = {
+            anio: [dict(self.registro(f), posicion=i + 1) for i, f in enumerate(filas)]
+            for anio, filas in self.ranking_por_anio.items()
+        }
+
+        # Primera fila con la tasa máxima fuera de Distrito, como el recorrido original
+        candidatas = np.where(self.es_distrito | np.isnan(self.tasa), -np.inf, self.tasa)
+        self.fila_maxima = int(np.argmax(candidatas)) if len(candidatas) and np.isfinite(candidatas.max()) else None
+
+    def __len__(self) -> int:
+        return len(self.anio)
+
+    def __sizeof__(self) -> int:
+        # Tamaño aproximado para el límite de memoria de CACHE_MORTALIDAD
+        arreglos = (self.localidad, self.anio, self.preliminar, self.muertes, self.poblacion, self.tasa)
+        return object.__sizeof__(self) + sum(a.nbytes for a in arreglos) + 200 * len(self.por_clave)
+
+    def registro(self, fila: int) -> Dict:
+        """Una fila del índice como diccionario serializable a JSON."""
+        tasa = self.tasa[fila]
+        return {
+            'localidad': self.localidad[fila],
+            'anio': int(self.anio[fila]),
+            'preliminar': bool(self.preliminar[fila]),
+            'muertes': None if np.isnan(self.muertes[fila]) else int(self.muertes[fila]),
+            'poblacion': None if np.isnan(self.poblacion[fila]) else int(self.poblacion[fila]),
+            'tasa': None if np.isnan(tasa) else float(tasa)
+        }
+
+    def maxima_tasa(self) -> Optional[Dict]:
+        """Localidad y año con la mayor tasa de mortalidad (sin contar Distrito)."""
+        return None if self.fila_maxima is None else self.registro(self.fila_maxima)
+
+    def tasa_localidad(self, localidad: str, anio: int) -> Optional[Dict]:
+        """Registro de una localidad en un año (el nombre se compara sin tildes ni mayúsculas)."""
+        fila = self.por_clave.get((normalizar(localidad), int(anio)))
+        return None if fila is None else self.registro(fila)
+
+    def top_k(self, k: int = 5, por: str = 'tasa', anio: Optional[int] = None,
+              incluir_distrito: bool = False) -> List[Dict]:
+        """
+        Los k registros con mayor tasa o número de muertes.
+
+        Args:
+            k (int): Número de registros
+            por (str): 'tasa' o 'muertes'
+            anio (int): Limitar a un año (todos los años si es None)
+            incluir_distrito (bool): Incluir las filas del total Distrito
+        """
+        if por not in COLUMNAS_TOP:
+            raise ValueError(f"'por' debe ser uno de {COLUMNAS_TOP}")
+        valores = self.tasa if por == 'tasa' else self.muertes
+        mascara = ~np.isnan(valores)
+        if not incluir_distrito:
+            mascara &= ~self.es_distrito
+        if anio is not None:
+            mascara &= self.anio == int(anio)
+        filas = heapq.nlargest(int(k), np.flatnonzero(mascara).tolist(), key=valores.__getitem__)
+        return [dict(self.registro(f), posicion=i + 1) for i, f in enumerate(filas)]
+
+    def agregado(self, por: str = 'anio', incluir_distrito: bool = False) -> List[Dict]:
+        """
+        Suma de muertes y tasa promedio por año o por localidad.
+
+        Args:
+            por (str): 'anio' o 'localidad'
+            incluir_distrito (bool): Incluir las filas del total Distrito
+        """
+        if por not in AGRUPACIONES:
+            raise ValueError(f"'por' debe ser uno de {AGRUPACIONES}")
+        incluidas = np.ones(len(self), dtype=bool) if incluir_distrito else ~self.es_distrito
+        if por == 'anio':
+            claves = self.anios
+            codigos = np.searchsorted(self.anios, self.anio)
+        else:
+            claves = [self.nombre_localidad[l] for l in self.localidades]
+            codigos = self.codigo_localidad
+
+        n = len(claves)
+        con_muertes = incluidas & ~np.isnan(self.muertes)
+        con_tasa = incluidas & ~np.isnan(self.tasa)
+        muertes = np.bincount(codigos[con_muertes], weights=self.muertes[con_muertes], minlength=n)
+        registros = np.bincount(codigos[incluidas], minlength=n)
+        suma_tasa = np.bincount(codigos[con_tasa], weights=self.tasa[con_tasa], minlength=n)
+        conteo_tasa = np.bincount(codigos[con_tasa], minlength=n)
+
+        return [
+            {por: clave if por == 'localidad' else int(clave),
+             'muertes': int(muertes[i]),
+             'registros': int(registros[i]),
+             'tasa_promedio': float(suma_tasa[i] / conteo_tasa[i]) if conteo_tasa[i] else None}
+            for i, clave in enumerate(claves) if registros[i]
+        ]
+
+    def tendencia(self, localidad: str) -> List[Dict]:
+        """Tasa y muertes de una localidad a lo largo de los años."""
+        filas = self.filas_por_localidad.get(normalizar(localidad))
+        if filas is None:
+            return []
+        filas = filas[np.argsort(self.anio[filas], kind='stable')]
+        return [self.registro(f) for f in filas]
+
+    def consultar(self, tipo: str, **parametros):
+        """
+        Ejecuta una consulta ('top', 'agregado' o 'tendencia') guardando el resultado
+        en caché según sus parámetros.
+        """
+        consultas = {'top': self.top_k, 'agregado': self.agregado, 'tendencia': self.tendencia}
+        if tipo not in consultas:
+            raise ValueError(f"'tipo' debe ser uno de {tuple(consultas)}")
+        clave = (tipo, tuple(sorted(parametros.items())))
+        return self.cache_consultas.obtener_o_calcular(clave, lambda: consultas[tipo](**parametros))
+
+    def ranking(self, anio: int) -> List[Dict]:
+        """Localidades de un año ordenadas por tasa de mayor a menor (lista compartida, no modificar)."""
+        return self._rankings.get(int(anio), [])
+
+
+def obtener_indice(ruta: Optional[str] = None) -> IndiceMortalidad:
+    """
+    Devuelve el índice del archivo de mortalidad, construyéndolo solo la primera vez
+    o cuando el archivo cambió.
+
+    Raises:
+        FileNotFoundError: Si no se encuentra el archivo
+    """
+    global _ruta_csv
+    if ruta is None:
+        if _ruta_csv is None or not os.path.isfile(_ruta_csv):
+            _ruta_csv = encontrar_csv(NOMBRE_ARCHIVO)
+        ruta = _ruta_csv
+    if not ruta:
+        raise FileNotFoundError(
+            f"No se encontró el archivo {NOMBRE_ARCHIVO} en este directorio ni en los superiores.")
+    return CACHE_MORTALIDAD.obtener(ruta, IndiceMortalidad)
@@ -0,0 +1,249 @@
+"""
+Métricas por endpoint en formato de texto de Prometheus.
+
+instrumentar(app) registra hooks de Flask que, para cada petición, anotan la
+latencia en un histograma, los bytes recibidos y enviados, el código de
+respuesta y cuántas peticiones hay en curso por endpoint. El endpoint es la
+regla de la ruta ('/mortalidad/<localidad>/<int:anio>'), así que el número de
+series no crece con las URLs. Las respuestas en streaming se cuentan al
+cerrarse, con todos sus bytes.
+
+Los endpoints de archivos además reparten su tiempo en fases con
+`with fase('parse'): ...` (FASES: recibir la subida, interpretar el archivo,
+calcular y serializar la respuesta). Las fases se pueden anidar: cada una
+anota solo su tiempo propio, sin el de las fases internas, y medir_iterador
+atribuye a una fase el tiempo de producir cada elemento de un iterador (por
+ejemplo los bloques de un lector en streaming que se resumen en 'compute').
+Fuera de una petición (trabajos en segundo plano, scripts) fase() no hace nada.
+
+El costo por petición es de unos pocos microsegundos: contadores en
+diccionarios protegidos por un lock y bisect sobre límites fijos. Cada proceso
+lleva sus propias métricas.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from flask import Flask, Response, g, has_request_context, request
+
+# Límites de los histogramas en segundos (los de los clientes de Prometheus, hasta 30 s)
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FASES = ('upload', 'parse', 'compute', 'serialize')
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histograma:
+    """Cuentas por intervalo, suma y total de las observaciones."""
+    __slots__ = ('cuentas', 'suma', 'total')
+
+    def __init__(self):
+        self.cuentas = [0] * (len(LIMITES_LATENCIA) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.cuentas[bisect_left(LIMITES_LATENCIA, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def _etiquetas(**valores) -> str:
+    partes = []
+    for nombre, valor in valores.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{nombre}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+class RegistroMetricas:
+    """Contadores, gauges e histogramas de las peticiones HTTP de un proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.latencias: Dict[Tuple[str, str], Histograma] = {}
+            self.peticiones: Dict[Tuple[str, str, int], int] = {}
+            self.bytes_recibidos: Dict[Tuple[str, str], int] = {}
+            self.bytes_enviados: Dict[Tuple[str, str], int] = {}
+            self.en_curso: Dict[str, int] = {}
+            self.fases: Dict[Tuple[str, str], Histograma] = {}
+
+    def iniciar(self, endpoint: str):
+        with self._lock:
+            self.en_curso[endpoint] = self.en_curso.get(endpoint, 0) + 1
+
+    def terminar(self, endpoint: str, metodo: str, estado: int, segundos: float,
+                 recibidos: int, enviados: int, fases: Optional[Dict[str, float]] = None):
+        clave = (endpoint, metodo)
+        with self._lock:
+            self.en_curso[endpoint] -= 1
+            histograma = self.latencias.get(clave)
+            if histograma is None:
+                histograma = self.latencias[clave] = Histograma()
+            histograma.observar(segundos)
+            clave_estado = (endpoint, metodo, estado)
+            self.peticiones[clave_estado] = self.peticiones.get(clave_estado, 0) + 1
+            self.bytes_recibidos[clave] = self.bytes_recibidos.get(clave, 0) + recibidos
+            self.bytes_enviados[clave] = self.bytes_enviados.get(clave, 0) + enviados
+            for nombre, duracion in (fases or {}).items():
+                histograma = self.fases.get((endpoint, nombre))
+                if histograma is None:
+                    histograma = self.fases[(endpoint, nombre)] = Histograma()
+                histograma.observar(duracion)
+
+    def exportar(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus."""
+        lineas = []
+
+        def histogramas(nombre, ayuda, series):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} histogram')
+            for etiquetas, h in series:
+                acumulado = 0
+                for limite, cuenta in zip(LIMITES_LATENCIA + ('+Inf',), h.cuentas):
+                    acumulado += cuenta
+                    lineas.append(f'{nombre}_bucket{_etiquetas(**etiquetas, le=limite)} {acumulado}')
+                lineas.append(f'{nombre}_sum{_etiquetas(**etiquetas)} {h.suma!r}')
+                lineas.append(f'{nombre}_count{_etiquetas(**etiquetas)} {h.total}')
+
+        def simples(nombre, tipo, ayuda, series):
+            lineas.append(f'# HELP {nombre} {ayuda}')
+            lineas.append(f'# TYPE {nombre} {tipo}')
+            for etiquetas, valor in series:
+                lineas.append(f'{nombre}{_etiquetas(**etiquetas)} {valor}')
+
+        with self._lock:
+            histogramas('http_request_duration_seconds', 'Latencia de las peticiones por endpoint.',
+                        [({'endpoint': e, 'method': m}, h) for (e, m), h in sorted(self.latencias.items())])
+            simples('http_requests_total', 'counter', 'Peticiones atendidas por endpoint y código.',
+                    [({'endpoint': e, 'method': m, 'status': s}, n)
+                     for (e, m, s), n in sorted(self.peticiones.items())])
+            simples('http_request_size_bytes_total', 'counter', 'Bytes recibidos en el cuerpo de las peticiones.',
+                    [({'endpoint': e, 'method': m}, n) for (e, m), n in sorted(self.bytes_recibidos.items())])
+            simples('http_response_size_bytes_total', 'counter', 'Bytes enviados en el cuerpo de las respuestas.',
+                    [({'endpoint': e, 'method': m}, n) for (e, m), n in sorted(self.bytes_enviados.items())])
+            simples('http_requests_in_flight', 'gauge', 'Peticiones en curso por endpoint.',
+                    [({'endpoint': e}, n) for e, n in sorted(self.en_curso.items())])
+            histogramas('http_request_phase_duration_seconds',
+                        'Tiempo propio de cada fase (upload, parse, compute, serialize) de los endpoints de archivos.',
+                        [({'endpoint': e, 'phase': f}, h) for (e, f), h in sorted(self.fases.items())])
+        return '\n'.join(lineas) + '\n'
+
+
+METRICAS = RegistroMetricas()
+
+
+@contextmanager
+def fase(nombre: str):
+    """Anota el tiempo propio del bloque en la fase `nombre` de la petición actual."""
+    if not has_request_context() or '_metricas' not in g:
+        yield
+        return
+    estado = g._metricas
+    pila = estado['pila']
+    inicio = time.perf_counter()
+    pila.append(0.0)  # tiempo de las fases internas
+    try:
+        yield
+    finally:
+        internas = pila.pop()
+        total = time.perf_counter() - inicio
+        estado['fases'][nombre] = estado['fases'].get(nombre, 0.0) + total - internas
+        if pila:
+            pila[-1] += total
+
+
+def medir_iterador(iterable: Iterable, nombre: str) -> Iterator:
+    """Recorre iterable anotando en la fase `nombre` el tiempo de obtener cada elemento."""
+    iterador = iter(iterable)
+    while True:
+        with fase(nombre):
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+        yield elemento
+
+
+class _ContadorBytes:
+    """
+    Recorre el cuerpo de una respuesta en streaming contando sus bytes. El servidor
+    llama a close() al terminar de enviarlo, con o sin direct_passthrough.
+    """
+
+    def __init__(self, cuerpo: Iterable, al_cerrar):
+        self.cuerpo = cuerpo
+        self.al_cerrar = al_cerrar
+        self.bytes = 0
+
+    def __iter__(self):
+        for bloque in self.cuerpo:
+            self.bytes += len(bloque)
+            yield bloque
+
+    def close(self):
+        try:
+            if hasattr(self.cuerpo, 'close'):
+                self.cuerpo.close()
+        finally:
+            self.al_cerrar(self.bytes)
+
+
+def instrumentar(app: Flask, registro: RegistroMetricas = METRICAS):
+    """Registra en app los hooks que alimentan el registro de métricas."""
+
+    def endpoint_actual() -> str:
+        return request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+
+    @app.before_request
+    def _iniciar():
+        endpoint = endpoint_actual()
+        g._metricas = {'inicio': time.perf_counter(), 'endpoint': endpoint, 'pila': [], 'fases': {},
+                       'terminada': False}
+        registro.iniciar(endpoint)
+
+    def terminar(estado: int, enviados: int):
+        datos = g._metricas
+        if datos['terminada']:
+            return
+        datos['terminada'] = True
+        registro.terminar(datos['endpoint'], request.method, estado, time.perf_counter() - datos['inicio'],
+                          request.content_length or 0, enviados, datos['fases'])
+
+    @app.after_request
+    def _registrar(respuesta: Response):
+        if '_metricas' not in g:
+            return respuesta
+        largo = respuesta.content_length
+        if not respuesta.is_streamed or largo is not None:
+            terminar(respuesta.status_code, respuesta.calculate_content_length() or largo or 0)
+            return respuesta
+        # Sin tamaño conocido la petición termina cuando el servidor cierra la respuesta
+        datos, metodo, recibidos, estado = g._metricas, request.method, request.content_length or 0, respuesta.status_code
+
+        def al_cerrar(enviados):
+            if datos['terminada'] is not True:
+                datos['terminada'] = True
+                registro.terminar(datos['endpoint'], metodo, estado, time.perf_counter() - datos['inicio'],
+                                  recibidos, enviados, datos['fases'])
+        respuesta.response = _ContadorBytes(respuesta.response, al_cerrar)
+        datos['terminada'] = 'streaming'
+        return respuesta
+
+    @app.teardown_request
+    def _error(excepcion):
+        # after_request no corre si la vista lanzó una excepción no manejada
+        if '_metricas' in g and g._metricas['terminada'] is False:
+            terminar(500, 0)
+
+    return registro
+
+
+def respuesta_metricas(registro: RegistroMetricas = METRICAS) -> Response:
+    """Respuesta de GET /metrics."""
+    return Response(registro.exportar(), content_type=TIPO_CONTENIDO)
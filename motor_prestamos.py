@@ -0,0 +1,513 @@
+import numpy as np
+import pandas as pd
+
+
+# Columnas (y su orden) que produce CalculadoraPrestamos.analizar_todos_prestamos
+COLUMNAS_ANALISIS = [
+    'Nombre', 'Edad', 'Proposito', 'Monto_Original', 'Tasa_Interes', 'Tiempo_Meses',
+    'Pago_Mensual', 'Costo_Total', 'Interes_Total', 'Monto_Final_Compuesto',
+    'Diferencia_Simple_Compuesto', 'Porcentaje_Interes'
+]
+
+# Tope de cambios de una rejilla: el tiempo de simular_rejilla_choques crece con préstamos × cambios
+MAX_CHOQUES = 10_001
+
+
+def pago_mensual_vectorizado(principal, tasa_anual, tiempo_meses) -> np.ndarray:
+    """
+    Calcula el pago mensual (fórmula PMT) para un arreglo de préstamos.
+
+    Equivale a CalculadoraPrestamos.calcular_pago_mensual aplicado fila por fila,
+    incluyendo el caso de tasa cero (pago = principal / tiempo). Los argumentos
+    se combinan con las reglas de broadcasting de NumPy, de modo que una
+    columna de préstamos (n, 1) y una fila de tasas (1, k) producen una matriz
+    de pagos (n, k).
+
+    Args:
+        principal (array-like): Montos de los préstamos
+        tasa_anual (array-like): Tasas de interés anuales (en porcentaje)
+        tiempo_meses (array-like): Plazos en meses
+
+    Returns:
+        np.ndarray: Pago mensual de cada préstamo
+    """
+    principal, tasa_anual, tiempo_meses = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(tasa_anual, dtype=np.float64),
+        np.asarray(tiempo_meses, dtype=np.float64)
+    )
+
+    tasa_mensual = tasa_anual / 100 / 12
+    factor = (1 + tasa_mensual) ** tiempo_meses
+    con_tasa = tasa_anual != 0
+
+    # Solo se divide donde la tasa es distinta de cero para evitar 0/0
+    pago = np.divide(principal, tiempo_meses, out=np.empty_like(principal), where=~con_tasa)
+    np.divide(principal * tasa_mensual * factor, factor - 1, out=pago, where=con_tasa)
+    return pago
+
+
+def interes_compuesto_vectorizado(principal, tasa_anual, tiempo_meses,
+                                  frecuencia: int = 12):
+    """
+    Calcula el monto final con interés compuesto A = P(1 + r/n)^(nt) y su
+    diferencia frente al interés simple para un arreglo de préstamos.
+
+    Args:
+        principal (array-like): Montos de los préstamos
+        tasa_anual (array-like): Tasas de interés anuales (en porcentaje)
+        tiempo_meses (array-like): Plazos en meses
+        frecuencia (int): Frecuencia de capitalización por año
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (monto_final, diferencia_compuesto_simple)
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    r = np.asarray(tasa_anual, dtype=np.float64) / 100
+    t = np.asarray(tiempo_meses, dtype=np.float64) / 12
+
+    monto_final = principal * (1 + r / frecuencia) ** (frecuencia * t)
+    interes_simple = principal * r * t
+    diferencia = (monto_final - principal) - interes_simple
+    return monto_final, diferencia
+
+
+def analizar_prestamos(datos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versión vectorizada de CalculadoraPrestamos.analizar_todos_prestamos.
+
+    Calcula todas las métricas sobre columnas completas en lugar de recorrer
+    el DataFrame fila por fila, y devuelve las mismas columnas en el mismo orden.
+
+    Args:
+        datos (pd.DataFrame): Datos con el esquema de loan_data.csv
+
+    Returns:
+        pd.DataFrame: DataFrame con análisis completo de todos los préstamos
+    """
+    monto = datos['Monto_Prestamo'].to_numpy()
+    tasa = datos['Tasa_Interes_Anual'].to_numpy()
+    tiempo = datos['Tiempo_Meses'].to_numpy()
+
+    pago_mensual = pago_mensual_vectorizado(monto, tasa, tiempo)
+    costo_total = pago_mensual * tiempo
+    interes_total = costo_total - monto
+    monto_final, diferencia = interes_compuesto_vectorizado(monto, tasa, tiempo)
+
+    return pd.DataFrame({
+        'Nombre': datos['Nombre'].to_numpy(),
+        'Edad': datos['Edad'].to_numpy(),
+        'Proposito': datos['Proposito'].to_numpy(),
+        'Monto_Original': monto,
+        'Tasa_Interes': tasa,
+        'Tiempo_Meses': tiempo,
+        'Pago_Mensual': pago_mensual,
+        'Costo_Total': costo_total,
+        'Interes_Total': interes_total,
+        'Monto_Final_Compuesto': monto_final,
+        'Diferencia_Simple_Compuesto': diferencia,
+        'Porcentaje_Interes': interes_total / monto * 100
+    }, columns=COLUMNAS_ANALISIS)
+
+
+def rejilla_choques(desde: float = -5.0, hasta: float = 5.0, paso: float = 0.05,
+                    max_choques: int = MAX_CHOQUES) -> np.ndarray:
+    """
+    Construye una rejilla de cambios de tasa en puntos porcentuales.
+
+    Por defecto va de -5% a +5% en pasos de 5 puntos básicos (201 choques).
+
+    Args:
+        desde (float): Primer cambio de la rejilla
+        hasta (float): Último cambio de la rejilla (incluido)
+        paso (float): Separación entre cambios consecutivos
+        max_choques (int): Número máximo de cambios de la rejilla
+
+    Returns:
+        np.ndarray: Cambios de tasa ordenados de menor a mayor
+
+    Raises:
+        ValueError: Si paso no es positivo, hasta es menor que desde o la rejilla
+            tendría más de max_choques cambios
+    """
+    if not all(np.isfinite([desde, hasta, paso])):
+        raise ValueError("desde, hasta y paso deben ser números finitos")
+    if paso <= 0:
+        raise ValueError(f"paso debe ser mayor que 0, no {paso}")
+    if hasta < desde:
+        raise ValueError(f"hasta ({hasta}) no puede ser menor que desde ({desde})")
+    pasos = int(round((hasta - desde) / paso))
+    if pasos + 1 > max_choques:
+        raise ValueError(f"La rejilla tendría {pasos + 1:,} cambios; el máximo es {max_choques:,}")
+    return np.round(desde + paso * np.arange(pasos + 1), 10)
+
+
+def costos_con_choques(principal, tasa_anual, tiempo_meses, cambios_tasa,
+                       tasa_minima: float = 0.1):
+    """
+    Evalúa préstamos × choques de tasa como una sola operación con broadcasting.
+
+    Args:
+        principal (array-like): Montos de los préstamos, forma (n,)
+        tasa_anual (array-like): Tasas originales, forma (n,)
+        tiempo_meses (array-like): Plazos en meses, forma (n,)
+        cambios_tasa (array-like): Cambios en puntos porcentuales, forma (k,)
+        tasa_minima (float): Tasa mínima tras aplicar el choque
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (costo_original (n,),
+        nuevas_tasas (n, k), nuevos_costos (n, k))
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    tasa_anual = np.asarray(tasa_anual, dtype=np.float64)
+    tiempo_meses = np.asarray(tiempo_meses, dtype=np.float64)
+    cambios = np.asarray(cambios_tasa, dtype=np.float64)
+
+    costo_original = pago_mensual_vectorizado(principal, tasa_anual, tiempo_meses) * tiempo_meses
+    nuevas_tasas = np.maximum(tasa_minima, tasa_anual[:, None] + cambios[None, :])
+    nuevos_costos = pago_mensual_vectorizado(
+        principal[:, None], nuevas_tasas, tiempo_meses[:, None]
+    ) * tiempo_meses[:, None]
+    return costo_original, nuevas_tasas, nuevos_costos
+
+
+def simular_cambios_tasa(datos: pd.DataFrame, cambios_tasa, tasa_minima: float = 0.1) -> pd.DataFrame:
+    """
+    Calcula el escenario '¿qué pasaría si?' con una columna de tasa, costo y
+    diferencia por cada cambio, como CalculadoraPrestamos.escenario_que_pasaria_si.
+
+    Args:
+        datos (pd.DataFrame): Datos con el esquema de loan_data.csv
+        cambios_tasa (List[float]): Cambios en puntos porcentuales
+        tasa_minima (float): Tasa mínima tras aplicar el cambio
+
+    Returns:
+        pd.DataFrame: Una fila por préstamo
+    """
+    costo_original, nuevas_tasas, nuevos_costos = costos_con_choques(
+        datos['Monto_Prestamo'], datos['Tasa_Interes_Anual'], datos['Tiempo_Meses'],
+        cambios_tasa, tasa_minima
+    )
+
+    escenarios = {
+        'Nombre': datos['Nombre'].to_numpy(),
+        'Tasa_Original': datos['Tasa_Interes_Anual'].to_numpy(),
+        'Costo_Original': costo_original
+    }
+    for j, cambio in enumerate(cambios_tasa):
+        escenarios[f'Tasa_{cambio:+.0f}%'] = nuevas_tasas[:, j]
+        escenarios[f'Costo_{cambio:+.0f}%'] = nuevos_costos[:, j]
+        escenarios[f'Diferencia_{cambio:+.0f}%'] = nuevos_costos[:, j] - costo_original
+    return pd.DataFrame(escenarios)
+
+
+def simular_rejilla_choques(datos: pd.DataFrame, cambios_tasa, tasa_minima: float = 0.1,
+                            memoria_max_mb: float = 64, detalle: bool = False):
+    """
+    Evalúa una rejilla de choques de tasa sobre toda la cartera por bloques.
+
+    Los préstamos se procesan en bloques cuyo tamaño se elige para que las
+    matrices intermedias (bloque × choques) no superen memoria_max_mb, y los
+    agregados por choque se acumulan sin construir registros por préstamo.
+
+    Args:
+        datos (pd.DataFrame): Datos con el esquema de loan_data.csv
+        cambios_tasa (array-like): Cambios en puntos porcentuales
+        tasa_minima (float): Tasa mínima tras aplicar el choque
+        memoria_max_mb (float): Memoria máxima aproximada por bloque
+        detalle (bool): Si es True también devuelve el detalle en formato largo
+            (una fila por préstamo y choque)
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[pd.DataFrame]]: (agregados por choque, detalle)
+    """
+    cambios = np.asarray(cambios_tasa, dtype=np.float64)
+    monto = datos['Monto_Prestamo'].to_numpy(dtype=np.float64)
+    tasa = datos['Tasa_Interes_Anual'].to_numpy(dtype=np.float64)
+    tiempo = datos['Tiempo_Meses'].to_numpy(dtype=np.float64)
+    n, k = len(monto), len(cambios)
+
+    # Unas 6 matrices float64 (bloque × choques) viven a la vez durante el cálculo
+    filas_por_bloque = max(1, int(memoria_max_mb * 2**20 // (6 * 8 * max(k, 1))))
+
+    costo_total = np.zeros(k)
+    suma_dif = np.zeros(k)
+    # Media y suma de cuadrados de desviaciones por choque, combinadas bloque a bloque con
+    # la fórmula de Chan (como streaming_summary): sin la cancelación de sum(x²)/n - media²
+    cuenta, media_dif, m2_dif = 0, np.zeros(k), np.zeros(k)
+    dif_min = np.full(k, np.inf)
+    dif_max = np.full(k, -np.inf)
+    idx_max = np.zeros(k, dtype=np.int64)
+    bloques_detalle = []
+
+    for inicio in range(0, n, filas_por_bloque):
+        fin = min(inicio + filas_por_bloque, n)
+        costo_original, nuevas_tasas, nuevos_costos = costos_con_choques(
+            monto[inicio:fin], tasa[inicio:fin], tiempo[inicio:fin], cambios, tasa_minima
+        )
+        diferencias = nuevos_costos - costo_original[:, None]
+
+        costo_total += nuevos_costos.sum(axis=0)
+        suma_bloque = diferencias.sum(axis=0)
+        suma_dif += suma_bloque
+        media_bloque = suma_bloque / (fin - inicio)
+        m2_bloque = np.square(diferencias - media_bloque).sum(axis=0)
+        delta = media_bloque - media_dif
+        total = cuenta + fin - inicio
+        media_dif += delta * (fin - inicio) / total
+        m2_dif += m2_bloque + delta * delta * cuenta * (fin - inicio) / total
+        cuenta = total
+        dif_min = np.minimum(dif_min, diferencias.min(axis=0))
+        max_bloque = diferencias.argmax(axis=0)
+        valor_max = diferencias[max_bloque, np.arange(k)]
+        mejora = valor_max > dif_max
+        dif_max[mejora] = valor_max[mejora]
+        idx_max[mejora] = max_bloque[mejora] + inicio
+
+        if detalle:
+            bloques_detalle.append(pd.DataFrame({
+                'Prestamo': np.repeat(np.arange(inicio, fin), k),
+                'Cambio': np.tile(cambios, fin - inicio),
+                'Tasa': nuevas_tasas.ravel(),
+                'Costo': nuevos_costos.ravel(),
+                'Diferencia': diferencias.ravel()
+            }))
+
+    promedio = media_dif if n else np.full(k, np.nan)
+    varianza = m2_dif / n if n else np.full(k, np.nan)
+    nombres = datos['Nombre'].to_numpy()
+    agregados = pd.DataFrame({
+        'Cambio': cambios,
+        'Prestamos': n,
+        'Costo_Total': costo_total,
+        'Diferencia_Total': suma_dif,
+        'Diferencia_Promedio': promedio,
+        'Diferencia_Desviacion': np.sqrt(np.maximum(varianza, 0)),
+        'Diferencia_Min': dif_min if n else np.nan,
+        'Diferencia_Max': dif_max if n else np.nan,
+        'Mas_Afectado': nombres[idx_max] if n else None
+    })
+
+    df_detalle = None
+    if detalle:
+        df_detalle = pd.concat(bloques_detalle, ignore_index=True) if bloques_detalle else \
+            pd.DataFrame(columns=['Prestamo', 'Cambio', 'Tasa', 'Costo', 'Diferencia'])
+    return agregados, df_detalle
+
+
+def meses_para_pagar(principal, tasa_anual, pago, tiempo_max) -> np.ndarray:
+    """
+    Calcula en forma cerrada cuántos meses tarda en pagarse un saldo con un pago fijo.
+
+    Usa la fórmula del número de periodos n = -ln(1 - i·P/A) / ln(1 + i)
+    (n = P/A con tasa cero), redondeada hacia arriba y limitada a tiempo_max,
+    que es el mismo resultado que simular los pagos mes a mes.
+
+    Args:
+        principal (array-like): Saldos iniciales
+        tasa_anual (array-like): Tasas de interés anuales (en porcentaje)
+        pago (array-like): Pago mensual fijo
+        tiempo_max (array-like): Plazo máximo en meses
+
+    Returns:
+        np.ndarray: Número de meses (entero) hasta saldar cada préstamo
+    """
+    principal, tasa_anual, pago, tiempo_max = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(tasa_anual, dtype=np.float64),
+        np.asarray(pago, dtype=np.float64),
+        np.asarray(tiempo_max, dtype=np.float64)
+    )
+    i = tasa_anual / 100 / 12
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraccion = 1 - i * principal / pago
+        periodos = np.where(
+            i > 0,
+            -np.log(fraccion) / np.log1p(i),
+            principal / pago
+        )
+    # Si el pago no alcanza a cubrir los intereses el saldo nunca llega a cero
+    periodos = np.where(np.isfinite(periodos) & (fraccion > 0), periodos, np.inf)
+
+    # La tolerancia evita contar un mes extra por errores de redondeo cuando n es entero
+    meses = np.ceil(periodos - 1e-9)
+    meses = np.minimum(np.maximum(meses, 0), tiempo_max)
+    return meses.astype(np.int64)
+
+
+def simular_prepago(datos: pd.DataFrame, porcentajes_prepago) -> pd.DataFrame:
+    """
+    Evalúa una o varias políticas de prepago sobre toda la cartera en una pasada.
+
+    Args:
+        datos (pd.DataFrame): Datos con el esquema de loan_data.csv
+        porcentajes_prepago (array-like): Porcentajes adicionales a pagar
+            mensualmente (0.10 = 10%)
+
+    Returns:
+        pd.DataFrame: Una fila por préstamo y política, agrupadas por política,
+        con la columna Porcentaje_Prepago y las columnas de
+        CalculadoraPrestamos.escenario_prepago
+    """
+    porcentajes = np.atleast_1d(np.asarray(porcentajes_prepago, dtype=np.float64))
+    monto = datos['Monto_Prestamo'].to_numpy(dtype=np.float64)
+    tasa = datos['Tasa_Interes_Anual'].to_numpy(dtype=np.float64)
+    tiempo = datos['Tiempo_Meses'].to_numpy()
+    n, k = len(monto), len(porcentajes)
+
+    pago_normal = pago_mensual_vectorizado(monto, tasa, tiempo)
+    costo_normal = pago_normal * tiempo
+
+    # Matrices (políticas × préstamos) para que el resultado quede agrupado por política
+    pago_con_prepago = pago_normal[None, :] * (1 + porcentajes[:, None])
+    meses = meses_para_pagar(monto[None, :], tasa[None, :], pago_con_prepago, tiempo[None, :])
+    costo_con_prepago = pago_con_prepago * meses
+
+    return pd.DataFrame({
+        'Porcentaje_Prepago': np.repeat(porcentajes, n),
+        'Nombre': np.tile(datos['Nombre'].to_numpy(), k),
+        'Pago_Normal': np.tile(pago_normal, k),
+        'Pago_Con_Prepago': pago_con_prepago.ravel(),
+        'Tiempo_Normal': np.tile(tiempo, k),
+        'Tiempo_Con_Prepago': meses.ravel(),
+        'Costo_Normal': np.tile(costo_normal, k),
+        'Costo_Con_Prepago': costo_con_prepago.ravel(),
+        'Ahorro_Dinero': (costo_normal[None, :] - costo_con_prepago).ravel(),
+        'Ahorro_Tiempo_Meses': (tiempo[None, :] - meses).ravel()
+    })
+
+
+def tabla_amortizacion(principal: float, tasa_anual: float, tiempo_meses: int):
+    """
+    Genera la tabla de amortización de un préstamo, un mes a la vez.
+
+    Args:
+        principal (float): Monto del préstamo
+        tasa_anual (float): Tasa de interés anual (en porcentaje)
+        tiempo_meses (int): Plazo en meses
+
+    Yields:
+        Dict: Mes, Pago, Interes, Abono_Capital y Saldo de cada periodo
+    """
+    pago = float(pago_mensual_vectorizado(principal, tasa_anual, tiempo_meses))
+    tasa_mensual = tasa_anual / 100 / 12
+    saldo = float(principal)
+    for mes in range(1, int(tiempo_meses) + 1):
+        interes = saldo * tasa_mensual
+        abono = pago - interes
+        saldo = max(0.0, saldo - abono)
+        yield {'Mes': mes, 'Pago': pago, 'Interes': interes, 'Abono_Capital': abono, 'Saldo': saldo}
+
+
+def matriz_saldos(principal, tasa_anual, tiempo_meses, out: np.ndarray = None) -> np.ndarray:
+    """
+    Llena una matriz (préstamos × meses) con la evolución del saldo de cada préstamo.
+
+    La columna 0 es el monto inicial y la columna k el saldo tras el pago k; los
+    meses posteriores al plazo de cada préstamo quedan en cero. El cálculo avanza
+    mes a mes sobre todos los préstamos a la vez.
+
+    Args:
+        principal (array-like): Montos de los préstamos
+        tasa_anual (array-like): Tasas de interés anuales (en porcentaje)
+        tiempo_meses (array-like): Plazos en meses
+        out (np.ndarray): Matriz preasignada de forma (n, max(tiempo_meses) + 1)
+            para reutilizar memoria entre llamadas
+
+    Returns:
+        np.ndarray: Matriz de saldos
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    tasa_anual = np.asarray(tasa_anual, dtype=np.float64)
+    tiempo = np.asarray(tiempo_meses, dtype=np.int64)
+    tasa_mensual = tasa_anual / 100 / 12
+    meses = int(tiempo.max()) if len(tiempo) else 0
+
+    if out is None:
+        out = np.empty((len(principal), meses + 1), dtype=np.float64)
+    elif out.shape != (len(principal), meses + 1):
+        raise ValueError(f"La matriz debe tener forma {(len(principal), meses + 1)}")
+
+    pago = pago_mensual_vectorizado(principal, tasa_anual, tiempo)
+    out[:, 0] = principal
+    for mes in range(1, meses + 1):
+        anterior = out[:, mes - 1]
+        np.maximum(anterior - (pago - anterior * tasa_mensual), 0, out=out[:, mes])
+        out[tiempo < mes, mes] = 0
+    return out
+
+
+def iterar_bloques_amortizacion(principal, tasa_anual, tiempo_meses, prestamos_por_bloque: int = 2000):
+    """
+    Recorre las tablas de amortización de muchos préstamos por bloques.
+
+    Cada bloque es un diccionario de arreglos planos (una posición por préstamo y
+    mes) listo para serializarse, de modo que nunca se materializa la tabla de
+    toda la cartera.
+
+    Args:
+        principal (array-like): Montos de los préstamos
+        tasa_anual (array-like): Tasas de interés anuales (en porcentaje)
+        tiempo_meses (array-like): Plazos en meses
+        prestamos_por_bloque (int): Préstamos procesados por bloque
+
+    Yields:
+        Dict[str, np.ndarray]: Prestamo, Mes, Pago, Interes, Abono_Capital y Saldo
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    tasa_anual = np.asarray(tasa_anual, dtype=np.float64)
+    tiempo = np.asarray(tiempo_meses, dtype=np.int64)
+
+    for inicio in range(0, len(principal), prestamos_por_bloque):
+        fin = min(inicio + prestamos_por_bloque, len(principal))
+        saldos = matriz_saldos(principal[inicio:fin], tasa_anual[inicio:fin], tiempo[inicio:fin])
+        pago = pago_mensual_vectorizado(principal[inicio:fin], tasa_anual[inicio:fin], tiempo[inicio:fin])
+        tasa_mensual = tasa_anual[inicio:fin] / 100 / 12
+
+        # Posiciones (préstamo, mes) válidas, ordenadas por préstamo y luego por mes
+        filas, columnas = np.nonzero(np.arange(1, saldos.shape[1])[None, :] <= tiempo[inicio:fin, None])
+        interes = saldos[filas, columnas] * tasa_mensual[filas]
+        yield {
+            'Prestamo': filas + inicio,
+            'Mes': columnas + 1,
+            'Pago': pago[filas],
+            'Interes': interes,
+            'Abono_Capital': pago[filas] - interes,
+            'Saldo': saldos[filas, columnas + 1]
+        }
+
+
+def simular_refinanciamiento(datos: pd.DataFrame, nueva_tasa: float) -> pd.DataFrame:
+    """
+    Compara el costo actual de cada préstamo con el de refinanciarlo a nueva_tasa.
+
+    Args:
+        datos (pd.DataFrame): Datos con el esquema de loan_data.csv
+        nueva_tasa (float): Nueva tasa de interés para refinanciamiento
+
+    Returns:
+        pd.DataFrame: Las columnas de CalculadoraPrestamos.escenario_refinanciamiento
+    """
+    monto = datos['Monto_Prestamo'].to_numpy()
+    tasa = datos['Tasa_Interes_Anual'].to_numpy()
+    tiempo = datos['Tiempo_Meses'].to_numpy()
+
+    pago_actual = pago_mensual_vectorizado(monto, tasa, tiempo)
+    pago_nuevo = pago_mensual_vectorizado(monto, nueva_tasa, tiempo)
+    costo_actual = pago_actual * tiempo
+    costo_nuevo = pago_nuevo * tiempo
+    ahorro = costo_actual - costo_nuevo
+
+    return pd.DataFrame({
+        'Nombre': datos['Nombre'].to_numpy(),
+        'Tasa_Actual': tasa,
+        'Tasa_Nueva': float(nueva_tasa),
+        'Pago_Actual': pago_actual,
+        'Pago_Nuevo': pago_nuevo,
+        'Costo_Actual': costo_actual,
+        'Costo_Nuevo': costo_nuevo,
+        'Ahorro': ahorro,
+        'Porcentaje_Ahorro': ahorro / costo_actual * 100,
+        'Conviene_Refinanciar': ahorro > 0
+    })
@@ -0,0 +1,187 @@
+"""
+Motor de traducción por frases sobre un trie de palabras.
+
+MotorTraduccion compila una sola vez el diccionario de frases en un trie cuyas
+aristas son palabras ya normalizadas ("good" -> "morning" -> fin), en
+minúsculas y sin tildes por defecto (normalizar()). Para
+traducir un texto lo recorre de izquierda a derecha: desde cada palabra baja
+por el trie mientras las palabras siguientes coincidan, se queda con la frase
+más larga que terminó en el camino, emite su traducción y sigue después de
+ella; una palabra sin frase se copia tal cual. Así
+"good morning, thank you" -> "buenos días, gracias".
+
+Cada palabra se visita a lo sumo tantas veces como palabras tenga la frase más
+larga del diccionario, de modo que el costo crece con el largo del texto y no
+con el número de frases. Los signos de puntuación y los espacios se conservan,
+y una frase solo coincide si sus palabras están separadas por espacios ("good,
+morning" no es "good morning").
+
+Los diccionarios grandes se leen de archivos JSON ({"frase": "traducción"}),
+CSV o TSV (dos columnas, sin encabezado) con leer_diccionario().
+"""
+import csv
+import json
+import os
+import re
+import unicodedata
+from typing import Callable, Dict, List, Tuple
+
+# Palabras (con apóstrofos internos, "don't") y todo lo demás entre ellas
+PALABRA = re.compile(r"\w+(?:'\w+)*")
+_FIN = ''  # clave del trie que guarda la traducción de la frase que termina en ese nodo
+# Separadores de palabras en las claves normalizadas: espacio o puntuación que corta las frases
+SEP_ESPACIO, SEP_CORTE = '\x1f', '\x1e'
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes ni espacios sobrantes."""
+    if not texto.isascii():
+        texto = unicodedata.normalize('NFKD', texto)
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+class MotorTraduccion:
+    """
+    Diccionario de frases compilado para traducir textos completos.
+
+    Args:
+        frases (Dict[str, str]): Frase de origen -> traducción
+        normalizar (Callable[[str], str]): Forma en que se comparan las palabras
+    """
+
+    def __init__(self, frases: Dict[str, str], normalizar: Callable[[str], str] = normalizar):
+        self.normalizar = normalizar
+        self.raiz: Dict = {}
+        self.frases = 0
+        self.max_palabras = 0
+        for origen, traduccion in frases.items():
+            self.agregar(origen, traduccion)
+
+    def agregar(self, origen: str, traduccion: str):
+        """Agrega o reemplaza una frase; las que no tienen palabras se ignoran."""
+        palabras = [self.normalizar(p) for p in PALABRA.findall(origen)]
+        if not palabras:
+            return
+        nodo = self.raiz
+        for palabra in palabras:
+            nodo = nodo.setdefault(palabra, {})
+        if _FIN not in nodo:
+            self.frases += 1
+        nodo[_FIN] = traduccion
+        self.max_palabras = max(self.max_palabras, len(palabras))
+
+    def _segmentar(self, texto: str) -> Tuple[List[str], List[str]]:
+        """Palabras del texto y los separadores antes, entre y después de ellas."""
+        palabras, separadores, posicion = [], [], 0
+        for coincidencia in PALABRA.finditer(texto):
+            separadores.append(texto[posicion:coincidencia.start()])
+            palabras.append(coincidencia.group())
+            posicion = coincidencia.end()
+        separadores.append(texto[posicion:])
+        return palabras, separadores
+
+    def clave(self, texto: str) -> Tuple[str, List[str], List[str]]:
+        """
+        Clave normalizada del texto, junto con sus palabras y separadores.
+
+        La clave son las palabras normalizadas unidas por SEP_ESPACIO donde el texto
+        tenía espacios y por SEP_CORTE donde tenía puntuación (que corta las frases),
+        así que "Good  morning, José!" y "good morning; jose" comparten la clave y
+        también las coincidencias() del diccionario.
+        """
+        palabras, separadores = self._segmentar(texto)
+        partes = []
+        for i, palabra in enumerate(palabras):
+            if i:
+                partes.append(SEP_ESPACIO if separadores[i].isspace() else SEP_CORTE)
+            partes.append(self.normalizar(palabra))
+        return ''.join(partes), palabras, separadores
+
+    def coincidencias(self, clave: str) -> Tuple[Tuple[int, int, str], ...]:
+        """
+        Frases del diccionario en la clave, la más larga en cada posición.
+
+        Returns:
+            tuple: (palabra inicial, palabra siguiente a la frase, traducción) por frase
+        """
+        claves, cortes = [], [False]
+        for trozo in re.split(f'([{SEP_ESPACIO}{SEP_CORTE}])', clave) if clave else ():
+            if trozo == SEP_ESPACIO or trozo == SEP_CORTE:
+                cortes.append(trozo == SEP_CORTE)
+            else:
+                claves.append(trozo)
+        encontradas = []
+        i = 0
+        while i < len(claves):
+            nodo, mejor, fin = self.raiz, None, i
+            j = i
+            while j < len(claves):
+                # Las palabras de una frase solo pueden estar separadas por espacios
+                if j > i and cortes[j]:
+                    break
+                nodo = nodo.get(claves[j])
+                if nodo is None:
+                    break
+                j += 1
+                if _FIN in nodo:
+                    mejor, fin = nodo[_FIN], j
+            if mejor is None:
+                i += 1
+            else:
+                encontradas.append((i, fin, mejor))
+                i = fin
+        return tuple(encontradas)
+
+    @staticmethod
+    def componer(palabras: List[str], separadores: List[str],
+                 coincidencias: Tuple[Tuple[int, int, str], ...]) -> str:
+        """Texto traducido: cada frase reemplazada, con mayúscula si la tenía el original."""
+        partes = [separadores[0]]
+        i = 0
+        for inicio, fin, traduccion in coincidencias:
+            for k in range(i, inicio):
+                partes += (palabras[k], separadores[k + 1])
+            if palabras[inicio][:1].isupper() and not palabras[inicio].isupper():
+                traduccion = traduccion[:1].upper() + traduccion[1:]
+            partes += (traduccion, separadores[fin])
+            i = fin
+        for k in range(i, len(palabras)):
+            partes += (palabras[k], separadores[k + 1])
+        return ''.join(partes)
+
+    def traducir_con_conteo(self, texto: str) -> Tuple[str, int]:
+        """
+        Traduce el texto en una pasada con la frase más larga en cada posición.
+
+        Returns:
+            tuple: (texto traducido, número de frases traducidas)
+        """
+        clave, palabras, separadores = self.clave(texto)
+        coincidencias = self.coincidencias(clave)
+        return self.componer(palabras, separadores, coincidencias), len(coincidencias)
+
+    def traducir(self, texto: str) -> str:
+        """Traduce el texto, copiando tal cual las palabras que no están en el diccionario."""
+        return self.traducir_con_conteo(texto)[0]
+
+
+def leer_diccionario(ruta: str) -> Dict[str, str]:
+    """
+    Lee un diccionario de frases de un archivo JSON, CSV o TSV.
+
+    Raises:
+        ValueError: Si el formato no es reconocido o el JSON no es un objeto
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    with open(ruta, encoding='utf-8', newline='') as f:
+        if extension == '.json':
+            frases = json.load(f)
+            if not isinstance(frases, dict):
+                raise ValueError(f"{ruta} debe contener un objeto {{frase: traducción}}")
+            return {str(k): str(v) for k, v in frases.items()}
+        if extension in ('.csv', '.tsv', '.txt'):
+            lector = csv.reader(f, delimiter=',' if extension == '.csv' else '\t')
+            return {fila[0]: fila[1] for fila in lector if len(fila) >= 2}
+    raise ValueError(f"Formato de diccionario no soportado: {extension}. Use .json, .csv o .tsv")
+
@@ -0,0 +1,305 @@
+"""
+Evaluación de la cartera de préstamos repartida en varios procesos.
+
+La tabla se divide en fragmentos de tamaño fijo que un pool de procesos evalúa
+con las mismas funciones de motor_prestamos. Las columnas de entrada se copian
+una sola vez a un bloque de memoria compartida: cada proceso recibe solo el
+nombre del bloque y su rango de filas, y devuelve sumas parciales y candidatos
+al top-k en lugar de DataFrames completos.
+
+Los límites de los fragmentos dependen únicamente de tamano_fragmento, no del
+número de procesos, y los parciales se combinan en el orden de los fragmentos,
+así que el resultado es idéntico con 1 o con N procesos. Los empates del top-k
+se resuelven por posición en la tabla, igual que DataFrame.nlargest.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from motor_prestamos import (
+    analizar_prestamos, simular_cambios_tasa, simular_prepago, simular_refinanciamiento
+)
+
+COLUMNAS_COMPARTIDAS = ['Edad', 'Monto_Prestamo', 'Tasa_Interes_Anual', 'Tiempo_Meses']
+TAMANO_FRAGMENTO = 500_000
+
+# Tareas por defecto: las mismas que ejecuta el menú de CalculadoraPrestamos
+TAREAS = {'analisis': True, 'tasas': [-2, -1, 1, 2], 'prepago': [0.10], 'refinanciamiento': 3.5}
+
+
+class ColumnasCompartidas:
+    """
+    Copia las columnas numéricas de los préstamos y los códigos de Proposito a un
+    bloque de memoria compartida. Se usa como context manager; al salir el bloque
+    se libera.
+    """
+
+    def __init__(self, datos: pd.DataFrame):
+        codigos, self.propositos = pd.factorize(datos['Proposito'], sort=True)
+        # Todas las columnas ocupan 8 bytes por fila; las numéricas se pasan a float64 para
+        # que una columna object o de otro tipo de 8 bytes no se copie como punteros
+        columnas = {c: datos[c].to_numpy().astype(np.float64, copy=False) for c in COLUMNAS_COMPARTIDAS}
+        columnas['Proposito'] = codigos.astype(np.int64, copy=False)
+
+        n = len(datos)
+        self._memoria = SharedMemory(create=True, size=max(1, 8 * n * len(columnas)))
+        self.descriptor = {'nombre': self._memoria.name, 'n': n, 'columnas': []}
+        destino = None
+        try:
+            for i, (columna, valores) in enumerate(columnas.items()):
+                desplazamiento = 8 * n * i
+                destino = np.ndarray(n, dtype=valores.dtype, buffer=self._memoria.buf, offset=desplazamiento)
+                destino[:] = valores
+                self.descriptor['columnas'].append((columna, valores.dtype.str, desplazamiento))
+        except BaseException:
+            # Sin vistas vivas sobre el bloque, o close() falla; unlink() lo libera del sistema
+            destino = None
+            self.cerrar()
+            raise
+        destino = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        if self._memoria is not None:
+            self._memoria.close()
+            self._memoria.unlink()
+            self._memoria = None
+
+
+def _leer_fragmento(descriptor: Dict, inicio: int, fin: int) -> pd.DataFrame:
+    """Copia las filas [inicio, fin) del bloque compartido a un DataFrame con el esquema de loan_data.csv."""
+    memoria = SharedMemory(name=descriptor['nombre'])
+    try:
+        n = descriptor['n']
+        datos = {
+            columna: np.ndarray(n, dtype=np.dtype(tipo), buffer=memoria.buf, offset=desplazamiento)[inicio:fin].copy()
+            for columna, tipo, desplazamiento in descriptor['columnas']
+        }
+    finally:
+        memoria.close()
+    # Nombre lleva la fila global, que el proceso principal traduce al nombre real
+    datos['Nombre'] = np.arange(inicio, fin)
+    return pd.DataFrame(datos)
+
+
+def _orden_top(valores: np.ndarray, filas: np.ndarray, k: int) -> np.ndarray:
+    """Posiciones de los k mayores valores; a igual valor gana la fila menor."""
+    return np.lexsort((filas, -valores))[:k]
+
+
+def _top(k: int, valores: np.ndarray, filas: np.ndarray, *extras: np.ndarray):
+    """Candidatos al top-k de un fragmento: valores, filas y columnas extra alineadas."""
+    orden = _orden_top(valores, filas, k)
+    return (valores[orden], filas[orden]) + tuple(e[orden] for e in extras)
+
+
+def _evaluar_fragmento(descriptor: Dict, inicio: int, fin: int, tareas: Dict, top: int) -> Dict:
+    """Calcula los parciales de un fragmento: sumas, conteos por propósito y candidatos al top-k."""
+    datos = _leer_fragmento(descriptor, inicio, fin)
+    filas = datos['Nombre'].to_numpy()
+    parcial = {}
+
+    if tareas.get('analisis'):
+        res = analizar_prestamos(datos)
+        codigos = res['Proposito'].to_numpy()
+        k = len(descriptor['propositos'])
+        parcial['analisis'] = {
+            'sumas': {c: float(res[c].sum()) for c in
+                      ('Monto_Original', 'Costo_Total', 'Interes_Total', 'Pago_Mensual', 'Porcentaje_Interes')},
+            'por_proposito': {
+                'prestamos': np.bincount(codigos, minlength=k),
+                'monto_total': np.bincount(codigos, weights=res['Monto_Original'].to_numpy(), minlength=k),
+                'tasa_total': np.bincount(codigos, weights=res['Tasa_Interes'].to_numpy(), minlength=k),
+                'costo_total': np.bincount(codigos, weights=res['Costo_Total'].to_numpy(), minlength=k)
+            },
+            'top': _top(top, res['Costo_Total'].to_numpy(), filas)
+        }
+
+    if tareas.get('tasas'):
+        cambios = list(tareas['tasas'])
+        df = simular_cambios_tasa(datos, cambios)
+        mayor = f'Diferencia_{max(cambios):+.0f}%'
+        parcial['tasas'] = {
+            'sumas': [float(df[f'Diferencia_{c:+.0f}%'].sum()) for c in cambios],
+            'top': _top(top, df[mayor].to_numpy(), filas)
+        }
+
+    if tareas.get('prepago') is not None:
+        porcentajes = list(dict.fromkeys(np.atleast_1d(tareas['prepago']).astype(float).tolist()))
+        df = simular_prepago(datos, porcentajes)
+        n = len(datos)
+        ahorro = df['Ahorro_Dinero'].to_numpy().reshape(len(porcentajes), n)
+        meses = df['Ahorro_Tiempo_Meses'].to_numpy().reshape(len(porcentajes), n)
+        parcial['prepago'] = [
+            {'ahorro_total': float(ahorro[j].sum()), 'meses_total': float(meses[j].sum()),
+             'top': _top(top, ahorro[j], filas, meses[j])}
+            for j in range(len(porcentajes))
+        ]
+
+    if tareas.get('refinanciamiento') is not None:
+        df = simular_refinanciamiento(datos, float(tareas['refinanciamiento']))
+        convienen = df['Conviene_Refinanciar'].to_numpy()
+        ahorro = df['Ahorro'].to_numpy()
+        parcial['refinanciamiento'] = {
+            'conviene_refinanciar': int(convienen.sum()), 'ahorro_total': float(ahorro.sum()),
+            'top': _top(top, ahorro[convienen], filas[convienen], df['Porcentaje_Ahorro'].to_numpy()[convienen])
+        }
+
+    return parcial
+
+
+def _combinar_top(candidatos: List[tuple], k: int):
+    """Une los candidatos de cada fragmento y devuelve el top-k global con sus columnas extra."""
+    columnas = [np.concatenate(c) for c in zip(*candidatos)]
+    orden = _orden_top(columnas[0], columnas[1], k)
+    return tuple(c[orden] for c in columnas)
+
+
+def _combinar(datos: pd.DataFrame, propositos, parciales: List[Dict], tareas: Dict, top: int) -> Dict:
+    """Combina los parciales en el orden de los fragmentos, con el formato de servicio_prestamos."""
+    n = len(datos)
+    nombres = datos['Nombre'].to_numpy()
+    resultado = {}
+
+    if tareas.get('analisis'):
+        partes = [p['analisis'] for p in parciales]
+        sumas = {c: sum(p['sumas'][c] for p in partes) for c in partes[0]['sumas']} if partes else {}
+        grupos = {c: sum(p['por_proposito'][c] for p in partes) for c in
+                  ('prestamos', 'monto_total', 'tasa_total', 'costo_total')} if partes else {}
+        valores, filas = _combinar_top([p['top'] for p in partes], top) if partes else ([], [])
+        resultado['analisis'] = {
+            'prestamos': n,
+            'monto_total': sumas.get('Monto_Original', 0.0),
+            'costo_total': sumas.get('Costo_Total', 0.0),
+            'interes_total': sumas.get('Interes_Total', 0.0),
+            'pago_mensual_promedio': sumas['Pago_Mensual'] / n if n else float('nan'),
+            'porcentaje_interes_promedio': sumas['Porcentaje_Interes'] / n if n else float('nan'),
+            'por_proposito': [
+                {'Proposito': proposito,
+                 'prestamos': int(grupos['prestamos'][i]),
+                 'monto_total': round(float(grupos['monto_total'][i]), 2),
+                 'monto_promedio': round(float(grupos['monto_total'][i] / grupos['prestamos'][i]), 2),
+                 'tasa_promedio': round(float(grupos['tasa_total'][i] / grupos['prestamos'][i]), 2),
+                 'costo_total': round(float(grupos['costo_total'][i]), 2)}
+                for i, proposito in enumerate(propositos) if grupos and grupos['prestamos'][i]
+            ],
+            'mas_costosos': [{'Nombre': nombres[f], 'Costo_Total': float(v)} for v, f in zip(valores, filas)]
+        }
+
+    if tareas.get('tasas') and parciales:
+        cambios = list(tareas['tasas'])
+        partes = [p['tasas'] for p in parciales]
+        valores, filas = _combinar_top([p['top'] for p in partes], top)
+        resultado['tasas'] = {
+            'impacto_promedio': {f'{c:+.0f}%': sum(p['sumas'][j] for p in partes) / n for j, c in enumerate(cambios)},
+            'mas_afectados': {
+                'cambio': max(cambios),
+                'prestamos': [{'Nombre': nombres[f], 'Diferencia': float(v)} for v, f in zip(valores, filas)]
+            }
+        }
+
+    if tareas.get('prepago') is not None and parciales:
+        porcentajes = list(dict.fromkeys(np.atleast_1d(tareas['prepago']).astype(float).tolist()))
+        politicas = []
+        for j, porcentaje in enumerate(porcentajes):
+            partes = [p['prepago'][j] for p in parciales]
+            ahorro_total = sum(p['ahorro_total'] for p in partes)
+            valores, filas, meses = _combinar_top([p['top'] for p in partes], top)
+            politicas.append({
+                'porcentaje_prepago': porcentaje,
+                'ahorro_promedio': ahorro_total / n,
+                'ahorro_total': ahorro_total,
+                'tiempo_ahorrado_promedio': sum(p['meses_total'] for p in partes) / n,
+                'mayores_ahorros': [{'Nombre': nombres[f], 'Ahorro_Dinero': float(v), 'Ahorro_Tiempo_Meses': m.item()}
+                                    for v, f, m in zip(valores, filas, meses)]
+            })
+        resultado['prepago'] = {'politicas': politicas}
+
+    if tareas.get('refinanciamiento') is not None and parciales:
+        partes = [p['refinanciamiento'] for p in parciales]
+        ahorro_total = sum(p['ahorro_total'] for p in partes)
+        valores, filas, porcentaje = _combinar_top([p['top'] for p in partes], top)
+        resultado['refinanciamiento'] = {
+            'nueva_tasa': float(tareas['refinanciamiento']),
+            'conviene_refinanciar': sum(p['conviene_refinanciar'] for p in partes),
+            'total_prestamos': n,
+            'ahorro_total': ahorro_total,
+            'ahorro_promedio': ahorro_total / n,
+            'mejores_oportunidades': [{'Nombre': nombres[f], 'Ahorro': float(v), 'Porcentaje_Ahorro': float(p)}
+                                      for v, f, p in zip(valores, filas, porcentaje)]
+        }
+
+    return resultado
+
+
+class EvaluadorParalelo:
+    """
+    Pool de procesos reutilizable para evaluar carteras por fragmentos.
+
+    Args:
+        procesos (int): Procesos del pool (por defecto os.cpu_count()); con 1 los
+            fragmentos se evalúan en el proceso actual, sin pool
+        tamano_fragmento (int): Filas por fragmento
+    """
+
+    def __init__(self, procesos: Optional[int] = None, tamano_fragmento: int = TAMANO_FRAGMENTO):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tamano_fragmento = tamano_fragmento
+        self._pool = None
+        if self.procesos > 1:
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos,
+                                             mp_context=multiprocessing.get_context('spawn'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def evaluar(self, datos: pd.DataFrame, tareas: Optional[Dict] = None, top: int = 5) -> Dict:
+        """
+        Evalúa el análisis y los escenarios pedidos sobre toda la cartera.
+
+        Args:
+            datos (pd.DataFrame): Datos con el esquema de loan_data.csv
+            tareas (Dict): Claves opcionales 'analisis' (bool), 'tasas' (lista de cambios),
+                'prepago' (porcentaje o lista) y 'refinanciamiento' (nueva tasa); por defecto TAREAS
+            top (int): Tamaño de las listas de préstamos destacados
+
+        Returns:
+            Dict: Resultados con el mismo formato que las funciones de servicio_prestamos
+        """
+        tareas = TAREAS if tareas is None else tareas
+        n = len(datos)
+        rangos = [(i, min(i + self.tamano_fragmento, n)) for i in range(0, n, self.tamano_fragmento)]
+        with ColumnasCompartidas(datos) as compartidas:
+            descriptor = dict(compartidas.descriptor, propositos=list(compartidas.propositos))
+            if self._pool is None:
+                parciales = [_evaluar_fragmento(descriptor, i, f, tareas, top) for i, f in rangos]
+            else:
+                futuros = [self._pool.submit(_evaluar_fragmento, descriptor, i, f, tareas, top) for i, f in rangos]
+                # Se recogen en el orden de los fragmentos, no en el de terminación
+                parciales = [futuro.result() for futuro in futuros]
+        return _combinar(datos, list(compartidas.propositos), parciales, tareas, top)
+
+
+def evaluar_en_paralelo(datos: pd.DataFrame, tareas: Optional[Dict] = None, top: int = 5,
+                        procesos: Optional[int] = None, tamano_fragmento: int = TAMANO_FRAGMENTO) -> Dict:
+    """Atajo de EvaluadorParalelo para una sola evaluación."""
+    with EvaluadorParalelo(procesos, tamano_fragmento) as evaluador:
+        return evaluador.evaluar(datos, tareas, top)
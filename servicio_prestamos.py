@@ -0,0 +1,315 @@
+"""
+Capa de servicio no interactiva para el análisis de préstamos.
+
+Expone las mismas operaciones que el menú de CalculadoraPrestamos (cargar,
+analizar, escenarios, exportar y resumen ejecutivo) como funciones puras que
+reciben parámetros y devuelven estructuras serializables a JSON. No usa
+input() ni print(), y el único estado compartido es la caché de portafolios
+(protegida con un lock y de solo lectura), por lo que puede llamarse desde
+varios hilos a la vez.
+"""
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from almacen_columnar import cargar_ingerido
+from cache_datos import CacheArchivos
+from motor_prestamos import (
+    analizar_prestamos, rejilla_choques, simular_cambios_tasa, simular_prepago,
+    simular_refinanciamiento, simular_rejilla_choques
+)
+
+COLUMNAS_REQUERIDAS = ['Nombre', 'Edad', 'Monto_Prestamo', 'Tasa_Interes_Anual', 'Tiempo_Meses', 'Proposito']
+ACCIONES = ['analisis', 'escenarios', 'exportar', 'resumen']
+PARAMETROS_REJILLA = ('desde', 'hasta', 'paso')
+
+# Portafolios ya leídos y analizados, compartidos por todas las peticiones del proceso.
+# Los DataFrames guardados se tratan como de solo lectura.
+CACHE_PORTAFOLIOS = CacheArchivos(memoria_max_bytes=512 * 2**20)
+
+
+class ErrorServicio(ValueError):
+    """Error en los parámetros o los datos de una solicitud de análisis."""
+
+
+def cargar_portafolio(archivo_csv: str = "loan_data.csv") -> pd.DataFrame:
+    """
+    Lee y valida un archivo de préstamos.
+
+    El CSV se interpreta una sola vez por versión del archivo; las lecturas
+    siguientes abren sus columnas ya convertidas (almacen_columnar) con memmap.
+
+    Args:
+        archivo_csv (str): Ruta al archivo CSV con datos de préstamos
+
+    Returns:
+        pd.DataFrame: Datos de préstamos
+    """
+    try:
+        datos = cargar_ingerido(archivo_csv)
+    except FileNotFoundError:
+        raise ErrorServicio(f"No se pudo encontrar el archivo '{archivo_csv}'")
+    faltantes = [c for c in COLUMNAS_REQUERIDAS if c not in datos.columns]
+    if faltantes:
+        raise ErrorServicio(f"Faltan columnas en '{archivo_csv}': {faltantes}")
+    return datos
+
+
+def _cargar_y_analizar(archivo_csv: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    datos = cargar_portafolio(archivo_csv)
+    return datos, analizar_prestamos(datos)
+
+
+def obtener_portafolio(archivo_csv: str = "loan_data.csv") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Devuelve los datos y el análisis de un archivo de préstamos desde la caché del proceso.
+
+    El archivo solo se vuelve a leer y analizar si cambió (fecha de modificación o
+    tamaño) desde la última vez. Los DataFrames devueltos no deben modificarse.
+
+    Args:
+        archivo_csv (str): Ruta al archivo CSV con datos de préstamos
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: (datos, resultados del análisis)
+    """
+    try:
+        return CACHE_PORTAFOLIOS.obtener(archivo_csv, _cargar_y_analizar)
+    except FileNotFoundError:
+        raise ErrorServicio(f"No se pudo encontrar el archivo '{archivo_csv}'")
+
+
+def estadisticas_portafolio(datos: pd.DataFrame) -> Dict:
+    """Estadísticas descriptivas que CalculadoraPrestamos.cargar_datos muestra en pantalla."""
+    def describir(columna):
+        stats = datos[columna].describe()
+        return {'promedio': float(stats['mean']), 'mediana': float(stats['50%']),
+                'minimo': float(stats['min']), 'maximo': float(stats['max'])}
+
+    return {
+        'prestamos': len(datos),
+        'columnas': datos.columns.tolist(),
+        'monto': describir('Monto_Prestamo'),
+        'tasa': describir('Tasa_Interes_Anual'),
+        'tiempo_meses': describir('Tiempo_Meses'),
+        'por_proposito': {str(k): int(v) for k, v in datos['Proposito'].value_counts().items()}
+    }
+
+
+def resumen_analisis(resultados: pd.DataFrame, incluir_registros: bool = False) -> Dict:
+    """Totales del análisis de todos los préstamos y, opcionalmente, sus registros."""
+    resumen = {
+        'prestamos': len(resultados),
+        'monto_total': float(resultados['Monto_Original'].sum()),
+        'costo_total': float(resultados['Costo_Total'].sum()),
+        'interes_total': float(resultados['Interes_Total'].sum()),
+        'pago_mensual_promedio': float(resultados['Pago_Mensual'].mean()),
+        'porcentaje_interes_promedio': float(resultados['Porcentaje_Interes'].mean())
+    }
+    if incluir_registros:
+        resumen['registros'] = resultados.to_dict('records')
+    return resumen
+
+
+def escenario_tasas(datos: pd.DataFrame, cambios_tasa: List[float], top: int = 5) -> Dict:
+    """Impacto promedio de cada cambio de tasa y los préstamos más afectados por el mayor aumento."""
+    df = simular_cambios_tasa(datos, cambios_tasa)
+    resultado = {
+        'impacto_promedio': {f'{c:+.0f}%': float(df[f'Diferencia_{c:+.0f}%'].mean()) for c in cambios_tasa}
+    }
+    if cambios_tasa:
+        mayor = max(cambios_tasa)
+        columna = f'Diferencia_{mayor:+.0f}%'
+        resultado['mas_afectados'] = {
+            'cambio': mayor,
+            'prestamos': df.nlargest(top, columna)[['Nombre', columna]]
+                           .rename(columns={columna: 'Diferencia'}).to_dict('records')
+        }
+    return resultado
+
+
+def escenario_rejilla(datos: pd.DataFrame, desde: float = -5.0, hasta: float = 5.0,
+                      paso: float = 0.05, memoria_max_mb: float = 64) -> Dict:
+    """Agregados de cartera para una rejilla de cambios de tasa."""
+    agregados, _ = simular_rejilla_choques(
+        datos, rejilla_choques(desde, hasta, paso), memoria_max_mb=memoria_max_mb
+    )
+    return {'cambios': agregados.to_dict('records')}
+
+
+def _parametros_rejilla(rejilla) -> Dict[str, float]:
+    """
+    Valida los parámetros de rejilla recibidos en una solicitud.
+
+    Solo se aceptan desde, hasta y paso; memoria_max_mb y demás parámetros internos
+    de escenario_rejilla no pueden fijarse desde fuera.
+
+    Raises:
+        ErrorServicio: Si hay claves desconocidas o valores no numéricos
+    """
+    if not isinstance(rejilla, dict):
+        raise ErrorServicio("'rejilla' debe ser un objeto {desde, hasta, paso}")
+    desconocidas = sorted(set(rejilla) - set(PARAMETROS_REJILLA))
+    if desconocidas:
+        raise ErrorServicio(f"Parámetros de rejilla no válidos: {desconocidas}. Use {list(PARAMETROS_REJILLA)}")
+    try:
+        return {clave: float(valor) for clave, valor in rejilla.items()}
+    except (TypeError, ValueError):
+        raise ErrorServicio(f"Los parámetros de rejilla deben ser números: {rejilla}")
+
+
+def escenario_prepago(datos: pd.DataFrame, porcentajes_prepago, top: int = 5) -> Dict:
+    """Ahorro promedio por política de prepago y los mayores ahorros de cada una."""
+    df = simular_prepago(datos, porcentajes_prepago)
+    politicas = []
+    for porcentaje, grupo in df.groupby('Porcentaje_Prepago', sort=False):
+        politicas.append({
+            'porcentaje_prepago': float(porcentaje),
+            'ahorro_promedio': float(grupo['Ahorro_Dinero'].mean()),
+            'ahorro_total': float(grupo['Ahorro_Dinero'].sum()),
+            'tiempo_ahorrado_promedio': float(grupo['Ahorro_Tiempo_Meses'].mean()),
+            'mayores_ahorros': grupo.nlargest(top, 'Ahorro_Dinero')[
+                ['Nombre', 'Ahorro_Dinero', 'Ahorro_Tiempo_Meses']].to_dict('records')
+        })
+    return {'politicas': politicas}
+
+
+def escenario_refinanciamiento(datos: pd.DataFrame, nueva_tasa: float, top: int = 5) -> Dict:
+    """Préstamos que conviene refinanciar a nueva_tasa y el ahorro potencial."""
+    df = simular_refinanciamiento(datos, nueva_tasa)
+    convienen = df[df['Conviene_Refinanciar']]
+    return {
+        'nueva_tasa': float(nueva_tasa),
+        'conviene_refinanciar': int(len(convienen)),
+        'total_prestamos': len(df),
+        'ahorro_total': float(df['Ahorro'].sum()),
+        'ahorro_promedio': float(df['Ahorro'].mean()),
+        'mejores_oportunidades': convienen.nlargest(top, 'Ahorro')[
+            ['Nombre', 'Ahorro', 'Porcentaje_Ahorro']].to_dict('records')
+    }
+
+
+def exportar(resultados: pd.DataFrame, archivo_salida: str = "resultados_analisis.csv") -> Dict:
+    """
+    Exporta los resultados a CSV en el directorio de trabajo.
+
+    Solo se usa el nombre del archivo (sin directorios) para que una solicitud
+    no pueda escribir fuera del directorio de trabajo.
+    """
+    nombre = os.path.basename(archivo_salida or '')
+    if not nombre.endswith('.csv'):
+        raise ErrorServicio("El archivo de salida debe ser un nombre de archivo .csv")
+    resultados.to_csv(nombre, index=False)
+    return {'archivo': nombre, 'registros': len(resultados), 'columnas': len(resultados.columns)}
+
+
+def resumen_ejecutivo(datos: pd.DataFrame, resultados: pd.DataFrame) -> Dict:
+    """Versión estructurada de CalculadoraPrestamos.generar_resumen_ejecutivo."""
+    por_proposito = resultados.groupby('Proposito').agg(
+        prestamos=('Monto_Original', 'count'),
+        monto_total=('Monto_Original', 'sum'),
+        monto_promedio=('Monto_Original', 'mean'),
+        tasa_promedio=('Tasa_Interes', 'mean'),
+        costo_total=('Costo_Total', 'sum')
+    ).round(2)
+
+    tasas_altas = resultados[resultados['Tasa_Interes'] > 7.0]
+    tiempos_largos = resultados[resultados['Tiempo_Meses'] > 60]
+
+    return {
+        'estadisticas_generales': {
+            'total_prestamos': len(resultados),
+            'monto_total': float(resultados['Monto_Original'].sum()),
+            'costo_total': float(resultados['Costo_Total'].sum()),
+            'interes_total': float(resultados['Interes_Total'].sum()),
+            'tasa_promedio': float(datos['Tasa_Interes_Anual'].mean())
+        },
+        'por_proposito': por_proposito.reset_index().to_dict('records'),
+        'mas_costosos': resultados.nlargest(3, 'Costo_Total')[
+            ['Nombre', 'Costo_Total', 'Proposito']].to_dict('records'),
+        'oportunidades': {
+            'tasas_mayores_7': len(tasas_altas),
+            'ahorro_potencial_refinanciamiento': float(tasas_altas['Costo_Total'].sum() * 0.15),
+            'largo_plazo': len(tiempos_largos)
+        },
+        'recomendaciones': [
+            "Considerar refinanciamiento para préstamos con tasas > 7%",
+            "Evaluar prepagos para préstamos a largo plazo",
+            "Revisar opciones de consolidación para múltiples préstamos",
+            "Monitorear cambios en tasas de interés del mercado"
+        ]
+    }
+
+
+def ejecutar_analisis(parametros: Optional[Dict] = None, datos: Optional[pd.DataFrame] = None) -> Dict:
+    """
+    Ejecuta las acciones pedidas sobre un archivo de préstamos y devuelve un resultado JSON.
+
+    Args:
+        parametros (Dict): Parámetros de la solicitud:
+            - archivo (str): Nombre del archivo de préstamos (por defecto loan_data.csv)
+            - acciones (List[str]): Subconjunto de ACCIONES (por defecto analisis y exportar)
+            - escenarios (Dict): Claves opcionales 'tasas' (lista de cambios),
+              'rejilla' ({desde, hasta, paso}, hasta MAX_CHOQUES cambios), 'prepago' (número o lista) y
+              'refinanciamiento' (nueva tasa)
+            - archivo_salida (str): Nombre del CSV exportado
+            - top (int): Tamaño de las listas de préstamos destacados
+            - incluir_registros (bool): Incluir el análisis de cada préstamo
+        datos (pd.DataFrame): Datos ya cargados; si se omite se usa la caché de portafolios
+
+    Returns:
+        Dict: Resultado de cada acción ejecutada
+
+    Raises:
+        ErrorServicio: Si los parámetros o el archivo no son válidos
+        ValueError: Si la rejilla pedida no es válida (ver rejilla_choques)
+    """
+    parametros = parametros or {}
+    if not isinstance(parametros, dict):
+        raise ErrorServicio("Los parámetros deben ser un objeto JSON")
+    archivo = parametros.get('archivo') or 'loan_data.csv'
+    if not isinstance(archivo, str):
+        raise ErrorServicio("'archivo' debe ser un nombre de archivo")
+    archivo = os.path.basename(archivo)
+    acciones = parametros.get('acciones') or ['analisis', 'exportar']
+    if not isinstance(acciones, list) or not all(isinstance(a, str) for a in acciones):
+        raise ErrorServicio(f"'acciones' debe ser una lista de textos: {ACCIONES}")
+    if not isinstance(parametros.get('escenarios') or {}, dict):
+        raise ErrorServicio("'escenarios' debe ser un objeto")
+    desconocidas = [a for a in acciones if a not in ACCIONES]
+    if desconocidas:
+        raise ErrorServicio(f"Acciones no válidas: {desconocidas}. Use {ACCIONES}")
+    top = int(parametros.get('top', 5))
+
+    if datos is None:
+        datos, resultados = obtener_portafolio(archivo)
+    else:
+        resultados = analizar_prestamos(datos)
+    respuesta = {'archivo': archivo, 'estadisticas': estadisticas_portafolio(datos)}
+
+    if 'analisis' in acciones:
+        respuesta['analisis'] = resumen_analisis(resultados, bool(parametros.get('incluir_registros')))
+
+    if 'escenarios' in acciones:
+        config = parametros.get('escenarios') or {'tasas': [-2, -1, 1, 2], 'prepago': 0.10,
+                                                   'refinanciamiento': 3.5}
+        escenarios = {}
+        if 'tasas' in config:
+            escenarios['tasas'] = escenario_tasas(datos, [float(c) for c in config['tasas']], top)
+        if 'rejilla' in config:
+            escenarios['rejilla'] = escenario_rejilla(datos, **_parametros_rejilla(config['rejilla']))
+        if 'prepago' in config:
+            escenarios['prepago'] = escenario_prepago(datos, config['prepago'], top)
+        if 'refinanciamiento' in config:
+            escenarios['refinanciamiento'] = escenario_refinanciamiento(
+                datos, float(config['refinanciamiento']), top)
+        respuesta['escenarios'] = escenarios
+
+    if 'exportar' in acciones:
+        respuesta['exportacion'] = exportar(resultados, parametros.get('archivo_salida', 'data_prestamos.csv'))
+
+    if 'resumen' in acciones:
+        respuesta['resumen'] = resumen_ejecutivo(datos, resultados)
+
+    return respuesta
@@ -0,0 +1,53 @@
+import time
+import pandas as pd
+from openpyxl import Workbook
+
+from metricas import fase, medir_iterador
+
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def csv_to_xlsx(source, destination, chunk_rows=50_000, max_rows=EXCEL_MAX_ROWS):
+    """
+    Converts a CSV stream to an XLSX workbook chunk by chunk.
+
+    Rows go to a write-only workbook, which streams each sheet to a temporary
+    file instead of keeping its cells in memory. When a sheet reaches max_rows
+    (Excel's limit, header included) the rest continues on a new sheet named
+    Sheet2, Sheet3, ... with the header repeated.
+
+    Returns a dict with the number of data rows, the number of sheets and the
+    conversion time in seconds.
+    """
+    start = time.perf_counter()
+    workbook = Workbook(write_only=True)
+    sheets = 0
+    sheet = None
+    sheet_rows = max_rows
+    total_rows = 0
+    header = None
+
+    for chunk in medir_iterador(pd.read_csv(source, chunksize=chunk_rows), 'parse'):
+        if header is None:
+            header = chunk.columns.tolist()
+        # openpyxl cannot write NaN, empty cells are written as None
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            if sheet_rows >= max_rows:
+                sheets += 1
+                sheet = workbook.create_sheet(f'Sheet{sheets}')
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append(row)
+            sheet_rows += 1
+        total_rows += len(chunk)
+
+    if sheet is None:
+        sheets = 1
+        sheet = workbook.create_sheet('Sheet1')
+        if header is not None:
+            sheet.append(header)
+
+    with fase('serialize'):
+        workbook.save(destination)
+    return {'rows': total_rows, 'sheets': sheets, 'seconds': time.perf_counter() - start}
@@ -0,0 +1,171 @@
+from collections import defaultdict
+
+import pandas as pd
+from openpyxl import load_workbook
+
+
+def open_workbook(file):
+    """Opens a workbook in read-only mode: sheets are parsed lazily as rows are iterated."""
+    return load_workbook(file, read_only=True, data_only=True)
+
+
+def select_sheet(workbook, sheet=None):
+    """
+    Returns a worksheet by name or zero-based index (the first sheet when sheet is None).
+
+    Numeric strings such as '1' are treated as indexes, as they arrive from form fields.
+    """
+    if sheet is None or sheet == '':
+        return workbook.worksheets[0]
+    if isinstance(sheet, int) or (isinstance(sheet, str) and sheet.isdigit() and sheet not in workbook.sheetnames):
+        index = int(sheet)
+        if index >= len(workbook.worksheets):
+            raise ValueError(f'Sheet index {index} out of range ({len(workbook.worksheets)} sheets)')
+        return workbook.worksheets[index]
+    if sheet not in workbook.sheetnames:
+        raise ValueError(f'Sheet not found: {sheet}. Available: {workbook.sheetnames}')
+    return workbook[sheet]
+
+
+def has_dimension(worksheet):
+    """
+    Whether the sheet's <dimension> element can be used as its size.
+
+    Workbooks written without the element are "unsized", and some writers
+    always store a bare "A1" whatever the sheet holds, so a single-cell
+    dimension is not trusted either.
+    """
+    if worksheet.max_row is None or worksheet.max_column is None:
+        return False
+    return worksheet.max_row > worksheet.min_row or worksheet.max_column > worksheet.min_column
+
+
+def sheet_dimensions(worksheet):
+    """
+    Dimensions of a read-only worksheet.
+
+    They come from the <dimension> element at the top of the sheet XML, so no
+    cell values are loaded. When that element is missing or only says A1 (see
+    has_dimension) the rows are counted by iterating the sheet instead. A
+    dimension that is present but stale cannot be detected without reading
+    the sheet, so it is reported as stored.
+    """
+    if has_dimension(worksheet):
+        return {
+            'sheet': worksheet.title,
+            'rows': worksheet.max_row - worksheet.min_row + 1,
+            'columns': worksheet.max_column - worksheet.min_column + 1,
+            'dimension': worksheet.calculate_dimension(),
+            'sized': True
+        }
+    worksheet.reset_dimensions()
+    rows = 0
+    columns = 0
+    for row in worksheet.iter_rows(values_only=True):
+        rows += 1
+        columns = max(columns, len(row))
+    return {'sheet': worksheet.title, 'rows': rows, 'columns': columns, 'dimension': None, 'sized': False}
+
+
+def xlsx_dimensions(file):
+    """Per-sheet dimensions of every sheet in a workbook."""
+    workbook = open_workbook(file)
+    try:
+        return [sheet_dimensions(worksheet) for worksheet in workbook.worksheets]
+    finally:
+        workbook.close()
+
+
+def dedupe_names(names):
+    """
+    Renames repeated column names like pd.read_excel: 'a', 'a' becomes 'a', 'a.1'.
+
+    A suffix that is already a name elsewhere in the header is skipped, so
+    'a', 'a', 'a.1' becomes 'a', 'a.2', 'a.1'.
+    """
+    names = list(names)
+    existing = set(names)
+    counts = defaultdict(int)
+    result = []
+    for original in names:
+        name = original
+        count = counts[name]
+        while count > 0:
+            counts[original] = count + 1
+            name = f'{original}.{count}'
+            count = count + 1 if name in existing else counts[name]
+        result.append(name)
+        counts[name] = count + 1
+    return result
+
+
+def read_xlsx_header(worksheet):
+    """
+    Column names from the first row of a worksheet, named and deduplicated like pd.read_excel.
+
+    A worksheet whose <dimension> is not trusted (see has_dimension) is reset
+    first, so neither the header nor rows read afterwards are cut to one cell.
+    """
+    if not has_dimension(worksheet):
+        worksheet.reset_dimensions()
+    header = next(worksheet.iter_rows(max_row=1, values_only=True), None)
+    if header is None:
+        return []
+    return dedupe_names(f'Unnamed: {i}' if name is None else name for i, name in enumerate(header))
+
+
+def iter_xlsx_frames(file, sheet=None, columns=None, chunk_rows=50_000):
+    """
+    Yields a sheet of a workbook as DataFrame chunks of at most chunk_rows rows.
+
+    The workbook is opened in read-only mode, so rows are parsed from the sheet
+    XML as they are iterated instead of loading every cell up front. The first
+    row is used as the header, like pd.read_excel, with repeated names suffixed
+    '.1', '.2', ... When columns is given only those columns are kept, and the
+    row range read is narrowed to span them.
+
+    Blank rows between data rows are kept as rows of missing values; blank rows
+    at the end of the sheet (often left behind by formatting) are dropped, as
+    pd.read_excel does. A <dimension> that only says A1 is ignored so that it
+    does not cut the sheet down to its first cell.
+    """
+    workbook = open_workbook(file)
+    try:
+        worksheet = select_sheet(workbook, sheet)
+        header = read_xlsx_header(worksheet)
+        if not header:
+            return
+
+        if columns:
+            missing = [c for c in columns if c not in header]
+            if missing:
+                raise ValueError(f'Columns not found: {missing}')
+            positions = [header.index(c) for c in columns]
+        else:
+            columns = header
+            positions = list(range(len(header)))
+
+        # Only parse the cell range that contains the requested columns
+        min_col = min(positions) + 1
+        max_col = max(positions) + 1
+        offsets = [p + 1 - min_col for p in positions]
+        rows = worksheet.iter_rows(min_row=2, min_col=min_col, max_col=max_col, values_only=True)
+
+        blank = (None,) * len(offsets)
+        chunk = []
+        pending_blank = 0  # blank rows seen since the last data row, kept only if data follows
+        for row in rows:
+            values = tuple(row[i] for i in offsets)
+            if values == blank:
+                pending_blank += 1
+                continue
+            chunk.extend([blank] * pending_blank)
+            pending_blank = 0
+            chunk.append(values)
+            while len(chunk) >= chunk_rows:
+                yield pd.DataFrame(chunk[:chunk_rows], columns=columns)
+                chunk = chunk[chunk_rows:]
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        workbook.close()
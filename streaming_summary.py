@@ -0,0 +1,251 @@
+"""
+One-pass, mergeable column statistics for the /csv/summary and /xlsx/summary endpoints.
+
+Each accumulator consumes a table chunk by chunk and can be merged with another
+accumulator built over a different part of the data (another chunk range or a
+worker process), so memory stays flat regardless of file size. The final result
+has the same shape as ``df.describe(include='all').to_dict()``.
+"""
+from collections import Counter
+import math
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_STATS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+OBJECT_STATS = ['count', 'unique', 'top', 'freq']
+ALL_STATS = ['count', 'unique', 'top', 'freq', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch (a simplified KLL compactor stack).
+
+    Level h stores items with weight 2**h. When a level holds more than k items
+    it is sorted and every other item (random offset) is promoted to the next
+    level, so memory is O(k log n). While nothing has been compacted the
+    quantiles are exact and use linear interpolation like pandas.
+    """
+
+    def __init__(self, k=1024, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.levels[0] = np.concatenate([self.levels[0], values[~np.isnan(values)]])
+        self._compact()
+
+    def merge(self, other):
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self._compact()
+        return self
+
+    def quantile(self, q):
+        if len(self.levels) == 1:
+            return float(np.quantile(self.levels[0], q)) if len(self.levels[0]) else math.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(items[order][min(position, len(items) - 1)])
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                level = np.sort(level)
+                carry = level[-1:] if len(level) % 2 else np.empty(0)
+                level = level[:len(level) - len(carry)]
+                promoted = level[self._rng.integers(2)::2]
+                self.levels[h] = carry
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+
+class DistinctSketch:
+    """
+    Mergeable distinct-count estimator keeping the k smallest 64-bit hashes (KMV).
+
+    The count is exact while fewer than k distinct values have been seen.
+    """
+
+    def __init__(self, k=4096):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values):
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        self._keep_smallest(np.concatenate([self.hashes, hashes]))
+
+    def merge(self, other):
+        self._keep_smallest(np.concatenate([self.hashes, other.hashes]))
+        return self
+
+    def estimate(self):
+        if len(self.hashes) < self.k:
+            return len(self.hashes)
+        kth = float(self.hashes[-1]) / 2.0 ** 64
+        return int(round((self.k - 1) / kth))
+
+    def _keep_smallest(self, hashes):
+        self.hashes = np.unique(hashes)[:self.k]
+
+
+class NumericAccumulator:
+    """count/mean/std (Welford, merged with Chan's formula), min/max and approximate quantiles."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            chunk = NumericAccumulator()
+            chunk.count = len(values)
+            chunk.mean = float(values.mean())
+            chunk.m2 = float(np.square(values - chunk.mean).sum())
+            chunk.min = float(values.min())
+            chunk.max = float(values.max())
+            self._combine(chunk)
+            self.sketch.update(values)
+
+    def merge(self, other):
+        self._combine(other)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def result(self):
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+        empty = self.count == 0
+        return {
+            'count': float(self.count),
+            'mean': math.nan if empty else self.mean,
+            'std': std,
+            'min': math.nan if empty else self.min,
+            '25%': self.sketch.quantile(0.25),
+            '50%': self.sketch.quantile(0.50),
+            '75%': self.sketch.quantile(0.75),
+            'max': math.nan if empty else self.max
+        }
+
+    def _combine(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+class ObjectAccumulator:
+    """count, approximate distinct count and approximate top value with its frequency."""
+
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.count = 0
+        self.distinct = DistinctSketch()
+        self.counts = Counter()
+
+    def update(self, values):
+        series = pd.Series(values, dtype=object).dropna()
+        self.count += len(series)
+        if len(series):
+            self.distinct.update(series.to_numpy())
+            self.counts.update(series.value_counts().head(self.capacity).to_dict())
+            self._trim()
+
+    def merge(self, other):
+        self.count += other.count
+        self.distinct.merge(other.distinct)
+        self.counts.update(other.counts)
+        self._trim()
+        return self
+
+    def result(self):
+        top, freq = self.counts.most_common(1)[0] if self.counts else (math.nan, math.nan)
+        return {'count': float(self.count), 'unique': self.distinct.estimate(), 'top': top, 'freq': freq}
+
+    def _trim(self):
+        if len(self.counts) > self.capacity:
+            self.counts = Counter(dict(self.counts.most_common(self.capacity)))
+
+
+def _is_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+class TableSummary:
+    """
+    Per-column accumulators for a whole table.
+
+    A column's kind is fixed by the first chunk it appears in. If a numeric
+    column later contains text, that text is ignored (coerced to NaN) instead of
+    turning the whole column into an object column as a full pd.read_csv would.
+    """
+
+    def __init__(self):
+        self.columns = {}
+
+    def update(self, df):
+        for name in df.columns:
+            series = df[name]
+            accumulator = self.columns.get(name)
+            if accumulator is None:
+                accumulator = NumericAccumulator() if _is_numeric(series) else ObjectAccumulator()
+                self.columns[name] = accumulator
+            if isinstance(accumulator, NumericAccumulator):
+                if not _is_numeric(series):
+                    series = pd.to_numeric(series, errors='coerce')
+                accumulator.update(series.to_numpy(dtype=np.float64, na_value=np.nan))
+            else:
+                accumulator.update(series.to_numpy(dtype=object))
+        return self
+
+    def merge(self, other):
+        for name, accumulator in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(accumulator)
+            else:
+                self.columns[name] = accumulator
+        return self
+
+    def to_dict(self):
+        """Same shape as df.describe(include='all').to_dict()."""
+        kinds = {type(a) for a in self.columns.values()}
+        if kinds == {NumericAccumulator}:
+            stats = NUMERIC_STATS
+        elif kinds == {ObjectAccumulator}:
+            stats = OBJECT_STATS
+        else:
+            stats = ALL_STATS
+        summary = {}
+        for name, accumulator in self.columns.items():
+            values = accumulator.result()
+            summary[name] = {stat: values.get(stat, math.nan) for stat in stats}
+        return summary
+
+
+def summarize_chunks(chunks):
+    """Builds a TableSummary from an iterable of DataFrame chunks and returns its describe-style dict."""
+    summary = TableSummary()
+    for chunk in chunks:
+        summary.update(chunk)
+    return summary.to_dict()
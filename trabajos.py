@@ -0,0 +1,283 @@
+"""
+Cola local de trabajos en segundo plano para los endpoints de larga duración.
+
+Los trabajos se ejecutan en un ProcessPoolExecutor del mismo proceso, sin broker
+externo: ColaTrabajos les asigna un id, limita cuántos pueden esperar a la vez,
+permite cancelar los que aún no empiezan, mide los tiempos de cada uno y descarta
+los resultados terminados cuando vence su TTL.
+
+Cada tipo de trabajo es una función de nivel de módulo registrada en TIPOS como
+'modulo:funcion'; el proceso trabajador la importa por nombre, así que solo los
+argumentos (rutas y diccionarios) viajan entre procesos.
+
+El estado de los trabajos (ids, resultados, archivos temporales) vive en la
+memoria del proceso del servidor, así que la API debe servirse con un solo
+proceso, como `flask run` en run.sh o `gunicorn -w 1 --threads N`. Con varios
+workers, GET /jobs/<id> puede llegar a un proceso que no conoce el trabajo.
+"""
+import importlib
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+# Tipo de trabajo -> función que lo ejecuta en el proceso trabajador
+TIPOS = {
+    'function-three': 'servicio_prestamos:ejecutar_analisis',
+    'generic-two': 'generic_function_two:analizar_hurtos',
+    'csv-summary': 'csv_summary_file:summarize_csv',
+    'xlsx-summary': 'xlsx_summary_file:summarize_xlsx',
+    'convert-csv-to-xlsx': 'stream_convert:csv_to_xlsx',
+}
+
+EN_COLA = 'en_cola'
+EJECUTANDO = 'ejecutando'
+COMPLETADO = 'completado'
+ERROR = 'error'
+CANCELADO = 'cancelado'
+
+
+class ColaLlena(RuntimeError):
+    """Se alcanzó el máximo de trabajos pendientes."""
+
+
+def _ejecutar(ruta_funcion: str, args: tuple, kwargs: dict) -> Dict:
+    """Corre en el proceso trabajador: importa la función, la ejecuta y mide su duración."""
+    modulo, nombre = ruta_funcion.split(':')
+    funcion = getattr(importlib.import_module(modulo), nombre)
+    inicio = time.time()
+    resultado = funcion(*args, **kwargs)
+    return {'resultado': resultado, 'inicio': inicio, 'fin': time.time(), 'pid': os.getpid()}
+
+
+class Trabajo:
+    """Estado de un trabajo enviado a la cola."""
+
+    def __init__(self, tipo: str, args: tuple, kwargs: dict, directorio: Optional[str] = None,
+                 archivo_resultado: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.args = args
+        self.kwargs = kwargs
+        self.directorio = directorio
+        self.archivo_resultado = archivo_resultado
+        self.futuro = None  # se asigna cuando el trabajo pasa al pool
+        self.cancelado = False
+        self.enviado = time.time()
+        self.terminado = None
+
+    @property
+    def estado(self) -> str:
+        if self.cancelado:
+            return CANCELADO
+        if self.futuro is None:
+            return EN_COLA
+        if self.futuro.done():
+            return ERROR if self.futuro.exception() is not None else COMPLETADO
+        return EJECUTANDO
+
+    @property
+    def finalizado(self) -> bool:
+        return self.cancelado or (self.futuro is not None and self.futuro.done())
+
+    def tiempos(self) -> Dict:
+        """Espera en cola, ejecución y total en segundos (None mientras no se conozcan)."""
+        tiempos = {'enviado': self.enviado, 'espera': None, 'ejecucion': None, 'total': None}
+        if self.estado == COMPLETADO:
+            salida = self.futuro.result()
+            tiempos['espera'] = salida['inicio'] - self.enviado
+            tiempos['ejecucion'] = salida['fin'] - salida['inicio']
+        if self.terminado is not None:
+            tiempos['total'] = self.terminado - self.enviado
+        return tiempos
+
+    def resumen(self) -> Dict:
+        resumen = {'id': self.id, 'tipo': self.tipo, 'estado': self.estado, 'tiempos': self.tiempos()}
+        if resumen['estado'] == ERROR:
+            resumen['error'] = str(self.futuro.exception())
+        return resumen
+
+    def resultado(self) -> Any:
+        return self.futuro.result()['resultado']
+
+    def limpiar(self):
+        """Borra el directorio temporal con los archivos de entrada y salida del trabajo."""
+        if self.directorio:
+            shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+class ColaTrabajos:
+    """
+    Cola de trabajos respaldada por un pool de procesos.
+
+    Los trabajos esperan en una cola propia y solo pasan al pool cuando hay un
+    proceso libre, de modo que un trabajo en cola se puede cancelar siempre y su
+    estado distingue entre 'en_cola' y 'ejecutando'.
+
+    Args:
+        max_procesos (int): Procesos trabajadores (por defecto os.cpu_count())
+        max_pendientes (int): Trabajos en cola o en ejecución admitidos a la vez
+        ttl_segundos (float): Tiempo que se conserva un trabajo terminado
+        max_trabajos (int): Trabajos terminados conservados como máximo
+    """
+
+    def __init__(self, max_procesos: Optional[int] = None, max_pendientes: int = 32,
+                 ttl_segundos: float = 3600, max_trabajos: int = 1000):
+        self.max_procesos = max_procesos or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes
+        self.ttl_segundos = ttl_segundos
+        self.max_trabajos = max_trabajos
+        self._pool = None
+        self._trabajos = {}  # id -> Trabajo, en orden de envío
+        self._en_cola = deque()
+        self._en_ejecucion = 0
+        self._lock = threading.RLock()
+        self.enviados = 0
+        self.rechazados = 0
+        self.expirados = 0
+
+    def _obtener_pool(self) -> ProcessPoolExecutor:
+        # El pool se crea con el primer trabajo; 'spawn' evita heredar los hilos del servidor
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_procesos,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def _despachar(self):
+        """Pasa trabajos de la cola al pool mientras haya procesos libres."""
+        while self._en_cola and self._en_ejecucion < self.max_procesos:
+            trabajo = self._en_cola.popleft()
+            argumentos = (_ejecutar, TIPOS[trabajo.tipo], trabajo.args, trabajo.kwargs)
+            try:
+                trabajo.futuro = self._obtener_pool().submit(*argumentos)
+            except BrokenProcessPool:
+                # Un trabajador murió (p. ej. por falta de memoria): se apaga el pool roto
+                # para liberar sus hilos y procesos restantes y se crea uno nuevo
+                roto, self._pool = self._pool, None
+                roto.shutdown(wait=False, cancel_futures=True)
+                trabajo.futuro = self._obtener_pool().submit(*argumentos)
+            self._en_ejecucion += 1
+            trabajo.futuro.add_done_callback(self._al_terminar(trabajo))
+
+    def _al_terminar(self, trabajo: Trabajo):
+        def liberar(_futuro):
+            with self._lock:
+                trabajo.terminado = time.time()
+                self._en_ejecucion -= 1
+                self._despachar()
+        return liberar
+
+    def comprobar_lugar(self):
+        """
+        Comprueba que la cola admite otro trabajo, antes de preparar sus archivos.
+
+        Raises:
+            ColaLlena: Si ya hay max_pendientes trabajos sin terminar
+        """
+        with self._lock:
+            self._purgar()
+            if len(self._en_cola) + self._en_ejecucion >= self.max_pendientes:
+                self.rechazados += 1
+                raise ColaLlena(f"Hay {self.max_pendientes} trabajos pendientes; intente más tarde")
+
+    def enviar(self, tipo: str, *args, directorio: Optional[str] = None,
+               archivo_resultado: Optional[str] = None, **kwargs) -> Trabajo:
+        """
+        Envía un trabajo de uno de los TIPOS registrados.
+
+        Args:
+            tipo (str): Clave de TIPOS
+            directorio (str): Directorio temporal del trabajo, se borra cuando el trabajo expira
+            archivo_resultado (str): Archivo que produce el trabajo, para descargarlo como resultado
+
+        Raises:
+            ValueError: Si el tipo no está registrado
+            ColaLlena: Si ya hay max_pendientes trabajos sin terminar
+        """
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de trabajo no válido: {tipo}. Use {list(TIPOS)}")
+        with self._lock:
+            self.comprobar_lugar()
+            trabajo = Trabajo(tipo, args, kwargs, directorio, archivo_resultado)
+            self._trabajos[trabajo.id] = trabajo
+            self._en_cola.append(trabajo)
+            self.enviados += 1
+            self._despachar()
+            return trabajo
+
+    def obtener(self, id_trabajo: str) -> Optional[Trabajo]:
+        with self._lock:
+            self._purgar()
+            return self._trabajos.get(id_trabajo)
+
+    def cancelar(self, id_trabajo: str) -> Optional[bool]:
+        """
+        Cancela un trabajo que aún está en cola. Devuelve None si no existe y False
+        si ya empezó o terminó (un trabajo en ejecución no se interrumpe).
+        """
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            if trabajo is None:
+                return None
+            if trabajo.estado != EN_COLA:
+                return False
+            self._en_cola.remove(trabajo)
+            trabajo.cancelado = True
+            trabajo.terminado = time.time()
+            trabajo.limpiar()
+            return True
+
+    def listar(self) -> List[Dict]:
+        with self._lock:
+            self._purgar()
+            return [t.resumen() for t in self._trabajos.values()]
+
+    def _purgar(self):
+        """Descarta los trabajos terminados cuyo TTL venció y los más antiguos por encima de max_trabajos."""
+        ahora = time.time()
+        terminados = [t for t in self._trabajos.values() if t.finalizado]
+        sobrantes = len(terminados) - self.max_trabajos
+        for i, trabajo in enumerate(terminados):
+            vencido = trabajo.terminado is not None and ahora - trabajo.terminado > self.ttl_segundos
+            if vencido or i < sobrantes:
+                trabajo.limpiar()
+                del self._trabajos[trabajo.id]
+                self.expirados += 1
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            self._purgar()
+            estados = [t.estado for t in self._trabajos.values()]
+            return {
+                'procesos': self.max_procesos,
+                'max_pendientes': self.max_pendientes,
+                'ttl_segundos': self.ttl_segundos,
+                'en_cola': len(self._en_cola),
+                'en_ejecucion': self._en_ejecucion,
+                'por_estado': {e: estados.count(e) for e in (EN_COLA, EJECUTANDO, COMPLETADO, ERROR, CANCELADO)},
+                'enviados': self.enviados,
+                'rechazados': self.rechazados,
+                'expirados': self.expirados
+            }
+
+    def cerrar(self, esperar: bool = True):
+        """Cancela los trabajos en cola y apaga el pool."""
+        with self._lock:
+            for trabajo in list(self._en_cola):
+                self.cancelar(trabajo.id)
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=esperar)
+
+
+# Cola compartida por el proceso del servidor
+COLA_TRABAJOS = ColaTrabajos(
+    max_pendientes=int(os.environ.get('TRABAJOS_MAX_PENDIENTES', 32)),
+    ttl_segundos=float(os.environ.get('TRABAJOS_TTL_SEGUNDOS', 3600)),
+)
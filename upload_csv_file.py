@@ -1,14 +1,59 @@
+import time
 import pandas as pd
 from flask import jsonify, request
 
+from almacen_columnar import directorio_subida, ingerir_subida, leer_meta
+from metricas import fase
+from stream_csv import inspect_csv_stream
+
+RAW_CSV_MIMETYPES = ('text/csv', 'application/csv', 'application/octet-stream')
+
+
 def upload_csv_file():
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file part'}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'error': 'No selected file'}), 400
+    """
+    Reports the columns and row count of an uploaded CSV.
+
+    The file can be sent as the multipart field 'file' or as the raw request body
+    (Content-Type text/csv). By default it is inspected as a stream in constant
+    memory; ?full=true parses it completely with pandas instead, and
+    ?ingest=true also stores it in the columnar store and returns its 'table' id
+    for /csv/summary?table=<id>.
+
+    A raw body is read while it is parsed, so its receive time is part of the
+    'parse' phase in /metrics; multipart uploads are received first ('upload').
+    """
+    if request.mimetype in RAW_CSV_MIMETYPES:
+        stream = request.stream
+    else:
+        with fase('upload'):
+            files = request.files
+        if 'file' not in files:
+            return jsonify({'error': 'No file part'}), 400
+        file = files['file']
+        if file.filename == '':
+            return jsonify({'error': 'No selected file'}), 400
+        stream = file.stream
+    full = request.args.get('full', '').lower() in ('1', 'true', 'yes')
+    ingest = request.args.get('ingest', '').lower() in ('1', 'true', 'yes')
     try:
-        df = pd.read_csv(file)
-        return jsonify({'columns': df.columns.tolist(), 'rows': len(df)})
+        if ingest:
+            start = time.perf_counter()
+            with fase('parse'):
+                table_id = ingerir_subida(stream)
+                meta = leer_meta(directorio_subida(table_id))
+            with fase('serialize'):
+                return jsonify({'columns': [c['nombre'] for c in meta['columnas']], 'rows': meta['filas'],
+                                'table': table_id, 'ingest_seconds': time.perf_counter() - start})
+        if not full:
+            with fase('parse'):
+                result = inspect_csv_stream(stream)
+            with fase('serialize'):
+                return jsonify(result)
+        start = time.perf_counter()
+        with fase('parse'):
+            df = pd.read_csv(stream)
+        with fase('serialize'):
+            return jsonify({'columns': df.columns.tolist(), 'rows': len(df),
+                            'parse_seconds': time.perf_counter() - start})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -1,14 +1,38 @@
-import pandas as pd
 from flask import jsonify, request
 
+from metricas import fase
+from stream_xlsx import open_workbook, read_xlsx_header, select_sheet, sheet_dimensions
+
+
 def upload_xlsx_file():
-    if 'file' not in request.files:
+    """
+    Reports the columns and row count of a sheet of an uploaded workbook, plus the
+    dimensions of every sheet.
+
+    Only the header row is parsed; row counts come from each sheet's stored
+    dimensions, so cell values are not loaded, except for sheets stored without
+    a usable dimension, whose rows are counted. The 'sheet' field selects the
+    sheet by name or zero-based index (first sheet by default).
+    """
+    with fase('upload'):
+        files = request.files
+    if 'file' not in files:
         return jsonify({'error': 'No file part'}), 400
-    file = request.files['file']
+    file = files['file']
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
     try:
-        df = pd.read_excel(file)
-        return jsonify({'columns': df.columns.tolist(), 'rows': len(df)})
+        with fase('parse'):
+            workbook = open_workbook(file)
+            try:
+                worksheet = select_sheet(workbook, request.values.get('sheet'))
+                columns = read_xlsx_header(worksheet)
+                sheets = [sheet_dimensions(ws) for ws in workbook.worksheets]
+            finally:
+                workbook.close()
+        selected = next(s for s in sheets if s['sheet'] == worksheet.title)
+        with fase('serialize'):
+            return jsonify({'columns': columns, 'rows': max(selected['rows'] - 1, 0),
+                            'sheet': worksheet.title, 'sheets': sheets})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
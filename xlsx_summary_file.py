@@ -1,13 +1,34 @@
-import pandas as pd
 from flask import jsonify, request
 
+from metricas import fase, medir_iterador
+from stream_xlsx import iter_xlsx_frames
+from streaming_summary import summarize_chunks
+
+
+def summarize_xlsx(source, sheet=None, columns=None):
+    """Describe-style summary of a sheet of a workbook file path or stream."""
+    return summarize_chunks(medir_iterador(iter_xlsx_frames(source, sheet=sheet, columns=columns), 'parse'))
+
+
 def xlsx_summary_file():
-    if 'file' not in request.files:
+    """
+    Summarises a sheet of an uploaded workbook in one streaming pass.
+
+    Optional fields: 'sheet' (name or zero-based index) and 'columns'
+    (comma-separated column names to include).
+    """
+    with fase('upload'):
+        files = request.files
+    if 'file' not in files:
         return jsonify({'error': 'No file part'}), 400
-    file = request.files['file']
+    file = files['file']
+    columns = request.values.get('columns')
+    columns = [c.strip() for c in columns.split(',') if c.strip()] if columns else None
     try:
-        df = pd.read_excel(file)
-        summary = df.describe(include='all').to_dict()
-        return jsonify({'summary': summary})
+        # Reading the sheet is timed as 'parse' and the rest of the pass as 'compute'
+        with fase('compute'):
+            summary = summarize_xlsx(file, sheet=request.values.get('sheet'), columns=columns)
+        with fase('serialize'):
+            return jsonify({'summary': summary})
     except Exception as e:
         return jsonify({'error': str(e)}), 400